@@ -1,12 +1,29 @@
 # Dependências
+import io
 import re
 import os
 from psycopg2 import (Error, sql)
 import psycopg2
+import hashlib
 import pandas as pd
 import unicodedata
+from typing import List, Optional, Tuple
 
 class PostgreSQL:
+    # Linhas enviadas por bloco de COPY; cada bloco é serializado em memória como CSV
+    COPY_CHUNK_SIZE = 50000
+    COPY_NULL = '\\N'
+
+    # Inferência de tipos: a medida (`Valor`) é numérica, o período e os códigos viram
+    # inteiros quando todos os valores são numéricos; as demais colunas são dimensões.
+    MEASURE_COLUMNS = {'valor'}
+    PERIOD_COLUMNS = {'periodo'}
+    CODE_PATTERN = re.compile(r'(^|_)(cod|codigo|id)($|_)|^tabela$')
+    INTEGER_MAX = 2 ** 31 - 1
+    MAX_IDENTIFIER = 63
+    # Coluna da tabela temporária do upsert com a ordem de chegada das linhas
+    STAGING_SEQUENCE = '_stg_seq'
+
     def __init__(self, default_connection: bool = True, 
                  user: str = None, 
                  passw: str = None, 
@@ -84,7 +101,12 @@ class PostgreSQL:
         return exists   
 
 
-    def create_table(self, table_name: str, df: pd.DataFrame, adjust_dataframe: bool = False) -> None:
+    def create_table(self, 
+                     table_name: str, 
+                     df: pd.DataFrame, 
+                     adjust_dataframe: bool = False, 
+                     chunk_size: int = COPY_CHUNK_SIZE,
+                     index_columns: Optional[List[str]] = None) -> None:
         
         full_table_name = f'{self.schema}.{table_name}'
         
@@ -97,41 +119,41 @@ class PostgreSQL:
             cursor = self.connector.cursor()
             cursor.execute(f"DROP TABLE IF EXISTS {full_table_name}")
 
-            cursor.execute(f'CREATE TABLE {full_table_name} (indice SERIAL PRIMARY KEY)')
-
             if adjust_dataframe:
                 df.columns = [self.format_string(col) for col in df.columns]
 
+            column_types = self.infer_column_types(df)
+            df = self._cast_columns(df, column_types)
 
-            column_data_types = ['TEXT'] * len(df.columns)
+            # Uma única instrução DDL com todas as colunas já tipadas
+            definitions = [sql.SQL('indice SERIAL PRIMARY KEY')] + [
+                sql.SQL("{} {}").format(sql.Identifier(col), sql.SQL(data_type)) for col, data_type in column_types
+            ]
+            cursor.execute(sql.SQL("CREATE TABLE {} ({})").format(
+                sql.Identifier(self.schema, table_name),
+                sql.SQL(', ').join(definitions)
+            ))
 
-            for col, data_type in zip(df.columns, column_data_types):
-                col_query = sql.SQL("ALTER TABLE {} ADD COLUMN {} {}").format(
-                    sql.Identifier(self.schema, table_name),
-                    sql.Identifier(col),
-                    sql.SQL(data_type)
-                )
-                cursor.execute(col_query)
-
-            for row in df.itertuples(index=False):
-                valores = tuple(row)
-                colunas = sql.SQL(', ').join([sql.Identifier(c) for c in df.columns])
-                placeholders = sql.SQL(', ').join(sql.Placeholder() * len(df.columns))
-                insert_query = sql.SQL("INSERT INTO {} ({}) VALUES ({})").format(
-                    sql.Identifier(self.schema, table_name),
-                    colunas,
-                    placeholders
-                )
-                cursor.execute(insert_query, valores)
+            self._copy_dataframe(cursor, table_name, df, chunk_size)
+
+            # Índices criados após a carga, que é mais rápida sem eles
+            if index_columns is None:
+                index_columns = self.dimension_columns(column_types)
+            self._create_indexes(cursor, table_name, index_columns)
 
             self.connector.commit()
             cursor.close()
 
         except Error as e:
+            self.connector.rollback()
             print(f"Erro ao criar ou recriar a tabela: {e}")
 
 
-    def insert_into_table(self, table_name: str, df: pd.DataFrame, adjust_dataframe: bool = False) -> None:
+    def insert_into_table(self, 
+                          table_name: str, 
+                          df: pd.DataFrame, 
+                          adjust_dataframe: bool = False, 
+                          chunk_size: int = COPY_CHUNK_SIZE) -> None:
 
         if adjust_dataframe:
             df.columns = [self.format_string(col) for col in df.columns]
@@ -139,64 +161,241 @@ class PostgreSQL:
         if self.table_exists(table_name):
             try:
                 cursor = self.connector.cursor()
-                colunas = sql.SQL(', ').join([sql.Identifier(c) for c in df.columns])
-                placeholders = sql.SQL(', ').join(sql.Placeholder() for _ in df.columns)  # Corrected line
-                insert_query = sql.SQL("INSERT INTO {} ({}) VALUES ({})").format(
-                    sql.Identifier(self.schema, table_name),
-                    colunas,
-                    placeholders
-                )
-                # Execute insert query for each row
-                for row in df.itertuples(index=False):
-                    valores = tuple(row)
-                    cursor.execute(insert_query, valores)
+                df = self._cast_columns(df, self.infer_column_types(df))
+                self._copy_dataframe(cursor, table_name, df, chunk_size)
                 self.connector.commit()
                 cursor.close()
             except Exception as e:  # Changed from Error to Exception for a broader catch
+                self.connector.rollback()
                 print(f"Erro ao inserir dados na tabela: {e}")
         else:
             print(f"A tabela '{table_name}' não existe.")
+
+
+    def infer_column_types(self, df: pd.DataFrame) -> List[Tuple[str, str]]:
+        # Tipos do PostgreSQL a partir dos dtypes e do conteúdo de cada coluna:
+        # `Valor` -> DOUBLE PRECISION; período e códigos inteiros -> INTEGER (ou BIGINT);
+        # demais inteiros, decimais, booleanos e datas pelo dtype; o resto como TEXT.
+        column_types = []
+        for col in df.columns:
+            name = self._column_key(col)
+            serie = df[col]
+
+            if name in self.MEASURE_COLUMNS:
+                data_type = 'DOUBLE PRECISION'
+            elif pd.api.types.is_bool_dtype(serie):
+                data_type = 'BOOLEAN'
+            elif pd.api.types.is_integer_dtype(serie):
+                data_type = self._integer_type(serie)
+            elif pd.api.types.is_float_dtype(serie):
+                data_type = 'DOUBLE PRECISION'
+                if (name in self.PERIOD_COLUMNS or self.CODE_PATTERN.search(name)) and serie.dropna().mod(1).eq(0).all():
+                    data_type = self._integer_type(serie)
+            elif pd.api.types.is_datetime64_any_dtype(serie):
+                data_type = 'TIMESTAMP'
+            elif name in self.PERIOD_COLUMNS or self.CODE_PATTERN.search(name):
+                data_type = self._integer_text_type(serie)
+            else:
+                data_type = 'TEXT'
+            column_types.append((col, data_type))
+        return column_types
+
+    def _column_key(self, col) -> str:
+        # Nome normalizado para a inferência, preservando os separadores (ex.: 'Região (Código)' -> 'regiao_codigo')
+        return re.sub(r'_+', '_', self.format_string(re.sub(r'[_()]', ' ', str(col)).strip()))
+
+    def _integer_type(self, serie: pd.Series) -> str:
+        values = serie.dropna()
+        if values.empty:
+            return 'INTEGER'
+        return 'INTEGER' if values.abs().max() <= self.INTEGER_MAX else 'BIGINT'
+
+    def _integer_text_type(self, serie: pd.Series) -> str:
+        # Textos só viram inteiros se todos forem dígitos sem zeros à esquerda (ex.: '2023', '202301')
+        values = pd.Series(serie.dropna().unique()).astype(str)
+        if values.empty or not values.str.fullmatch(r'0|[1-9][0-9]{0,17}').all():
+            return 'TEXT'
+        return self._integer_type(values.astype('int64'))
+
+    def dimension_columns(self, column_types: List[Tuple[str, str]]) -> List[str]:
+        # Colunas usadas nos filtros (região, período, variável, categorias etc.): todas, exceto as medidas
+        return [col for col, data_type in column_types
+                if self._column_key(col) not in self.MEASURE_COLUMNS and data_type != 'DOUBLE PRECISION']
+
+    def _cast_columns(self, df: pd.DataFrame, column_types: List[Tuple[str, str]]) -> pd.DataFrame:
+        # Converte os valores para a representação esperada pelo COPY em cada tipo inferido
+        # (ex.: marcadores de ausência do SIDRA em `Valor` viram NULL; inteiros sem o sufixo '.0').
+        casts = {}
+        for col, data_type in column_types:
+            serie = df[col]
+            if data_type == 'DOUBLE PRECISION' and not pd.api.types.is_float_dtype(serie):
+                casts[col] = pd.to_numeric(serie.astype(object), errors='coerce').astype('float64')
+            elif data_type in ('INTEGER', 'BIGINT') and not pd.api.types.is_integer_dtype(serie):
+                casts[col] = pd.to_numeric(serie.astype(object), errors='coerce').astype('Int64')
+        return df.assign(**casts) if casts else df
+
+    def _index_name(self, table_name: str, col: str) -> str:
+        name = f"idx_{table_name}_{self._column_key(col)}"
+        if len(name) > self.MAX_IDENTIFIER:
+            digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]
+            name = f"{name[:self.MAX_IDENTIFIER - 9]}_{digest}"
+        return name
+
+    def _create_indexes(self, cursor, table_name: str, columns: List[str]) -> None:
+        for col in columns:
+            cursor.execute(sql.SQL("CREATE INDEX IF NOT EXISTS {} ON {} ({})").format(
+                sql.Identifier(self._index_name(table_name, col)),
+                sql.Identifier(self.schema, table_name),
+                sql.Identifier(col)
+            ))
+
+    def _copy_dataframe(self, 
+                        cursor, 
+                        table_name: str, 
+                        df: pd.DataFrame, 
+                        chunk_size: int = COPY_CHUNK_SIZE, 
+                        schema: Optional[str] = None) -> int:
+        # Envia o DataFrame com COPY FROM STDIN em blocos de CSV, sem confirmar a transação:
+        # quem chama faz um único commit por tabela. Ausentes (None/NaN) viram NULL e
+        # textos vazios continuam textos vazios.
+        colunas = sql.SQL(', ').join([sql.Identifier(c) for c in df.columns])
+        copy_query = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL {})").format(
+            sql.Identifier(schema or self.schema, table_name),
+            colunas,
+            sql.Literal(self.COPY_NULL)
+        ).as_string(cursor)
+
+        chunk_size = max(int(chunk_size), 1)
+        for start in range(0, len(df), chunk_size):
+            buffer = io.StringIO()
+            df.iloc[start:start + chunk_size].to_csv(buffer, index=False, header=False, na_rep=self.COPY_NULL)
+            buffer.seek(0)
+            cursor.copy_expert(copy_query, buffer)
+
+        return len(df)
                 
                 
-    def upsert_table_data(self, table_name: str, df: pd.DataFrame, adjust_dataframe: bool = False) -> None:
+    def _count_duplicate_keys(self, cursor, table_name: str, key_columns: List[str]) -> int:
+        # Conta as chaves repetidas da tabela de destino; linhas com chave ausente não
+        # entram no índice único e não são contadas.
+        keys = sql.SQL(', ').join([sql.Identifier(c) for c in key_columns])
+        cursor.execute(sql.SQL("""
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM {table} WHERE {not_null} GROUP BY {keys} HAVING COUNT(*) > 1
+            ) AS duplicadas
+        """).format(
+            table=sql.Identifier(self.schema, table_name),
+            not_null=sql.SQL(' AND ').join([sql.SQL("{} IS NOT NULL").format(sql.Identifier(c)) for c in key_columns]),
+            keys=keys
+        ))
+        return cursor.fetchone()[0]
+
+    def upsert_table_data(self, 
+                          table_name: str, 
+                          df: pd.DataFrame, 
+                          adjust_dataframe: bool = False, 
+                          key_columns: Optional[List[str]] = None,
+                          chunk_size: int = COPY_CHUNK_SIZE) -> int:
+        # Upsert em lote: o DataFrame é carregado com COPY em uma tabela temporária e
+        # aplicado com um único INSERT ... SELECT ... ON CONFLICT (chave composta), que só
+        # reescreve as linhas cujos valores mudaram. A chave padrão são as colunas de
+        # dimensão (ver `dimension_columns`) e não pode conter valores ausentes. Chaves
+        # repetidas no DataFrame valem pela última ocorrência.
         if adjust_dataframe:
             df.columns = [self.format_string(col) for col in df.columns]
+            if key_columns is not None:
+                key_columns = [self.format_string(col) for col in key_columns]
 
-        if self.table_exists(table_name):
-            try:
-                cursor = self.connector.cursor()
-                colunas = sql.SQL(', ').join([sql.Identifier(c) for c in df.columns])
-                placeholders = sql.SQL(', ').join(sql.Placeholder() * len(df.columns))
-                key_column = 'tabela'  # Adjust as necessary to match your key column name
-
-                # SQL para UPSERT
-                upsert_query = sql.SQL("""
-                    INSERT INTO {table} ({columns})
-                    VALUES ({values})
-                    ON CONFLICT ({key_column})
-                    DO UPDATE SET
-                    {assignments}
-                """).format(
-                    table=sql.Identifier(self.schema, table_name),
-                    columns=colunas,
-                    values=placeholders,
-                    key_column=sql.Identifier(key_column),
+        if not self.table_exists(table_name):
+            print(f"A tabela '{table_name}' não existe.")
+            return 0
+
+        try:
+            cursor = self.connector.cursor()
+            column_types = self.infer_column_types(df)
+            df = self._cast_columns(df, column_types)
+            if key_columns is None:
+                key_columns = self.dimension_columns(column_types)
+            if not key_columns:
+                raise ValueError("Nenhuma coluna de chave para o upsert.")
+            if df[key_columns].isna().any().any():
+                raise ValueError(f"As colunas de chave {key_columns} não podem conter valores ausentes.")
+
+            table = sql.Identifier(self.schema, table_name)
+            staging_name = f"stg_{table_name}"[:self.MAX_IDENTIFIER]
+            staging = sql.Identifier(staging_name)
+            columns = sql.SQL(', ').join([sql.Identifier(c) for c in df.columns])
+            keys = sql.SQL(', ').join([sql.Identifier(c) for c in key_columns])
+            value_columns = [c for c in df.columns if c not in key_columns]
+
+            # ON CONFLICT exige um índice único na chave composta. Em uma tabela que já
+            # tem linhas repetidas na chave, o índice não pode ser criado: as duplicatas
+            # são relatadas e o upsert é interrompido, sem alterar a tabela.
+            index_name = self._index_name(table_name, 'key_' + '_'.join(map(str, key_columns)))
+            cursor.execute("SELECT 1 FROM pg_indexes WHERE schemaname = %s AND indexname = %s",
+                           (self.schema, index_name))
+            if cursor.fetchone() is None:
+                duplicates = self._count_duplicate_keys(cursor, table_name, key_columns)
+                if duplicates:
+                    self.connector.rollback()
+                    cursor.close()
+                    print(f"A tabela '{table_name}' tem {duplicates} chave(s) {key_columns} repetida(s); "
+                          f"remova as linhas duplicadas antes do upsert.")
+                    return 0
+                cursor.execute(sql.SQL("CREATE UNIQUE INDEX IF NOT EXISTS {} ON {} ({})").format(
+                    sql.Identifier(index_name),
+                    table,
+                    keys
+                ))
+
+            # Tabela temporária com os mesmos tipos das colunas de destino, descartada no commit;
+            # a coluna de sequência guarda a ordem de chegada das linhas no COPY
+            cursor.execute(sql.SQL("CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA").format(
+                staging, columns, table
+            ))
+            cursor.execute(sql.SQL("ALTER TABLE {} ADD COLUMN {} BIGINT GENERATED ALWAYS AS IDENTITY").format(
+                staging, sql.Identifier(self.STAGING_SEQUENCE)
+            ))
+            self._copy_dataframe(cursor, staging_name, df, chunk_size, schema='pg_temp')
+
+            if value_columns:
+                on_conflict = sql.SQL("DO UPDATE SET {assignments} WHERE ({current}) IS DISTINCT FROM ({incoming})").format(
                     assignments=sql.SQL(', ').join([
-                        sql.SQL("{column} = EXCLUDED.{column}").format(column=sql.Identifier(c))
-                        for c in df.columns if c != key_column
-                    ])
+                        sql.SQL("{column} = EXCLUDED.{column}").format(column=sql.Identifier(c)) for c in value_columns
+                    ]),
+                    current=sql.SQL(', ').join([sql.SQL("{}.{}").format(sql.Identifier(table_name), sql.Identifier(c))
+                                                for c in value_columns]),
+                    incoming=sql.SQL(', ').join([sql.SQL("EXCLUDED.{}").format(sql.Identifier(c)) for c in value_columns])
                 )
+            else:
+                on_conflict = sql.SQL("DO NOTHING")
+
+            # DISTINCT ON: uma mesma linha de destino não pode ser alterada duas vezes no mesmo
+            # comando; a ordem decrescente da sequência mantém a última ocorrência de cada chave
+            cursor.execute(sql.SQL("""
+                INSERT INTO {table} AS {alias} ({columns})
+                SELECT DISTINCT ON ({keys}) {columns} FROM {staging}
+                ORDER BY {keys}, {sequence} DESC
+                ON CONFLICT ({keys}) {on_conflict}
+            """).format(
+                table=table,
+                alias=sql.Identifier(table_name),
+                columns=columns,
+                keys=keys,
+                staging=staging,
+                sequence=sql.Identifier(self.STAGING_SEQUENCE),
+                on_conflict=on_conflict
+            ))
+            changed = cursor.rowcount
 
-                # Executa upsert para cada linha
-                for row in df.itertuples(index=False):
-                    valores = tuple(row)
-                    cursor.execute(upsert_query, valores)
-                self.connector.commit()
-                cursor.close()
-            except Exception as e:
-                print(f"Erro ao inserir/atualizar dados na tabela '{table_name}': {e}")
-        else:
-            print(f"A tabela '{table_name}' não existe.")
+            self.connector.commit()
+            cursor.close()
+            print(f"Upsert na tabela '{table_name}': {changed} de {len(df)} linha(s) inseridas ou alteradas.")
+            return changed
+        except Exception as e:
+            self.connector.rollback()
+            print(f"Erro ao inserir/atualizar dados na tabela '{table_name}': {e}")
+            return 0
 
 
     def read_table_columns(self, table_name: str, columns: list, return_type: str = "list") -> list:
@@ -0,0 +1,113 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+
+class FingerprintStore:
+    """
+    Armazena, por tabela, a impressão digital dos metadados da última extração bem-sucedida.
+
+    A impressão combina `periodicidade.fim` com o hash do documento `/metadados`
+    completo, de modo que um novo período, uma nova variável ou categoria ou
+    qualquer data de atualização publicada no documento alteram a impressão.
+    Tabelas com a mesma impressão da última execução podem ser ignoradas.
+    `set` altera apenas a memória; o arquivo é reescrito uma vez por `flush`, ao fim
+    da extração, em vez de uma vez por tabela.
+
+    Atributos:
+    ----------
+    path : str
+        Caminho do arquivo JSON com as impressões.
+    fingerprints : dict
+        Impressões carregadas, indexadas pelo número da tabela.
+    """
+
+    NEW = 'nova'
+    CHANGED = 'alterada'
+    UNCHANGED = 'inalterada'
+
+    def __init__(self, path: str) -> None:
+        """
+        Inicializa o armazenamento, carregando as impressões existentes.
+
+        Parâmetros:
+        -----------
+        path : str
+            Caminho do arquivo JSON.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.fingerprints = self._load()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logging.error(f"Erro ao carregar as impressões de metadados de {self.path}: {e}")
+            return {}
+
+    @staticmethod
+    def compute(metadata: dict) -> str:
+        """
+        Calcula a impressão digital de um documento `/metadados`.
+
+        Parâmetros:
+        -----------
+        metadata : dict
+            Metadados da tabela retornados por `SidraManager.sidra_get_metadata`.
+
+        Retorna:
+        --------
+        str
+            Impressão no formato "<periodicidade.fim>|<sha1 do documento>".
+        """
+        fim = (metadata.get('periodicidade') or {}).get('fim')
+        document = json.dumps(metadata, sort_keys=True, ensure_ascii=False, default=str)
+        return f"{fim}|{hashlib.sha1(document.encode('utf-8')).hexdigest()}"
+
+    def status(self, table, fingerprint: str) -> str:
+        """
+        Compara a impressão atual com a da última extração bem-sucedida.
+
+        Retorna:
+        --------
+        str
+            `NEW`, `CHANGED` ou `UNCHANGED`.
+        """
+        stored = self.fingerprints.get(str(table))
+        if stored is None or not fingerprint:
+            return self.NEW
+        return self.UNCHANGED if stored['impressao'] == fingerprint else self.CHANGED
+
+    def set(self, table, fingerprint: str) -> None:
+        """
+        Registra a impressão da extração bem-sucedida; o arquivo é gravado por `flush`.
+        """
+        with self._lock:
+            self.fingerprints[str(table)] = {
+                'impressao': fingerprint,
+                'atualizado_em': datetime.now().isoformat(timespec='seconds'),
+            }
+            self._dirty = True
+
+    def flush(self) -> None:
+        """
+        Persiste o arquivo, se houver impressões novas desde a última gravação.
+        """
+        with self._lock:
+            if self._dirty:
+                self._save()
+                self._dirty = False
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.fingerprints, file, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
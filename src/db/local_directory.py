@@ -1,16 +1,216 @@
 import os
 import shutil
+import threading
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from copy import copy
 from openpyxl import load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle
 from openpyxl.utils import get_column_letter
 
+from src.utils.utils import concatenar_compacto, relatorio_memoria
+
+
+class ExcelTemplate:
+    """Template da aba de descrição, lido uma única vez e reaplicado em vários arquivos.
+
+    Na leitura, a formatação de cada célula do template (fonte, borda, preenchimento,
+    formato numérico e alinhamento) é convertida em um estilo nomeado; células com a
+    mesma formatação compartilham o mesmo estilo. Aplicar o template a uma planilha
+    consiste em registrar esses poucos estilos no arquivo e atribuir o nome do estilo
+    a cada célula, escrevendo as linhas em bloco com `append`.
+
+    Os templates lidos ficam em cache por processo (pelo caminho e pela data de
+    modificação do arquivo); use `ExcelTemplate.load` em vez do construtor.
+
+    Args:
+        template_path (str): Caminho para o arquivo de template.
+
+    Attributes:
+        widths (dict): Largura de cada coluna do template, pela letra da coluna.
+        styles (dict): Atributos de cada estilo nomeado, pelo nome do estilo.
+        cell_styles (dict): Nome do estilo de cada célula (linha, coluna) do template.
+    """
+    _cache = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, template_path):
+        template_wb = load_workbook(template_path)
+        template_sheet = template_wb.active
+
+        self.widths = {}
+        for col_index in range(1, template_sheet.max_column + 1):
+            letter = get_column_letter(col_index)
+            self.widths[letter] = template_sheet.column_dimensions[letter].width
+
+        self.styles = {}
+        self.cell_styles = {}
+        names = {}
+        for row in template_sheet.iter_rows():
+            for cell in row:
+                if not cell.has_style:
+                    continue
+                spec = {'font': copy(cell.font), 'border': copy(cell.border), 'fill': copy(cell.fill),
+                        'number_format': cell.number_format, 'alignment': copy(cell.alignment)}
+                key = tuple(spec.values())
+                if key not in names:
+                    names[key] = f'Template {len(names) + 1}'
+                    self.styles[names[key]] = spec
+                self.cell_styles[(cell.row, cell.column)] = names[key]
+        template_wb.close()
+
+    @classmethod
+    def load(cls, template_path):
+        """Retorna o template do caminho informado, lendo o arquivo apenas na primeira chamada.
+
+        Args:
+            template_path (str): Caminho para o arquivo de template.
+
+        Returns:
+            ExcelTemplate: Template lido (ou recuperado do cache).
+        """
+        key = (os.path.abspath(template_path), os.path.getmtime(template_path))
+        with cls._cache_lock:
+            template = cls._cache.get(key)
+            if template is None:
+                template = cls._cache[key] = cls(template_path)
+        return template
+
+    def _register_styles(self, workbook):
+        for name, spec in self.styles.items():
+            if name not in workbook.named_styles:
+                workbook.add_named_style(NamedStyle(name=name, **{attr: copy(value) for attr, value in spec.items()}))
+
+    def apply(self, sheet, df):
+        """Escreve o DataFrame (sem cabeçalho) em uma planilha vazia com a formatação do template.
+
+        Funciona tanto em planilhas comuns quanto nas de arquivos abertos em modo `write_only`.
+
+        Args:
+            sheet (openpyxl.worksheet.worksheet.Worksheet): Planilha de destino, ainda sem linhas.
+            df (pandas.DataFrame): Dados a serem escritos a partir da célula A1.
+        """
+        self._register_styles(sheet.parent)
+        for letter, width in self.widths.items():
+            sheet.column_dimensions[letter].width = width
+
+        for row_index, values in enumerate(df.itertuples(index=False, name=None), start=1):
+            row = []
+            for col_index, value in enumerate(values, start=1):
+                cell = WriteOnlyCell(sheet, value=value)
+                style = self.cell_styles.get((row_index, col_index))
+                if style is not None:
+                    cell.style = style
+                row.append(cell)
+            sheet.append(row)
+
+
+class TablePartitionWriter:
+    """Escreve as partições de uma tabela lote a lote, sem reunir os dados em memória.
+
+    Cada variável tem o seu próprio `pyarrow.parquet.ParquetWriter`, aberto no primeiro
+    lote; os lotes seguintes são acrescentados como novos grupos de linhas do mesmo
+    arquivo. A escrita ocorre em um diretório temporário que só substitui a partição
+    anterior da tabela em `commit`, como em `DirectoryManager.save_table_partitions`.
+
+    As colunas `category` de lotes diferentes têm categorias (e larguras de índice)
+    diferentes; o esquema do arquivo usa índices de 32 bits para que todos os lotes
+    sejam gravados com o esquema do primeiro.
+
+    Args:
+        table_path (str): Diretório final da tabela (`<camada>/tabela=<id>`).
+        compression (str): Compressão dos arquivos Parquet.
+
+    Attributes:
+        rows (dict): Número de linhas escritas por variável.
+        max_batch_mb (float): Memória ocupada pelo maior lote recebido, em MB.
+    """
+
+    def __init__(self, table_path, compression):
+        self.table_path = table_path
+        self.tmp_path = f'{table_path}.tmp'
+        self.compression = compression
+        self.rows = {}
+        self.max_batch_mb = 0.0
+        self._writers = {}
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    @staticmethod
+    def _schema(schema):
+        fields = [field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+                  if pa.types.is_dictionary(field.type) else field for field in schema]
+        return pa.schema(fields, metadata=schema.metadata)
+
+    def write(self, variavel, df):
+        """Acrescenta um lote à partição de uma variável.
+
+        Args:
+            variavel (str): Código da variável.
+            df (pandas.DataFrame): Lote de dados, com as mesmas colunas dos lotes anteriores.
+        """
+        variavel = str(variavel)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        writer = self._writers.get(variavel)
+        if writer is None:
+            partition = os.path.join(self.tmp_path, f'variavel={variavel}')
+            os.makedirs(partition, exist_ok=True)
+            writer = pq.ParquetWriter(os.path.join(partition, 'part-0.parquet'), self._schema(table.schema),
+                                      compression=self.compression)
+            self._writers[variavel] = writer
+            self.rows[variavel] = 0
+        writer.write_table(table.cast(writer.schema))
+        self.rows[variavel] += len(df)
+        self.max_batch_mb = max(self.max_batch_mb, relatorio_memoria(df)['memoria_mb'])
+
+    def discard(self, variavel):
+        """Descarta a partição de uma variável (ex.: após uma falha no meio da leitura)."""
+        variavel = str(variavel)
+        writer = self._writers.pop(variavel, None)
+        if writer is not None:
+            writer.close()
+        self.rows.pop(variavel, None)
+        shutil.rmtree(os.path.join(self.tmp_path, f'variavel={variavel}'), ignore_errors=True)
+
+    def _close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    def commit(self):
+        """Fecha os arquivos e substitui a partição anterior da tabela."""
+        self._close()
+        shutil.rmtree(self.table_path, ignore_errors=True)
+        os.replace(self.tmp_path, self.table_path)
+
+    def abort(self):
+        """Fecha os arquivos e descarta a escrita, mantendo a partição anterior da tabela."""
+        self._close()
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+
 class DirectoryManager:
     """Gerencia diretórios locais para organizar e processar arquivos.
 
     Esta classe fornece métodos para criar diretórios, listar arquivos, 
     organizar arquivos em subpastas e processar arquivos de template.
 
+    As camadas bronze, silver e gold são armazenadas em Parquet comprimido
+    (colunar). Os dados da camada silver são particionados por tabela e variável
+    (`silver/tabela=<id>/variavel=<id>/part-0.parquet`); o Excel fica restrito à
+    exportação final da camada gold.
+
     Args:
         base_directory (str): O diretório base onde os diretórios "gold", "silver" e "bronze" serão criados. 
             O padrão é um diretório "data" na raiz do projeto.
@@ -22,6 +222,8 @@ class DirectoryManager:
         origin_directory (str): O diretório de origem dos arquivos a serem organizados.
         destiny_directory (str): O diretório de destino onde os arquivos organizados serão armazenados.
     """
+    PARQUET_COMPRESSION = 'zstd'
+
     def __init__(self, 
                  base_directory: str = os.path.join(os.path.dirname(__file__), "..", "..", "data"), 
                  origin_directory: str = None, 
@@ -49,6 +251,157 @@ class DirectoryManager:
         
         return directories
 
+    def _layer_path(self, layer, *parts):
+        return os.path.join(self.base_directory, layer, *parts)
+
+    @staticmethod
+    def _as_text(df):
+        """Converte todas as colunas para texto (ou None), preservando inteiros sem o sufixo '.0'.
+
+        Usado nos metadados, cujas colunas misturam números, textos e dicionários.
+        """
+        df = df.copy()
+        for col in df.columns:
+            serie = df[col]
+            if pd.api.types.is_float_dtype(serie) and serie.dropna().mod(1).eq(0).all():
+                serie = serie.astype('Int64')
+            df[col] = serie.map(lambda v: None if v is None or v is pd.NA or (isinstance(v, float) and pd.isna(v)) else str(v))
+        return df
+
+    def save_parquet(self, df, layer, name, as_text=False):
+        """Salva um DataFrame como `<layer>/<name>.parquet`.
+
+        Args:
+            df (pandas.DataFrame): DataFrame a ser salvo.
+            layer (str): Camada de destino ("bronze", "silver" ou "gold").
+            name (str): Nome do arquivo, sem extensão.
+            as_text (bool): Converte todas as colunas para texto antes de salvar.
+
+        Returns:
+            str: Caminho do arquivo salvo.
+        """
+        path = self._layer_path(layer, f'{name}.parquet')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        (self._as_text(df) if as_text else df).to_parquet(path, index=False, compression=self.PARQUET_COMPRESSION)
+        return path
+
+    def load_parquet(self, layer, name):
+        """Lê o arquivo `<layer>/<name>.parquet`.
+
+        Returns:
+            pandas.DataFrame: Dados lidos.
+        """
+        return pd.read_parquet(self._layer_path(layer, f'{name}.parquet'))
+
+    def table_partition_path(self, layer, tabela, variavel=None):
+        """Retorna o diretório da partição de uma tabela (e, opcionalmente, de uma variável)."""
+        parts = [f'tabela={tabela}']
+        if variavel is not None:
+            parts.append(f'variavel={variavel}')
+        return self._layer_path(layer, *parts)
+
+    def save_table_partitions(self, pages, layer, tabela):
+        """Salva os dados de uma tabela particionados por variável, substituindo a partição anterior.
+
+        Args:
+            pages (dict): DataFrames indexados pelo código da variável.
+            layer (str): Camada de destino.
+            tabela (str): Número da tabela.
+        """
+        table_path = self.table_partition_path(layer, tabela)
+        tmp_path = f'{table_path}.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+        for variavel, df in pages.items():
+            partition = os.path.join(tmp_path, f'variavel={variavel}')
+            os.makedirs(partition, exist_ok=True)
+            df.to_parquet(os.path.join(partition, 'part-0.parquet'), index=False, compression=self.PARQUET_COMPRESSION)
+
+        shutil.rmtree(table_path, ignore_errors=True)
+        os.replace(tmp_path, table_path)
+
+    def table_writer(self, layer, tabela):
+        """Abre a escrita em lotes das partições de uma tabela (ver `TablePartitionWriter`).
+
+        Args:
+            layer (str): Camada de destino.
+            tabela (str): Número da tabela.
+
+        Returns:
+            TablePartitionWriter: Escritor com um `ParquetWriter` por variável.
+        """
+        return TablePartitionWriter(self.table_partition_path(layer, tabela), self.PARQUET_COMPRESSION)
+
+    def list_table_variables(self, layer, tabela):
+        """Lista as variáveis com partição em uma tabela da camada.
+
+        Returns:
+            list: Códigos das variáveis (str), em ordem numérica.
+        """
+        table_path = self.table_partition_path(layer, tabela)
+        if not os.path.isdir(table_path):
+            return []
+
+        variaveis = [d.split('=', 1)[1] for d in os.listdir(table_path) if d.startswith('variavel=')]
+        variaveis.sort(key=lambda v: (not v.isdigit(), int(v) if v.isdigit() else v))
+        return variaveis
+
+    def _partition_files(self, layer, tabela, variavel):
+        partition = self.table_partition_path(layer, tabela, variavel)
+        return [os.path.join(partition, f) for f in sorted(os.listdir(partition)) if f.endswith('.parquet')]
+
+    def load_table_partitions(self, layer, tabela):
+        """Lê todas as partições de variável de uma tabela.
+
+        Returns:
+            dict: DataFrames indexados pelo código da variável, em ordem numérica.
+        """
+        pages = {}
+        for variavel in self.list_table_variables(layer, tabela):
+            frames = [pd.read_parquet(path) for path in self._partition_files(layer, tabela, variavel)]
+            pages[variavel] = concatenar_compacto(frames)
+        return pages
+
+    def iter_partition_batches(self, layer, tabela, variavel, batch_size=50_000):
+        """Lê a partição de uma variável em lotes, sem carregá-la inteira em memória.
+
+        Args:
+            layer (str): Camada de origem.
+            tabela (str): Número da tabela.
+            variavel (str): Código da variável.
+            batch_size (int): Número máximo de linhas por lote.
+
+        Yields:
+            pandas.DataFrame: Lotes da partição, na ordem dos arquivos.
+        """
+        for path in self._partition_files(layer, tabela, variavel):
+            parquet_file = pq.ParquetFile(path)
+            try:
+                for batch in parquet_file.iter_batches(batch_size=batch_size):
+                    yield batch.to_pandas()
+            finally:
+                parquet_file.close()
+
+    def iter_table_partitions(self, layer, tabela, batch_size=50_000):
+        """Percorre as variáveis de uma tabela, entregando os dados de cada uma em lotes.
+
+        Returns:
+            Iterator: Pares (código da variável, iterador de lotes), em ordem numérica.
+        """
+        for variavel in self.list_table_variables(layer, tabela):
+            yield variavel, self.iter_partition_batches(layer, tabela, variavel, batch_size)
+
+    def list_partitioned_tables(self, layer):
+        """Lista os números das tabelas com partições na camada.
+
+        Returns:
+            list: Números das tabelas (str).
+        """
+        path = self._layer_path(layer)
+        if not os.path.isdir(path):
+            return []
+        return sorted(d.split('=', 1)[1] for d in os.listdir(path) if d.startswith('tabela=') and not d.endswith('.tmp'))
+
     def _list_files(self):
         """Lista arquivos no diretório de origem.
 
@@ -95,38 +448,22 @@ class DirectoryManager:
             df = df.merge(df_folders, on='tabela', how='inner') 
             self._organize_files(df)
 
-    def process_template_file(self, df, template_path, existing_file_path, tabela):
-        """Processa arquivos de template e adiciona dados de um DataFrame.
+    @staticmethod
+    def write_description_sheet(workbook, df, template_path, index=0):
+        """Cria a aba "Descrição" em um arquivo em construção e a preenche com o template.
+
+        Usado na geração da camada gold antes das abas de dados, para que o arquivo
+        seja escrito uma única vez.
 
         Args:
-            df (pandas.DataFrame): DataFrame contendo os dados a serem adicionados ao template.
+            workbook (openpyxl.Workbook): Arquivo de destino.
+            df (pandas.DataFrame): DataFrame com a descrição da tabela.
             template_path (str): Caminho para o arquivo de template.
-            existing_file_path (str): Caminho para o arquivo existente onde os dados serão adicionados.
-            tabela (str): Nome da tabela para o arquivo de saída.
+            index (int): Posição da aba no arquivo (padrão é 0, a primeira).
+
+        Returns:
+            openpyxl.worksheet.worksheet.Worksheet: Aba criada.
         """
-        template_wb = load_workbook(template_path)
-        existing_wb = load_workbook(existing_file_path)
-        
-        template_sheet = template_wb.active
-        new_sheet = existing_wb.create_sheet("Descrição", index=0)  # Nomeia a nova aba
-        
-        for col in template_sheet.columns:
-            for cell in col:
-                new_col_letter = get_column_letter(cell.column)
-                new_sheet.column_dimensions[new_col_letter].width = template_sheet.column_dimensions[new_col_letter].width
-                break  
-
-        for row_index, (index, row) in enumerate(df.iterrows(), start=1):
-            for col_index, (key, value) in enumerate(row.items(), start=1):
-                new_cell = new_sheet.cell(row=row_index, column=col_index)
-                new_cell.value = value
-
-                template_cell = template_sheet.cell(row=row_index, column=col_index)
-                if template_cell.has_style:
-                    new_cell.font = copy(template_cell.font)
-                    new_cell.border = copy(template_cell.border)
-                    new_cell.fill = copy(template_cell.fill)
-                    new_cell.number_format = template_cell.number_format
-                    new_cell.alignment = copy(template_cell.alignment)
-
-        existing_wb.save(os.path.join(self.destiny_directory, f'Tabela {tabela}.xlsx'))
+        sheet = workbook.create_sheet("Descrição", index=index)
+        ExcelTemplate.load(template_path).apply(sheet, df)
+        return sheet
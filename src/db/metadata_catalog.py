@@ -0,0 +1,161 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from src.db.local_directory import DirectoryManager
+
+
+class MetadataCatalog:
+    """
+    Catálogo persistente e indexado dos metadados (tabela, variáveis e categorias) por tabela.
+
+    Cada tabela ocupa uma linha em SQLite, indexada pelo número da tabela, com a
+    linha da tabela e as suas variáveis e categorias serializadas. A consulta de uma
+    tabela é uma busca pela chave primária, sem ler nem filtrar os metadados das
+    demais, e `batch_info` atualiza o catálogo tabela a tabela, à medida que os
+    metadados chegam.
+
+    Os valores são armazenados como texto (ou None), como nos arquivos consolidados
+    da camada bronze.
+
+    Atributos:
+    ----------
+    path : str
+        Caminho do arquivo SQLite do catálogo.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Inicializa o catálogo, criando a tabela se necessário.
+
+        Parâmetros:
+        -----------
+        path : str
+            Caminho do arquivo SQLite.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connector = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connector.execute("PRAGMA journal_mode=WAL")
+        self.connector.execute("""
+            CREATE TABLE IF NOT EXISTS tables (
+                tabela TEXT PRIMARY KEY,
+                info TEXT NOT NULL,
+                variables TEXT NOT NULL,
+                categories TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self.connector.commit()
+
+    @staticmethod
+    def _dump(df: pd.DataFrame) -> str:
+        df = DirectoryManager._as_text(df).astype(object)
+        df = df.where(df.notna(), None)
+        return json.dumps({'columns': [str(col) for col in df.columns], 'data': df.values.tolist()}, ensure_ascii=False)
+
+    @staticmethod
+    def _load(document: str) -> pd.DataFrame:
+        document = json.loads(document)
+        return pd.DataFrame(document['data'], columns=document['columns'], dtype=object)
+
+    def upsert(self, tabela, df_table: pd.DataFrame, df_variables: pd.DataFrame, df_categories: pd.DataFrame) -> None:
+        """
+        Insere ou substitui os metadados de uma tabela.
+
+        Parâmetros:
+        -----------
+        tabela : int | str
+            Número da tabela.
+        df_table : pd.DataFrame
+            Linha da tabela (ver `SidraManager.sidra_process_table`).
+        df_variables : pd.DataFrame
+            Variáveis da tabela.
+        df_categories : pd.DataFrame
+            Categorias da tabela.
+        """
+        row = (str(tabela), self._dump(df_table), self._dump(df_variables), self._dump(df_categories),
+               datetime.now().isoformat(timespec='seconds'))
+        with self._lock:
+            self.connector.execute(
+                "INSERT OR REPLACE INTO tables (tabela, info, variables, categories, updated_at) VALUES (?, ?, ?, ?, ?)", row
+            )
+            self.connector.commit()
+
+    def get(self, tabela) -> Optional[Tuple[pd.Series, pd.DataFrame, pd.DataFrame]]:
+        """
+        Retorna os metadados de uma tabela.
+
+        Retorna:
+        --------
+        Optional[Tuple[pd.Series, pd.DataFrame, pd.DataFrame]]
+            Linha da tabela, variáveis e categorias; None se a tabela não estiver no catálogo.
+        """
+        with self._lock:
+            row = self.connector.execute(
+                "SELECT info, variables, categories FROM tables WHERE tabela = ?", (str(tabela),)
+            ).fetchone()
+        if row is None:
+            return None
+
+        df_table = self._load(row[0])
+        if df_table.empty:
+            return None
+        return df_table.iloc[0], self._load(row[1]), self._load(row[2])
+
+    def table_ids(self) -> List[str]:
+        """
+        Lista os números das tabelas do catálogo.
+        """
+        with self._lock:
+            return [row[0] for row in self.connector.execute("SELECT tabela FROM tables ORDER BY tabela")]
+
+    def entries(self, tables=None) -> Iterator[Tuple[pd.Series, pd.DataFrame, pd.DataFrame]]:
+        """
+        Percorre os metadados das tabelas sob demanda, uma consulta por tabela.
+
+        Parâmetros:
+        -----------
+        tables : Iterable, opcional
+            Tabelas desejadas, na ordem de extração; se omitido, todas as do catálogo.
+            Tabelas ausentes do catálogo são registradas e ignoradas.
+        """
+        for tabela in (self.table_ids() if tables is None else tables):
+            entry = self.get(tabela)
+            if entry is None:
+                logging.warning(f"Tabela {tabela} sem metadados no catálogo; execute `batch_info` antes da extração.")
+                continue
+            yield entry
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connector.execute("SELECT COUNT(*) FROM tables").fetchone()[0]
+
+    def import_frames(self, df_tables: pd.DataFrame, df_variables: pd.DataFrame, df_categories: pd.DataFrame) -> int:
+        """
+        Carrega no catálogo os metadados consolidados (`_tables_adjusted_` etc.) de uma versão anterior.
+
+        Retorna:
+        --------
+        int
+            Número de tabelas importadas.
+        """
+        variables = dict(tuple(df_variables.groupby('Tabela', sort=False)))
+        categories = dict(tuple(df_categories.groupby('Tabela', sort=False)))
+        for _, row in df_tables.iterrows():
+            tabela = row['id']
+            self.upsert(tabela, row.to_frame().T,
+                        variables.get(tabela, df_variables.iloc[0:0]),
+                        categories.get(tabela, df_categories.iloc[0:0]))
+        return len(df_tables)
+
+    def close(self) -> None:
+        self.connector.close()
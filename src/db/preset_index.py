@@ -0,0 +1,201 @@
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import List, Optional
+
+DEFAULT_PRESET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "preset-tables.json")
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", ".cache", "preset_tables.sqlite")
+
+_FIELDS = ('tabela', 'fonte', 'sigla', 'banco', 'pasta', 'subpasta', 'variaveis', 'url')
+_FILTERS = ('pasta', 'subpasta', 'banco', 'sigla', 'fonte')
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+class PresetTableIndex:
+    """
+    Índice pré-compilado em SQLite do catálogo de tabelas predefinidas (`data/preset-tables.json`).
+
+    O JSON é lido uma única vez e convertido em uma tabela com índices nos campos de
+    pasta (`pasta`, `subpasta`, `banco`, `sigla`, `fonte`) e em um índice de texto
+    completo (FTS5, sem distinção de acentos) sobre `variaveis` e `banco`. O índice só
+    é reconstruído quando o conteúdo do JSON muda; nas demais execuções, a abertura
+    custa apenas a comparação do tamanho e da data de modificação do arquivo.
+
+    Atributos:
+    ----------
+    json_path : str
+        Caminho do arquivo JSON de origem.
+    index_path : str
+        Caminho do arquivo SQLite do índice.
+    """
+
+    def __init__(self, json_path: str = DEFAULT_PRESET_PATH, index_path: str = DEFAULT_INDEX_PATH) -> None:
+        """
+        Abre o índice, reconstruindo-o se o JSON de origem tiver mudado.
+
+        Parâmetros:
+        -----------
+        json_path : str, opcional
+            Caminho do arquivo JSON (padrão é `data/preset-tables.json`).
+        index_path : str, opcional
+            Caminho do índice (padrão é `data/.cache/preset_tables.sqlite`).
+        """
+        self.json_path = json_path
+        self.index_path = index_path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        self.connector = None
+        self.refresh()
+
+    @staticmethod
+    def _stat(path: str) -> str:
+        stat = os.stat(path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    @staticmethod
+    def _digest(path: str) -> str:
+        sha1 = hashlib.sha1()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                sha1.update(block)
+        return sha1.hexdigest()
+
+    def _meta(self, key: str) -> Optional[str]:
+        try:
+            row = self.connector.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return row[0] if row else None
+
+    def _connect(self) -> None:
+        if self.connector is not None:
+            self.connector.close()
+        self.connector = sqlite3.connect(self.index_path, check_same_thread=False)
+
+    def refresh(self) -> bool:
+        """
+        Reconstrói o índice se o JSON de origem mudou desde a última construção.
+
+        Retorna:
+        --------
+        bool
+            True se o índice foi reconstruído.
+        """
+        with self._lock:
+            self._connect()
+            stat = self._stat(self.json_path)
+            if self._meta('stat') == stat:
+                return False
+
+            digest = self._digest(self.json_path)
+            if self._meta('sha1') == digest:
+                self.connector.execute("UPDATE meta SET value = ? WHERE key = 'stat'", (stat,))
+                self.connector.commit()
+                return False
+
+            self.connector.close()
+            self._build(stat, digest)
+            self._connect()
+            return True
+
+    def _build(self, stat: str, digest: str) -> None:
+        with open(self.json_path, 'r', encoding='utf-8-sig') as file:
+            presets = json.load(file)
+
+        rows = [tuple(str(item.get(field) or '') for field in _FIELDS) for item in presets]
+        tmp_path = f"{self.index_path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        connector = sqlite3.connect(tmp_path)
+        try:
+            connector.executescript(f"""
+                CREATE TABLE presets ({', '.join(f'{field} TEXT' for field in _FIELDS)});
+                {' '.join(f'CREATE INDEX idx_presets_{field} ON presets ({field});' for field in _FILTERS)}
+                CREATE VIRTUAL TABLE presets_fts USING fts5(
+                    variaveis, banco, content='presets', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+                );
+                CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            """)
+            connector.executemany(f"INSERT INTO presets VALUES ({', '.join('?' for _ in _FIELDS)})", rows)
+            connector.execute("INSERT INTO presets_fts (rowid, variaveis, banco) SELECT rowid, variaveis, banco FROM presets")
+            connector.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [('stat', stat), ('sha1', digest)])
+            connector.commit()
+        finally:
+            connector.close()
+
+        os.replace(tmp_path, self.index_path)
+        logging.info(f"Índice das tabelas predefinidas reconstruído: {len(rows)} tabela(s).")
+
+    @staticmethod
+    def _match_expression(text: str) -> Optional[str]:
+        # Cada palavra vira um prefixo entre aspas: a busca exige todas as palavras e
+        # não interpreta a sintaxe do FTS5 digitada pelo usuário.
+        words = _WORD.findall(text or '')
+        return ' '.join(f'"{word}"*' for word in words) or None
+
+    def search(self,
+               text: Optional[str] = None,
+               pasta: Optional[str] = None,
+               subpasta: Optional[str] = None,
+               banco: Optional[str] = None,
+               sigla: Optional[str] = None,
+               fonte: Optional[str] = None,
+               limit: Optional[int] = None) -> List[int]:
+        """
+        Retorna os números das tabelas que atendem à busca e aos filtros.
+
+        Parâmetros:
+        -----------
+        text : str, opcional
+            Palavras buscadas em `variaveis` e `banco` (todas obrigatórias, por prefixo e
+            sem distinção de acentos ou maiúsculas). Os resultados são ordenados por relevância.
+        pasta, subpasta, banco, sigla, fonte : str, opcional
+            Filtros exatos nos campos correspondentes.
+        limit : int, opcional
+            Número máximo de resultados.
+
+        Retorna:
+        --------
+        List[int]
+            Números das tabelas, prontos para `Main(list_of_tables=...)`.
+        """
+        filters = {'pasta': pasta, 'subpasta': subpasta, 'banco': banco, 'sigla': sigla, 'fonte': fonte}
+        conditions = [f"p.{field} = ?" for field, value in filters.items() if value is not None]
+        params = [value for value in filters.values() if value is not None]
+
+        match = self._match_expression(text)
+        if match:
+            query = "SELECT p.tabela FROM presets_fts JOIN presets p ON p.rowid = presets_fts.rowid WHERE presets_fts MATCH ?"
+            params.insert(0, match)
+            order = "bm25(presets_fts)"
+        else:
+            query = "SELECT p.tabela FROM presets p WHERE 1 = 1"
+            order = "CAST(p.tabela AS INTEGER)"
+        for condition in conditions:
+            query += f" AND {condition}"
+        query += f" ORDER BY {order}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self.connector.execute(query, params).fetchall()
+        return [int(row[0]) for row in rows if row[0].isdigit()]
+
+    def folders(self) -> List[tuple]:
+        """
+        Lista as combinações de `pasta` e `subpasta` com o número de tabelas de cada uma.
+        """
+        with self._lock:
+            return self.connector.execute(
+                "SELECT pasta, subpasta, COUNT(*) FROM presets GROUP BY pasta, subpasta ORDER BY pasta, subpasta"
+            ).fetchall()
+
+    def close(self) -> None:
+        self.connector.close()
@@ -0,0 +1,233 @@
+import os
+import re
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+
+class ResponseCache:
+    """
+    Cache persistente em disco (SQLite) para as respostas das APIs do SIDRA e do IBGE.
+
+    As respostas são indexadas pela URL normalizada e expiram de acordo com o tipo
+    de endpoint: metadados e períodos históricos fechados vivem por muito tempo,
+    enquanto consultas `p/last` e períodos em aberto expiram rapidamente. Quando o
+    tamanho total ultrapassa `max_bytes`, as entradas menos usadas recentemente são
+    removidas (LRU).
+
+    Atributos:
+    ----------
+    path : str
+        Caminho do arquivo SQLite do cache.
+    max_bytes : int
+        Tamanho máximo do cache em bytes (conteúdo comprimido).
+    ttl : dict
+        Tempo de vida, em segundos, para cada tipo de endpoint.
+    hits, misses, evictions : int
+        Contadores de acertos, falhas e remoções do cache.
+    """
+
+    DEFAULT_TTL = {
+        'metadata': 30 * 24 * 3600,    # /metadados e /localidades
+        'closed': 365 * 24 * 3600,     # períodos históricos já encerrados
+        'last': 6 * 3600,              # p/last e p/all
+        'default': 24 * 3600,          # demais consultas
+    }
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024, ttl: dict = None) -> None:
+        """
+        Inicializa o cache, criando o arquivo SQLite se necessário.
+
+        Parâmetros:
+        -----------
+        path : str
+            Caminho do arquivo SQLite.
+        max_bytes : int, opcional
+            Tamanho máximo do cache (padrão é 512 MB).
+        ttl : dict, opcional
+            Sobrescreve os tempos de vida padrão por tipo de endpoint.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = {**self.DEFAULT_TTL, **(ttl or {})}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # O cache pode ser compartilhado por processos paralelos (ver `src.main.shards`)
+        self.connector = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.connector.execute("PRAGMA journal_mode=WAL")
+        self.connector.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.connector.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)")
+        self.connector.commit()
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """
+        Normaliza a URL para uso como chave: esquema e host em minúsculas,
+        barras duplicadas e finais removidas e parâmetros de query ordenados.
+        """
+        parts = urlparse(url.strip())
+        path = re.sub(r'/{2,}', '/', parts.path).rstrip('/')
+        query = urlencode(sorted(parse_qsl(parts.query)))
+        return urlunparse((parts.scheme.lower(), parts.netloc.lower(), path, '', query, ''))
+
+    def ttl_for(self, url: str) -> int:
+        """
+        Define o tempo de vida de uma resposta a partir do endpoint da URL.
+
+        Parâmetros:
+        -----------
+        url : str
+            URL (normalizada ou não) da requisição.
+
+        Retorna:
+        --------
+        int
+            Tempo de vida em segundos.
+        """
+        path = urlparse(url).path.lower()
+        if path.endswith('/metadados') or '/localidades/' in path:
+            return self.ttl['metadata']
+        if re.search(r'/p/(last|all|first)\b', path):
+            return self.ttl['last']
+
+        match = re.search(r'/p/(\d{4})\d{0,2}(?:-(\d{4})\d{0,2})?(?:/|$)', path)
+        if match:
+            ano_final = int(match.group(2) or match.group(1))
+            if ano_final < datetime.now().year:
+                return self.ttl['closed']
+        return self.ttl['default']
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha1(self.normalize_url(url).encode('utf-8')).hexdigest()
+
+    def get(self, url: str):
+        """
+        Retorna o conteúdo armazenado para a URL, ou None se ausente ou expirado.
+
+        Parâmetros:
+        -----------
+        url : str
+            URL da requisição.
+
+        Retorna:
+        --------
+        bytes ou None
+            Corpo da resposta armazenado.
+        """
+        body = self.get_compressed(url)
+        return zlib.decompress(body) if body is not None else None
+
+    def get_compressed(self, url: str):
+        """
+        Retorna o conteúdo armazenado ainda comprimido (zlib), ou None se ausente ou expirado.
+        """
+        key = self._key(url)
+        now = time.time()
+        with self._lock:
+            row = self.connector.execute("SELECT body, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] < now:
+                if row is not None:
+                    self.connector.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.connector.commit()
+                self.misses += 1
+                return None
+
+            self.connector.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.connector.commit()
+            self.hits += 1
+        return row[0]
+
+    def set(self, url: str, content: bytes) -> None:
+        """
+        Armazena o corpo de uma resposta e aplica a remoção LRU se necessário.
+
+        Parâmetros:
+        -----------
+        url : str
+            URL da requisição.
+        content : bytes
+            Corpo da resposta.
+        """
+        self.set_compressed(url, zlib.compress(content))
+
+    def set_compressed(self, url: str, body: bytes) -> None:
+        """
+        Armazena um corpo de resposta já comprimido com zlib.
+        """
+        now = time.time()
+        with self._lock:
+            self.connector.execute(
+                "INSERT OR REPLACE INTO responses (key, url, body, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._key(url), self.normalize_url(url), body, len(body), now + self.ttl_for(url), now)
+            )
+            self._evict()
+            self.connector.commit()
+
+    def _evict(self) -> None:
+        """
+        Remove as entradas menos usadas recentemente até o cache caber em `max_bytes`.
+        """
+        total = self.connector.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        cursor = self.connector.execute("SELECT key, size FROM responses ORDER BY last_access ASC")
+        to_delete = []
+        for key, size in cursor:
+            if total <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            total -= size
+
+        self.connector.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+        self.evictions += len(to_delete)
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores e o tamanho atual do cache.
+        """
+        with self._lock:
+            entries, size = self.connector.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': size,
+        }
+
+    def log_stats(self) -> None:
+        stats = self.stats()
+        logging.info(
+            f"Cache de respostas | acertos={stats['hits']} | falhas={stats['misses']} | "
+            f"taxa={stats['hit_rate']:.1%} | remoções={stats['evictions']} | "
+            f"entradas={stats['entries']} | {stats['bytes'] / 1024 / 1024:.1f} MB"
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self.connector.execute("DELETE FROM responses")
+            self.connector.commit()
+
+    def close(self) -> None:
+        self.connector.close()
@@ -0,0 +1,286 @@
+import os
+import json
+import shutil
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from src.utils.utils import concatenar_compacto
+
+
+class RunJournal:
+    """
+    Diário durável de uma execução de `batch_extraction`.
+
+    Cada unidade concluída (tabela, variável, URL de um bloco de períodos) é
+    registrada em SQLite junto com o caminho da sua saída em Parquet. Se a
+    execução for interrompida, o modo `resume` recarrega do disco as unidades
+    concluídas e só requisita novamente as que falharam ou não foram feitas.
+
+    Atributos:
+    ----------
+    path : str
+        Caminho do arquivo SQLite do diário.
+    checkpoint_dir : str
+        Diretório onde as saídas das unidades são armazenadas.
+    run_id : str
+        Identificador da execução corrente.
+    """
+
+    def __init__(self, path: str, checkpoint_dir: str) -> None:
+        """
+        Inicializa o diário, criando as tabelas se necessário.
+
+        Parâmetros:
+        -----------
+        path : str
+            Caminho do arquivo SQLite.
+        checkpoint_dir : str
+            Diretório das saídas das unidades.
+        """
+        self.path = path
+        self.checkpoint_dir = checkpoint_dir
+        self.run_id = None
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connector = sqlite3.connect(path, check_same_thread=False)
+        self.connector.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                finished_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS tables_done (
+                run_id TEXT NOT NULL,
+                tabela TEXT NOT NULL,
+                finished_at TEXT NOT NULL,
+                PRIMARY KEY (run_id, tabela)
+            );
+            CREATE TABLE IF NOT EXISTS units (
+                run_id TEXT NOT NULL,
+                tabela TEXT NOT NULL,
+                variavel TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                output TEXT,
+                rows INTEGER,
+                error TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (run_id, tabela, variavel, url)
+            );
+        """)
+        self.connector.commit()
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat(timespec='seconds')
+
+    def start(self, resume: bool = False) -> str:
+        """
+        Inicia uma nova execução ou, no modo `resume`, retoma a última execução não concluída.
+
+        Ao iniciar uma nova execução, as execuções não concluídas são marcadas como
+        abandonadas e suas saídas intermediárias são removidas do disco.
+
+        Parâmetros:
+        -----------
+        resume : bool, opcional
+            Retoma a última execução interrompida, se houver.
+
+        Retorna:
+        --------
+        str
+            Identificador da execução.
+        """
+        if resume:
+            with self._lock:
+                row = self.connector.execute(
+                    "SELECT run_id FROM runs WHERE status = 'running' ORDER BY started_at DESC LIMIT 1"
+                ).fetchone()
+            if row:
+                self.run_id = row[0]
+                logging.info(f"Retomando a execução {self.run_id}: {self.summary_text()}")
+                return self.run_id
+            logging.info("Nenhuma execução interrompida para retomar; iniciando uma nova.")
+
+        with self._lock:
+            abandoned = [r[0] for r in self.connector.execute("SELECT run_id FROM runs WHERE status = 'running'")]
+            self.connector.execute("UPDATE runs SET status = 'abandoned' WHERE status = 'running'")
+            self.run_id = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+            self.connector.execute(
+                "INSERT INTO runs (run_id, status, started_at) VALUES (?, 'running', ?)", (self.run_id, self._now())
+            )
+            self.connector.commit()
+        for run_id in abandoned:
+            shutil.rmtree(os.path.join(self.checkpoint_dir, run_id), ignore_errors=True)
+        if abandoned:
+            logging.info(f"Saídas intermediárias das execuções abandonadas {abandoned} removidas.")
+        logging.info(f"Execução {self.run_id} iniciada.")
+        return self.run_id
+
+    def finish(self) -> None:
+        """
+        Marca a execução corrente como concluída e remove as saídas intermediárias.
+        """
+        with self._lock:
+            self.connector.execute(
+                "UPDATE runs SET status = 'finished', finished_at = ? WHERE run_id = ?", (self._now(), self.run_id)
+            )
+            self.connector.commit()
+        shutil.rmtree(os.path.join(self.checkpoint_dir, self.run_id), ignore_errors=True)
+        logging.info(f"Execução {self.run_id} concluída: {self.summary_text()}")
+
+    def is_table_done(self, tabela) -> bool:
+        with self._lock:
+            row = self.connector.execute(
+                "SELECT 1 FROM tables_done WHERE run_id = ? AND tabela = ?", (self.run_id, str(tabela))
+            ).fetchone()
+        return row is not None
+
+    def mark_table_done(self, tabela) -> None:
+        """
+        Registra a tabela como concluída (já salva na camada silver) e remove suas saídas intermediárias.
+        """
+        with self._lock:
+            self.connector.execute(
+                "INSERT OR REPLACE INTO tables_done (run_id, tabela, finished_at) VALUES (?, ?, ?)",
+                (self.run_id, str(tabela), self._now())
+            )
+            self.connector.commit()
+        shutil.rmtree(self._table_dir(tabela), ignore_errors=True)
+
+    def checkpoint(self, tabela, variavel) -> 'UnitCheckpoint':
+        """
+        Retorna o ponto de controle das unidades de uma (tabela, variável).
+        """
+        return UnitCheckpoint(self, str(tabela), str(variavel))
+
+    def _table_dir(self, tabela) -> str:
+        return os.path.join(self.checkpoint_dir, self.run_id, f'tabela={tabela}')
+
+    def _unit(self, tabela, variavel, url):
+        with self._lock:
+            return self.connector.execute(
+                "SELECT status, output FROM units WHERE run_id = ? AND tabela = ? AND variavel = ? AND url = ?",
+                (self.run_id, tabela, variavel, url)
+            ).fetchone()
+
+    def _record(self, tabela, variavel, url, status, output=None, rows=None, error=None) -> None:
+        with self._lock:
+            self.connector.execute(
+                "INSERT OR REPLACE INTO units (run_id, tabela, variavel, url, status, output, rows, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.run_id, tabela, variavel, url, status, output, rows, error, self._now())
+            )
+            self.connector.commit()
+
+    def summary(self) -> dict:
+        """
+        Retorna a contagem de unidades por status e de tabelas concluídas na execução corrente.
+        """
+        with self._lock:
+            counts = dict(self.connector.execute(
+                "SELECT status, COUNT(*) FROM units WHERE run_id = ? GROUP BY status", (self.run_id,)
+            ).fetchall())
+            counts['tabelas_concluidas'] = self.connector.execute(
+                "SELECT COUNT(*) FROM tables_done WHERE run_id = ?", (self.run_id,)
+            ).fetchone()[0]
+        return counts
+
+    def summary_text(self) -> str:
+        summary = self.summary()
+        return (f"{summary['tabelas_concluidas']} tabela(s) concluída(s), "
+                f"{summary.get('done', 0)} unidade(s) concluída(s), {summary.get('failed', 0)} com falha")
+
+    def close(self) -> None:
+        self.connector.close()
+
+
+class UnitCheckpoint:
+    """
+    Ponto de controle das unidades (URLs) de uma (tabela, variável) na execução corrente.
+
+    A saída de cada unidade é um DataFrame ou, nas requisições com várias
+    variáveis, um dicionário de DataFrames por variável.
+    """
+
+    def __init__(self, journal: RunJournal, tabela: str, variavel: str) -> None:
+        self.journal = journal
+        self.tabela = tabela
+        self.variavel = variavel
+
+    def _unit_dir(self, url: str) -> str:
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.journal._table_dir(self.tabela), f'variavel={self.variavel}', key)
+
+    def load(self, url: str):
+        """
+        Retorna a saída de uma unidade já concluída, ou None se ela precisar ser requisitada.
+        """
+        row = self.journal._unit(self.tabela, self.variavel, url)
+        if row is None or row[0] != 'done':
+            return None
+
+        output = json.loads(row[1])
+        try:
+            if output['kind'] == 'dict':
+                return {variable_id: self._read(paths) for variable_id, paths in output['files'].items()}
+            return self._read(output['files'])
+        except OSError as e:
+            logging.warning(f"Saída da unidade {url} não encontrada; a unidade será requisitada novamente: {e}")
+            return None
+
+    @staticmethod
+    def _read(paths: list) -> pd.DataFrame:
+        return concatenar_compacto([pd.read_parquet(path) for path in paths])
+
+    def _write(self, directory: str, name: str, df: pd.DataFrame) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{name}.parquet')
+        df.to_parquet(path, index=False)
+        return path
+
+    def save(self, url: str, result) -> None:
+        """
+        Armazena a saída de uma unidade e a registra como concluída.
+        """
+        directory = self._unit_dir(url)
+        if isinstance(result, dict):
+            files = {variable_id: [self._write(directory, f'v{variable_id}', df)] for variable_id, df in result.items()}
+            output, rows = {'kind': 'dict', 'files': files}, sum(len(df) for df in result.values())
+        else:
+            output, rows = {'kind': 'frame', 'files': [self._write(directory, 'part-0', result)]}, len(result)
+        self.journal._record(self.tabela, self.variavel, url, 'done', json.dumps(output), rows)
+
+    def save_part(self, url: str, index: int, df: pd.DataFrame) -> None:
+        """
+        Armazena um lote de uma unidade lida em streaming; a unidade só é concluída com `complete`.
+        """
+        directory = self._unit_dir(url)
+        if index == 0:
+            shutil.rmtree(directory, ignore_errors=True)  # descarta lotes de uma tentativa interrompida
+        self._write(directory, f'part-{index}', df)
+
+    def complete(self, url: str) -> None:
+        """
+        Registra como concluída uma unidade cujos lotes foram salvos com `save_part`.
+        """
+        directory = self._unit_dir(url)
+        files = []
+        if os.path.isdir(directory):
+            files = sorted((os.path.join(directory, f) for f in os.listdir(directory) if f.startswith('part-')),
+                           key=lambda f: int(os.path.basename(f)[5:-8]))
+        self.journal._record(self.tabela, self.variavel, url, 'done', json.dumps({'kind': 'frame', 'files': files}))
+
+    def fail(self, url: str, error: str = None) -> None:
+        """
+        Registra a falha de uma unidade, que será requisitada novamente no modo `resume`.
+        """
+        shutil.rmtree(self._unit_dir(url), ignore_errors=True)
+        self.journal._record(self.tabela, self.variavel, url, 'failed', error=error)
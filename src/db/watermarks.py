@@ -0,0 +1,91 @@
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+
+
+class WatermarkStore:
+    """
+    Armazena, por (tabela, variável, nível territorial), o último período já extraído.
+
+    As marcas são persistidas em um arquivo JSON e permitem que a extração
+    incremental solicite apenas os períodos posteriores ao que já está na camada silver.
+    `set` altera apenas a memória; o arquivo é reescrito uma vez por `flush`, ao fim
+    da extração, em vez de uma vez por marca.
+
+    Atributos:
+    ----------
+    path : str
+        Caminho do arquivo JSON com as marcas.
+    marks : dict
+        Marcas carregadas, indexadas por "tabela|variável|território".
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Inicializa o armazenamento, carregando as marcas existentes.
+
+        Parâmetros:
+        -----------
+        path : str
+            Caminho do arquivo JSON.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.marks = self._load()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logging.error(f"Erro ao carregar as marcas de período de {self.path}: {e}")
+            return {}
+
+    @staticmethod
+    def _key(table, variable, territory) -> str:
+        return f"{table}|{variable}|{territory}"
+
+    def get(self, table, variable, territory):
+        """
+        Retorna o último período extraído ou None se não houver marca.
+        """
+        mark = self.marks.get(self._key(table, variable, territory))
+        return mark['periodo'] if mark else None
+
+    def for_variable(self, table, variable) -> dict:
+        """
+        Retorna as marcas de uma (tabela, variável), indexadas pelo território.
+        """
+        prefix = f"{table}|{variable}|"
+        return {key[len(prefix):]: mark['periodo'] for key, mark in self.marks.items() if key.startswith(prefix)}
+
+    def set(self, table, variable, territory, periodo) -> None:
+        """
+        Registra o último período extraído; o arquivo é gravado por `flush`.
+        """
+        with self._lock:
+            self.marks[self._key(table, variable, territory)] = {
+                'periodo': str(periodo),
+                'atualizado_em': datetime.now().isoformat(timespec='seconds'),
+            }
+            self._dirty = True
+
+    def flush(self) -> None:
+        """
+        Persiste o arquivo, se houver marcas novas desde a última gravação.
+        """
+        with self._lock:
+            if self._dirty:
+                self._save()
+                self._dirty = False
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.marks, file, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
@@ -3,9 +3,11 @@ import logging
 import os
 import re
 import sys
+import threading
 import unicodedata
-from time import sleep, time
-from typing import List, Tuple, Optional
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple, Optional
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
 
@@ -16,8 +18,18 @@ from tqdm import tqdm
 # Local application/library specific imports
 from src.services.sidra_api import SidraAPI
 from src.services.ibge_api import SidraManager
+from src.services.http_client import SidraHttpClient
+from src.services.rate_limiter import AdaptiveRateLimiter
 from src.db.database_manager import PostgreSQL
-from src.db.local_directory import DirectoryManager
+from src.db.local_directory import DirectoryManager, TablePartitionWriter
+from src.utils.utils import formatar_valores_ptbr, concatenar_compacto, relatorio_memoria
+from src.utils.pipeline import StagedPipeline
+from src.utils.excel_stream import StreamingWorkbookWriter
+from src.db.response_cache import ResponseCache
+from src.db.watermarks import WatermarkStore
+from src.db.run_journal import RunJournal
+from src.db.fingerprints import FingerprintStore
+from src.db.metadata_catalog import MetadataCatalog
 
 def format_string(input_string: str) -> str:
     """
@@ -36,6 +48,69 @@ def format_string(input_string: str) -> str:
     cleaned_string = cleaned_string.replace(' ', '_').replace('-', '_')
     return cleaned_string
 
+def _formatar_lotes(chunks):
+    for df in [chunks] if isinstance(chunks, pd.DataFrame) else chunks:
+        if 'Valor' in df.columns:
+            df = df.assign(Valor=formatar_valores_ptbr(df['Valor']))
+        yield df
+
+def export_excel(pages, 
+                 output_file: str, 
+                 description: Optional[pd.DataFrame] = None, 
+                 template: Optional[str] = None) -> None:
+    """
+    Exporta os dados de uma tabela para um arquivo Excel, com uma aba por variável.
+
+    O arquivo é escrito em streaming (ver `StreamingWorkbookWriter`): cada variável é
+    gravada linha a linha assim que seus dados chegam e descartada em seguida, e abas
+    acima do limite de linhas do Excel são divididas. A coluna `Valor` é mantida
+    numérica no pipeline e só é formatada no padrão pt-BR aqui. Se `description` for
+    informada, a aba "Descrição" formatada com o template é escrita como primeira aba.
+
+    Parâmetros:
+        pages: DataFrames por código de variável (dict) ou pares (variável, DataFrame ou
+            iterador de lotes), como os de `DirectoryManager.iter_table_partitions`.
+        output_file (str): Caminho do arquivo Excel.
+        description (Optional[pd.DataFrame]): Descrição da tabela para a aba "Descrição".
+        template (Optional[str]): Caminho do arquivo de template da aba "Descrição".
+    """
+    with StreamingWorkbookWriter(output_file) as writer:
+        if description is not None:
+            DirectoryManager.write_description_sheet(writer.workbook, description, template)
+        for variable_id, chunks in (pages.items() if isinstance(pages, dict) else pages):
+            writer.write_sheet(f'Variável {variable_id}', _formatar_lotes(chunks))
+
+def build_gold_table(table_number: str, 
+                     info_file: str, 
+                     base_directory: str, 
+                     silver_layer: str, 
+                     gold_dir: str, 
+                     template: str) -> bool:
+    """
+    Gera o Excel final (gold) de uma tabela: exporta as partições da camada silver e aplica o template.
+
+    Função de módulo para poder ser executada em processos separados por `processed_template`.
+
+    Parâmetros:
+        table_number (str): ID da tabela.
+        info_file (str): Caminho do arquivo `sidra_info_<tabela>.parquet` com a descrição da tabela.
+        base_directory (str): Diretório base das camadas.
+        silver_layer (str): Camada (ou partição) silver de origem.
+        gold_dir (str): Diretório de destino da camada gold.
+        template (str): Caminho do arquivo de template.
+
+    Retorna:
+        bool: True se o arquivo foi gerado; False se a tabela não tem dados na camada silver.
+    """
+    dm = DirectoryManager(base_directory=base_directory, destiny_directory=gold_dir)
+    if not dm.list_table_variables(silver_layer, table_number):
+        return False
+
+    data_df = pd.read_parquet(info_file)
+    pages = dm.iter_table_partitions(silver_layer, table_number)
+    export_excel(pages, os.path.join(gold_dir, f"Tabela {table_number}.xlsx"), description=data_df, template=template)
+    return True
+
 class SidraMetadataExecute:
     """
     Classe para gerenciar a extração e processamento de metadados de tabelas do SIDRA.
@@ -49,25 +124,75 @@ class SidraMetadataExecute:
         list_df_categories (List[pd.DataFrame]): Lista de DataFrames de categorias processadas.
         sidra_service (SidraManager): Serviço para gerenciar operações de metadados SIDRA.
         sidra_api (SidraAPI): API para interagir com o SIDRA.
-        execution_interval (int): Intervalo de execução entre as tentativas de requisição.
+        rate_limiter (AdaptiveRateLimiter): Limitador de taxa compartilhado por todas as chamadas ao SIDRA e ao IBGE.
+        memory_report (dict): Linhas e memória (MB) ocupadas pelos dados extraídos de cada tabela.
+        catalog (MetadataCatalog): Catálogo indexado dos metadados (tabela, variáveis e categorias) por tabela.
         directory_manager (DirectoryManager): Gerenciador de diretórios.
         output_dirs (dict): Dicionário com os diretórios de saída.
         db (Optional[PostgreSQL]): Instância do banco de dados PostgreSQL (se habilitado).
+        concurrent_fetch (bool): Indica se as URLs de cada variável são requisitadas em paralelo.
+        http_client (SidraHttpClient): Sessão HTTP compartilhada entre `sidra_service` e `sidra_api`.
+        response_cache (Optional[ResponseCache]): Cache persistente das respostas das APIs (se habilitado).
+        incremental (bool): Indica se a extração solicita apenas os períodos posteriores às marcas salvas.
+        watermarks (WatermarkStore): Último período extraído por (tabela, variável, nível territorial).
+        plan_requests (bool): Indica se as requisições são planejadas pelo tamanho estimado da resposta.
+        coalesce_variables (bool): Indica se várias variáveis de uma tabela são solicitadas na mesma URL.
+        stream_batch_size (Optional[int]): Tamanho dos lotes no modo de leitura em streaming (desabilitado se None).
+        resume (bool): Indica se `batch_extraction` retoma a última execução interrompida.
+        journal (RunJournal): Diário das unidades (tabela, variável, bloco de períodos) concluídas na execução.
+        skip_unchanged (bool): Indica se as tabelas com metadados inalterados desde a última extração são ignoradas.
+        fingerprints (FingerprintStore): Impressão dos metadados de cada tabela na última extração bem-sucedida.
+        freshness_report (dict): Contagem de tabelas novas, atualizadas e ignoradas na última extração.
+        uf_code (Optional[int]): UF do shard; se informado, silver, gold e o estado da extração ficam na partição `uf=<código>`.
+        silver_layer (str): Camada (ou partição) silver usada por esta instância.
+        pipeline (bool): Indica se a extração roda como pipeline de estágios (requisição, formatação, gravação).
+        pipeline_workers (Optional[Dict[str, int]]): Número de threads por estágio do pipeline ('fetch', 'format', 'persist').
+        pipeline_queue_size (int): Tamanho máximo das filas entre os estágios do pipeline.
+        pipeline_stats (dict): Itens processados, erros e profundidade máxima das filas na última execução do pipeline.
+        gold_report (dict): Tabelas geradas, sem dados e com falha na última execução de `processed_template`.
 
     Métodos:
         __init__: Inicializa a classe com diretórios de saída, serviços SIDRA e configurações de banco de dados, se necessário.
         process_table_metadata: Processa metadados para uma tabela específica com tentativas de repetição em caso de falhas.
         _process_data: Processa dados de tabela, variáveis e categorias e armazena em listas internas.
-        batch_info: Processa uma lista de tabelas e gera arquivos Excel com os metadados.
-        _generate_excel_files: Salva um DataFrame em um arquivo Excel no diretório especificado.
-        _load_data: Carrega dados de metadados de tabelas, variáveis e categorias de arquivos Excel.
+        batch_info: Processa uma lista de tabelas e salva os metadados em Parquet na camada bronze.
+        _harvest_metadata: Obtém os metadados em lotes concorrentes, sob o limitador de taxa.
+        _save_metadata: Salva um DataFrame de metadados em Parquet na camada especificada.
+        _catalog_entries: Percorre os metadados das tabelas a extrair no catálogo indexado.
         _build_and_fetch_data: Constrói uma URL para consulta e busca dados da API do SIDRA.
-        _process_and_save_data: Processa e salva dados em arquivos Excel para cada tabela.
+        _prepare_table: Reúne variáveis, categorias e localidades de uma tabela, ou a ignora.
+        _extract_table: Extrai uma tabela variável a variável e a salva na camada silver.
+        _finalize_table: Salva a tabela e registra marcas de extração, diário e impressão dos metadados.
+        _pipeline_extraction: Executa a extração como pipeline produtor/consumidor com filas limitadas.
+        _process_and_save_data: Salva os dados de cada tabela em Parquet particionado na camada silver.
         batch_extraction: Executa a extração em lote de dados usando métodos definidos na classe.
         processed_template: Processa arquivos de dados e aplica um template para cada tabela.
     """
 
-    def __init__(self, list_of_tables: Optional[List[int]] = None, output_dir: str = os.path.join(os.path.dirname(__file__), "..", "..", "data"), processing_db: bool = False) -> None:
+    def __init__(self, 
+                 list_of_tables: Optional[List[int]] = None, 
+                 output_dir: str = os.path.join(os.path.dirname(__file__), "..", "..", "data"), 
+                 processing_db: bool = False,
+                 concurrent_fetch: bool = False,
+                 max_workers: int = 8,
+                 max_per_host: int = 4,
+                 pool_maxsize: int = 10,
+                 http_retries: int = 2,
+                 use_cache: bool = True,
+                 cache_max_mb: int = 512,
+                 incremental: bool = False,
+                 max_rate: float = 10.0,
+                 plan_requests: bool = True,
+                 request_limit: int = 50000,
+                 coalesce_variables: bool = False,
+                 stream_batch_size: Optional[int] = None,
+                 resume: bool = False,
+                 skip_unchanged: bool = False,
+                 uf_code: Optional[int] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 pipeline: bool = False,
+                 pipeline_workers: Optional[Dict[str, int]] = None,
+                 pipeline_queue_size: int = 16) -> None:
         """
         Inicializa a classe com diretórios de saída, serviços SIDRA e configurações de banco de dados, se necessário.
 
@@ -75,10 +200,50 @@ class SidraMetadataExecute:
             list_of_tables (Optional[List[int]]): Lista de IDs de tabelas para processamento.
             output_dir (str): Caminho do diretório de saída para arquivos processados.
             processing_db (bool): Define se os resultados devem ser armazenados em um banco de dados.
+            concurrent_fetch (bool): Define se as URLs de cada variável são requisitadas em paralelo.
+            max_workers (int): Número máximo de threads no modo concorrente.
+            max_per_host (int): Número máximo de requisições simultâneas por host.
+            pool_maxsize (int): Número máximo de conexões keep-alive mantidas por host.
+            http_retries (int): Número de retentativas do adaptador HTTP para falhas de conexão (429/5xx passam pelo limitador).
+            use_cache (bool): Define se as respostas das APIs são armazenadas em cache no disco.
+            cache_max_mb (int): Tamanho máximo do cache de respostas, em megabytes.
+            incremental (bool): Define se apenas os períodos novos são extraídos e mesclados à camada silver.
+            max_rate (float): Taxa máxima de requisições por segundo permitida ao limitador adaptativo.
+            plan_requests (bool): Define se períodos e categorias são agrupados conforme o limite de valores da API.
+            request_limit (int): Número máximo de valores por requisição à API do SIDRA.
+            coalesce_variables (bool): Define se as variáveis de uma tabela são agrupadas em `/v/1,2,3`.
+            stream_batch_size (Optional[int]): Se informado, as respostas são lidas em streaming em lotes desse tamanho.
+            resume (bool): Define se a extração retoma a última execução interrompida, requisitando apenas as unidades pendentes.
+            skip_unchanged (bool): Define se as tabelas cujos metadados não mudaram desde a última extração são ignoradas.
+            uf_code (Optional[int]): Código da UF do shard. Se omitido, extrai o Piauí (22) no layout sem partição por UF.
+            rate_limiter (Optional[AdaptiveRateLimiter]): Limitador compartilhado (ex.: entre processos); se omitido, um próprio é criado.
+            pipeline (bool): Define se requisição, formatação e gravação rodam em paralelo, ligadas por filas limitadas.
+            pipeline_workers (Optional[Dict[str, int]]): Threads por estágio; o padrão é {'fetch': max_per_host, 'format': 2, 'persist': 1}.
+            pipeline_queue_size (int): Tamanho máximo de cada fila do pipeline.
         """
         self.list_of_tables = list_of_tables
         self.output_dir = output_dir
         self.processing_db = processing_db
+        self.concurrent_fetch = concurrent_fetch
+        self.incremental = incremental
+        self.plan_requests = plan_requests
+        self.coalesce_variables = coalesce_variables
+        self.stream_batch_size = stream_batch_size
+        self.resume = resume
+        self.max_workers = max_workers
+        self.skip_unchanged = skip_unchanged
+        self.uf_code = uf_code
+        self.max_per_host = max_per_host
+        self.pipeline = pipeline
+        self.pipeline_workers = pipeline_workers
+        self.pipeline_queue_size = pipeline_queue_size
+        self.pipeline_stats = {}
+        self.gold_report = {}
+        self.freshness_report = {}
+        self.memory_report = {}
+        self._pending_watermarks = []
+        self._pending_tables = []
+        self._silver_tables = set()
 
         logging.basicConfig(level=logging.INFO)
         logging.info(f"Objeto SidraMetadataExecute criado \nDiretórios: {self.output_dir}")
@@ -89,13 +254,47 @@ class SidraMetadataExecute:
         self.list_df_categories = []
 
         # Inicializa serviços e gerenciadores
-        self.sidra_service = SidraManager()
-        self.sidra_api = SidraAPI()
-        self.execution_interval = 5
-
         self.directory_manager = DirectoryManager()
         self.output_dirs = self.directory_manager._create_directories()
 
+        # Cada UF é um shard independente: os metadados (bronze) são compartilhados, enquanto
+        # dados, Excel e estado da extração ficam na partição `uf=<código>`.
+        state_dir = self.output_dirs.get('bronze')
+        runs_dir = os.path.join(self.output_dirs.get('geral'), '.runs')
+        self.silver_layer = "silver"
+        if uf_code is not None:
+            shard = f"uf={uf_code}"
+            self.silver_layer = os.path.join("silver", shard)
+            self.output_dirs['gold'] = os.path.join(self.output_dirs['gold'], shard)
+            state_dir = os.path.join(state_dir, shard)
+            runs_dir = os.path.join(runs_dir, shard)
+            os.makedirs(self.output_dirs['gold'], exist_ok=True)
+            os.makedirs(state_dir, exist_ok=True)
+
+        self.catalog = MetadataCatalog(os.path.join(self.output_dirs.get('bronze'), '_metadata_catalog_.sqlite'))
+        self.watermarks = WatermarkStore(os.path.join(state_dir, '_watermarks_.json'))
+        self.journal = RunJournal(os.path.join(runs_dir, 'journal.sqlite'), runs_dir)
+        self.fingerprints = FingerprintStore(os.path.join(state_dir, '_fingerprints_.json'))
+
+        self.response_cache = None
+        if use_cache:
+            self.response_cache = ResponseCache(
+                os.path.join(self.output_dirs.get('geral'), '.cache', 'sidra_responses.sqlite'),
+                max_bytes=cache_max_mb * 1024 * 1024
+            )
+
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(max_rate=max_rate)
+        self.http_client = SidraHttpClient(pool_maxsize=max(pool_maxsize, max_per_host), 
+                                           max_retries=http_retries, 
+                                           cache=self.response_cache,
+                                           rate_limiter=self.rate_limiter)
+        self.sidra_service = SidraManager(uf_code=uf_code or 22, http_client=self.http_client)
+        self.sidra_api = SidraAPI(max_workers=max_workers, 
+                                  max_per_host=max_per_host, 
+                                  http_client=self.http_client, 
+                                  limite_valores=request_limit,
+                                  uf_code=uf_code or 22)
+
         # Configura banco de dados se necessário
         if self.processing_db:
             self.db = PostgreSQL(schema='datasetpi')
@@ -115,7 +314,6 @@ class SidraMetadataExecute:
         while retry_count < max_retries:
             try:
                 data = self.sidra_service.sidra_get_metadata(table)
-                sleep(self.execution_interval)
                 if data:
                     df = self._process_data(table, data)
                     return df, retry_count
@@ -125,7 +323,7 @@ class SidraMetadataExecute:
             except Exception as e:
                 logging.error(f"Erro ao processar os dados de {table}: {e}")
                 retry_count += 1
-            sleep(self.execution_interval)
+            self.rate_limiter.wait_backoff(retry_count)
         return None, retry_count 
 
     def _process_data(self, table: int, data: dict) -> pd.DataFrame:
@@ -140,180 +338,886 @@ class SidraMetadataExecute:
             pd.DataFrame: DataFrame com informações processadas da tabela.
         """
         df_tables, df_table_info = self.sidra_service.sidra_process_table(data)
+        if not df_tables.empty:
+            df_tables['Impressão'] = self.fingerprints.compute(data)
         df_variables = self.sidra_service.sidra_process_variables(data, table)
         df_categories = self.sidra_service.sidra_process_categories(data, table)
 
         self.list_df_tables.append(df_tables)
         self.list_df_variables.append(df_variables)
         self.list_df_categories.append(df_categories)
+        self.catalog.upsert(table, df_tables, df_variables, df_categories)
 
         return df_table_info
 
-    def batch_info(self, max_retries: int = 3) -> Tuple[List[dict], dict]:
+    def batch_info(self, max_retries: int = 3, bulk: bool = False, batch_size: int = 200) -> Tuple[List[dict], dict]:
         """
-        Processa uma lista de tabelas e gera arquivos Excel com os metadados.
+        Processa uma lista de tabelas e gera arquivos Parquet com os metadados na camada bronze.
 
         Parâmetros:
             max_retries (int): Número máximo de tentativas em caso de falha ao processar uma tabela.
+            bulk (bool): Define se os metadados são obtidos em lotes concorrentes (ver `_harvest_metadata`).
+            batch_size (int): Número de tabelas por lote no modo `bulk`.
 
         Retorna:
             Tuple[List[dict], dict]: Lista de metadados das tabelas processadas e dicionário com contagem de tentativas falhadas.
         """
-        metatable = []
-        failed_requests = {}
+        if bulk:
+            metatable, failed_requests = self._harvest_metadata(max_retries, batch_size)
+        else:
+            metatable = []
+            failed_requests = {}
 
-        for table in tqdm(self.list_of_tables, total=len(self.list_of_tables), unit="Tables"):
-            table_info, retries = self.process_table_metadata(table, max_retries)
-            if table_info is not None:
-                metatable.append({"tabela": table, "dados": table_info})
-                self._generate_excel_files(table_info, f"sidra_info_{table}.xlsx")
-            else:
-                failed_requests[table] = retries
+            for table in tqdm(self.list_of_tables, total=len(self.list_of_tables), unit="Tables"):
+                table_info, retries = self.process_table_metadata(table, max_retries)
+                if table_info is not None:
+                    metatable.append({"tabela": table, "dados": table_info})
+                    self._save_metadata(table_info, f"sidra_info_{table}")
+                else:
+                    failed_requests[table] = retries
 
         final_df_tables = pd.concat(self.list_df_tables, ignore_index=True)
         final_df_variables = pd.concat(self.list_df_variables, ignore_index=True)
         final_df_categories = pd.concat(self.list_df_categories, ignore_index=True)
 
         # Geração de arquivos consolidados
-        self._generate_excel_files(final_df_tables, "_tables_adjusted_.xlsx", pasta="bronze")
-        self._generate_excel_files(final_df_variables, "_variables_adjusted_.xlsx", pasta="bronze")
-        self._generate_excel_files(final_df_categories, "_categories_adjusted_.xlsx", pasta="bronze")
+        self._save_metadata(final_df_tables, "_tables_adjusted_", pasta="bronze")
+        self._save_metadata(final_df_variables, "_variables_adjusted_", pasta="bronze")
+        self._save_metadata(final_df_categories, "_categories_adjusted_", pasta="bronze")
+
+        if self.response_cache is not None:
+            self.response_cache.log_stats()
 
         return metatable, failed_requests
 
-    def _generate_excel_files(self, df: pd.DataFrame, filename: str, pasta: str = 'bronze') -> None:
+    def _harvest_metadata(self, max_retries: int, batch_size: int) -> Tuple[List[dict], dict]:
         """
-        Salva um DataFrame em um arquivo Excel no diretório especificado.
+        Obtém os metadados das tabelas em lotes concorrentes, sob o limitador de taxa compartilhado.
+
+        Cada lote é requisitado com até `max_workers` requisições simultâneas e seus
+        metadados são processados em seguida. As tabelas com falha não bloqueiam as
+        demais: ficam em `sidra_service.failed_requests` e são retentadas ao final com
+        `retry_failed_requests`, com backoff entre as rodadas.
+
+        Parâmetros:
+            max_retries (int): Número máximo de tentativas por tabela.
+            batch_size (int): Número de tabelas por lote.
+
+        Retorna:
+            Tuple[List[dict], dict]: Lista de metadados das tabelas processadas e dicionário com contagem de tentativas falhadas.
+        """
+        metatable = []
+        tables = list(self.list_of_tables)
+        batches = [tables[i:i + batch_size] for i in range(0, len(tables), batch_size)]
+        self.sidra_service.failed_requests = []
+
+        def process(metadata: dict) -> None:
+            for table, data in metadata.items():
+                try:
+                    table_info = self._process_data(table, data)
+                except Exception as e:
+                    logging.error(f"Erro ao processar os dados de {table}: {e}")
+                    self.sidra_service.failed_requests.append(table)
+                    continue
+                metatable.append({"tabela": table, "dados": table_info})
+                self._save_metadata(table_info, f"sidra_info_{table}")
+
+        for batch in tqdm(batches, total=len(batches), unit="Lotes"):
+            process(self.sidra_service.sidra_get_metadata_batch(batch, max_workers=self.max_workers))
+
+        for attempt in range(1, max_retries):
+            if not self.sidra_service.failed_requests:
+                break
+            process(self.sidra_service.retry_failed_requests(delay_seconds=self.rate_limiter.backoff(attempt),
+                                                             max_workers=self.max_workers))
+
+        failed_requests = {table: max_retries for table in dict.fromkeys(self.sidra_service.failed_requests)}
+        logging.info(f"Metadados obtidos: {len(metatable)} tabela(s) | falhas: {len(failed_requests)}")
+        return metatable, failed_requests
+
+    def _save_metadata(self, df: pd.DataFrame, name: str, pasta: str = 'bronze') -> None:
+        """
+        Salva um DataFrame de metadados como Parquet (colunas em texto) na camada especificada.
 
         Parâmetros:
             df (pd.DataFrame): DataFrame a ser salvo.
-            filename (str): Nome do arquivo Excel.
-            pasta (str): Diretório onde o arquivo será salvo.
+            name (str): Nome do arquivo, sem extensão.
+            pasta (str): Camada onde o arquivo será salvo.
         """
-        df.to_excel(os.path.join(self.output_dirs.get(pasta), filename), index=False)
+        self.directory_manager.save_parquet(df, pasta, name, as_text=True)
 
-    def _load_data(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    def _catalog_entries(self):
         """
-        Carrega dados de metadados de tabelas, variáveis e categorias de arquivos Excel.
+        Percorre, sob demanda, os metadados das tabelas a extrair no catálogo indexado.
+
+        As tabelas são as de `list_of_tables` (ou todas as do catálogo, se omitida), e cada
+        uma é obtida por uma consulta pela chave, sem carregar os metadados das demais.
+        Um catálogo vazio é preenchido uma única vez a partir dos arquivos consolidados
+        (`_tables_adjusted_` etc.) da camada bronze, se existirem.
 
         Retorna:
-            Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]: DataFrames de tabelas, variáveis e categorias.
+            Iterator[Tuple[pd.Series, pd.DataFrame, pd.DataFrame]]: Linha da tabela, variáveis e categorias.
         """
-        df_tables = pd.read_excel(os.path.join(self.output_dirs.get("bronze"), "_tables_adjusted_.xlsx"), dtype=str)
-        df_variables = pd.read_excel(os.path.join(self.output_dirs.get("bronze"), "_variables_adjusted_.xlsx"), dtype=str)
-        df_categories = pd.read_excel(os.path.join(self.output_dirs.get("bronze"), "_categories_adjusted_.xlsx"), dtype=str)
-
-        return df_tables, df_variables, df_categories
+        if len(self.catalog) == 0:
+            try:
+                imported = self.catalog.import_frames(
+                    self.directory_manager.load_parquet("bronze", "_tables_adjusted_"),
+                    self.directory_manager.load_parquet("bronze", "_variables_adjusted_"),
+                    self.directory_manager.load_parquet("bronze", "_categories_adjusted_"),
+                )
+                logging.info(f"Catálogo de metadados criado a partir da camada bronze: {imported} tabela(s).")
+            except (OSError, KeyError) as e:
+                logging.warning(f"Catálogo de metadados vazio; execute `batch_info` antes da extração: {e}")
+        return self.catalog.entries(self.list_of_tables)
     
-    def _build_and_fetch_data(self, table_number: int, row: pd.Series, row_var: pd.Series, categories_str: str) -> pd.DataFrame:
+    def _build_and_fetch_data(self, 
+                              table_number: int, 
+                              row: pd.Series, 
+                              row_var: pd.Series, 
+                              categories_str: str, 
+                              categories: Optional[dict] = None,
+                              localities: Optional[dict] = None,
+                              writer: Optional[TablePartitionWriter] = None) -> Optional[pd.DataFrame]:
         """
         Constrói uma URL para consulta e busca dados da API do SIDRA.
 
+        No modo incremental, apenas os períodos posteriores às marcas salvas são
+        solicitados. As marcas de cada nível territorial são avançadas até a
+        `Data Final` da tabela quando todas as suas URLs são obtidas com sucesso
+        e a tabela é salva na camada silver. Cada URL é registrada no diário de execução.
+
+        No modo streaming com `writer`, cada lote lido é gravado na partição da variável
+        assim que chega, sem reunir a resposta em memória; se a leitura falhar, a
+        partição da variável é descartada.
+
         Parâmetros:
             table_number (int): ID da tabela a ser processada.
             row (pd.Series): Linha do DataFrame de tabelas.
             row_var (pd.Series): Linha do DataFrame de variáveis.
             categories_str (str): String formatada de categorias.
+            categories (Optional[dict]): Categorias por classificação, usadas pelo planejador de requisições.
+            localities (Optional[dict]): Códigos das localidades por nível territorial (ver `_table_localities`).
+            writer (Optional[TablePartitionWriter]): Escritor das partições da tabela no modo streaming.
 
         Retorna:
-            pd.DataFrame: DataFrame com os dados obtidos da API.
+            Optional[pd.DataFrame]: DataFrame com os dados obtidos da API (None se gravados pelo `writer`).
         """
+        self._build_urls(table_number, row, [row_var['id']], categories_str, categories, localities)
+        checkpoint = self.journal.checkpoint(table_number, row_var['id'])
+        if self.stream_batch_size:
+            batches = self.sidra_api.fetch_data_stream(batch_size=self.stream_batch_size, checkpoint=checkpoint)
+            if writer is None:
+                df = concatenar_compacto(list(batches))
+            else:
+                df = None
+                try:
+                    for batch in batches:
+                        writer.write(row_var['id'], batch)
+                except Exception:
+                    writer.discard(row_var['id'])
+                    raise
+        else:
+            df = self.sidra_api.fetch_data(concurrent=self.concurrent_fetch, checkpoint=checkpoint)
+        self._update_watermarks(table_number, row_var['id'], row["Data Final"])
+        return df
+
+    def _build_and_fetch_group(self, 
+                               table_number: int, 
+                               row: pd.Series, 
+                               variable_ids: List[str], 
+                               categories_str: str, 
+                               categories: Optional[dict] = None,
+                               localities: Optional[dict] = None) -> dict:
+        """
+        Constrói URLs com várias variáveis (`/v/1,2,3`) e separa a resposta por variável.
+
+        No modo incremental, cada nível territorial parte da marca mais antiga entre
+        as variáveis do grupo; as sobreposições são removidas na mescla com a camada silver.
+
+        Parâmetros:
+            table_number (int): ID da tabela a ser processada.
+            row (pd.Series): Linha do DataFrame de tabelas.
+            variable_ids (List[str]): Códigos das variáveis do grupo.
+            categories_str (str): String formatada de categorias.
+            categories (Optional[dict]): Categorias por classificação, usadas pelo planejador de requisições.
+            localities (Optional[dict]): Códigos das localidades por nível territorial (ver `_table_localities`).
+
+        Retorna:
+            dict: DataFrames indexados pelo código da variável.
+        """
+        self._build_urls(table_number, row, variable_ids, categories_str, categories, localities)
+        checkpoint = self.journal.checkpoint(table_number, ','.join(str(v) for v in variable_ids))
+        frames = self.sidra_api.fetch_data_by_variable(concurrent=self.concurrent_fetch, checkpoint=checkpoint)
+        for variable_id in variable_ids:
+            self._update_watermarks(table_number, variable_id, row["Data Final"])
+        return frames
+
+    def _build_urls(self, 
+                    table_number: int, 
+                    row: pd.Series, 
+                    variable_ids: List[str], 
+                    categories_str: str, 
+                    categories: Optional[dict] = None,
+                    localities: Optional[dict] = None) -> None:
+        """
+        Constrói em `sidra_api` as URLs de uma variável ou de um grupo de variáveis (`/v/1,2,3`).
+
+        No modo incremental, cada nível territorial parte da marca mais antiga entre
+        as variáveis; as sobreposições são removidas na mescla com a camada silver.
+        As variáveis isoladas são solicitadas no formato `f/u`, com o código das unidades
+        territoriais, que é mantido em 'Região (Código)'. Os grupos são solicitados no
+        formato `f/a` (códigos e nomes de todos os descritores), pois a resposta é
+        separada pela coluna 'Variável (Código)' (ver `SidraAPI.split_by_variable`).
+
+        Parâmetros:
+            table_number (int): ID da tabela a ser processada.
+            row (pd.Series): Linha do DataFrame de tabelas.
+            variable_ids (List[str]): Códigos das variáveis.
+            categories_str (str): String formatada de categorias.
+            categories (Optional[dict]): Categorias por classificação, usadas pelo planejador de requisições.
+            localities (Optional[dict]): Códigos das localidades por nível territorial (ver `_table_localities`).
+        """
+        watermarks = None
+        if self.incremental:
+            marks = [self.watermarks.for_variable(table_number, variable_id) for variable_id in variable_ids]
+            territories = set.intersection(*(set(m) for m in marks)) if marks else set()
+            watermarks = {t: min((m[t] for m in marks), key=int) for t in territories}
+
         self.sidra_api.build_url(
             tabela=table_number,
-            variavel=row_var['id'],
+            variavel=','.join(str(v) for v in variable_ids),
             classificacao=categories_str,
             nivel_territorial=row["Nível Territorial"],
             periodo={'Frequência': row["Frequência"], 
                      'Inicio': row["Data Inicial"], 
-                     'Final': row["Data Final"]}
+                     'Final': row["Data Final"]},
+            formato='f/a' if len(variable_ids) > 1 else 'f/u',
+            watermarks=watermarks,
+            categorias=categories,
+            localidades=localities
         )
-        df = self.sidra_api.fetch_data()
-        return df
 
-    def _process_and_save_data(self, pages_data: List[pd.DataFrame], pages_names: List[str], table_number: int) -> None:
+    def _table_localities(self, table_number: int, row: pd.Series) -> Optional[dict]:
+        """
+        Obtém os municípios da UF disponíveis na tabela, quando ela tem o nível N6.
+
+        Os códigos são empacotados pelo `SidraAPI` em poucas URLs; se a lista não puder
+        ser obtida, a extração usa a seleção `N6/in N3 <UF>`.
+
+        Parâmetros:
+            table_number (int): ID da tabela.
+            row (pd.Series): Linha do DataFrame de tabelas.
+
+        Retorna:
+            Optional[dict]: Códigos por nível territorial (ex.: {'N6': [...]}) ou None.
+        """
+        if "N6" not in str(row["Nível Territorial"]).split(", "):
+            return None
+        codes = self.sidra_service.sidra_get_localities(table_number, "N6")
+        return {"N6": codes} if codes else None
+
+    def _update_watermarks(self, 
+                           table_number: int, 
+                           variable_id: str, 
+                           data_final: str, 
+                           urls: Optional[List[str]] = None, 
+                           territories: Optional[List[str]] = None, 
+                           failed: Optional[List[str]] = None, 
+                           pending: Optional[list] = None) -> None:
+        """
+        Registra o avanço das marcas dos níveis territoriais cujas URLs foram todas obtidas com sucesso.
+
+        As marcas só são gravadas por `_commit_watermarks`, depois que a tabela é salva
+        na camada silver, para que uma interrupção não avance marcas de dados não salvos.
+
+        Parâmetros:
+            table_number (int): ID da tabela processada.
+            variable_id (str): ID da variável processada.
+            data_final (str): Último período disponível da tabela.
+            urls (Optional[List[str]]): URLs da variável; o padrão são as últimas URLs de `sidra_api`.
+            territories (Optional[List[str]]): Território de cada URL.
+            failed (Optional[List[str]]): URLs que falharam.
+            pending (Optional[list]): Lista onde as marcas são registradas (padrão é `_pending_watermarks`).
+        """
+        urls = self.sidra_api.urls if urls is None else urls
+        territories = self.sidra_api.url_territorios if territories is None else territories
+        failed = set(self.sidra_api.failed_urls if failed is None else failed)
+        pending = self._pending_watermarks if pending is None else pending
+
+        success = {}
+        for url, territory in zip(urls, territories):
+            if territory is not None:
+                success[territory] = success.get(territory, True) and url not in failed
+
+        for territory, ok in success.items():
+            if ok:
+                pending.append((table_number, variable_id, territory, data_final))
+
+    def _commit_watermarks(self, pending: Optional[list] = None) -> None:
+        """
+        Registra as marcas pendentes da tabela que acabou de ser salva (gravadas em disco ao fim da extração).
+        """
+        for table_number, variable_id, territory, data_final in (self._pending_watermarks if pending is None else pending):
+            self.watermarks.set(table_number, variable_id, territory, data_final)
+        if pending is None:
+            self._pending_watermarks = []
+
+    def _merge_with_silver(self, pages: Dict[str, pd.DataFrame], table_number: int) -> Dict[str, pd.DataFrame]:
+        """
+        Mescla os dados extraídos de forma incremental com as partições já existentes na camada silver.
+
+        Linhas novas substituem as antigas com as mesmas dimensões, e as variáveis sem
+        dados novos são preservadas.
+
+        Parâmetros:
+            pages (Dict[str, pd.DataFrame]): DataFrames extraídos nesta execução, por código de variável.
+            table_number (int): ID da tabela.
+
+        Retorna:
+            Dict[str, pd.DataFrame]: DataFrames mesclados, por código de variável.
+        """
+        existing = self.directory_manager.load_table_partitions(self.silver_layer, table_number)
+        if not existing:
+            return pages
+
+        merged = {}
+        for variable_id in list(existing.keys()) + [v for v in pages if v not in existing]:
+            old_df = existing.get(variable_id)
+            new_df = pages.get(variable_id)
+            if old_df is None or old_df.empty:
+                df = new_df
+            elif new_df is None or new_df.empty:
+                df = old_df
+            else:
+                df = concatenar_compacto([old_df, new_df])
+                # os códigos derivam dos rótulos e podem faltar em partições antigas
+                dimensions = [c for c in df.columns if c != 'Valor' and '(Código)' not in c]
+                df = df.drop_duplicates(subset=dimensions, keep='last')
+            merged[variable_id] = df
+
+        return merged
+
+    def _report_memory(self, table_number: int, pages: Dict[str, pd.DataFrame]) -> None:
+        """
+        Registra o número de linhas e a memória ocupada pelos dados extraídos de uma tabela.
+
+        Parâmetros:
+            table_number (int): ID da tabela.
+            pages (Dict[str, pd.DataFrame]): DataFrames extraídos, um por variável.
+        """
+        reports = [relatorio_memoria(df) for df in pages.values()]
+        report = {
+            'variaveis': len(reports),
+            'linhas': sum(r['linhas'] for r in reports),
+            'memoria_mb': sum(r['memoria_mb'] for r in reports),
+        }
+        self.memory_report[table_number] = report
+        logging.info(f"Memória da tabela {table_number}: {report['linhas']} linhas em "
+                     f"{report['variaveis']} variável(is) | {report['memoria_mb']:.2f} MB")
+
+    def _commit_stream(self, writer: TablePartitionWriter, table_number: int) -> None:
+        """
+        Registra a memória e confirma na camada silver as partições gravadas em streaming.
+
+        A memória registrada é a do maior lote, que é o que o modo streaming mantém em memória.
+
+        Parâmetros:
+            writer (TablePartitionWriter): Escritor das partições da tabela.
+            table_number (int): ID da tabela.
+        """
+        report = {
+            'variaveis': len(writer.rows),
+            'linhas': sum(writer.rows.values()),
+            'memoria_mb': writer.max_batch_mb,
+        }
+        self.memory_report[table_number] = report
+        logging.info(f"Memória da tabela {table_number}: {report['linhas']} linhas em "
+                     f"{report['variaveis']} variável(is) | maior lote {report['memoria_mb']:.2f} MB")
+
+        if writer.rows:
+            writer.commit()
+        else:
+            writer.abort()
+            logging.warning(f"Nenhum dado para salvar na camada silver: {table_number}")
+
+    def _process_and_save_data(self, pages: Dict[str, pd.DataFrame], table_number: int) -> None:
         """
-        Processa e salva dados em arquivos Excel para cada tabela.
+        Salva os dados de uma tabela na camada silver, em Parquet particionado por variável.
 
         Parâmetros:
-            pages_data (List[pd.DataFrame]): Lista de DataFrames de dados processados.
-            pages_names (List[str]): Lista de nomes das abas do Excel.
+            pages (Dict[str, pd.DataFrame]): DataFrames de dados processados, por código de variável.
             table_number (int): ID da tabela a ser salva.
         """
-        if pages_data:
-            output_file = f'{self.output_dirs.get("silver")}/Tabela {table_number}.xlsx'
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                for df, nome_aba in zip(pages_data, pages_names):
-                    df.to_excel(writer, sheet_name=nome_aba, index=False)
+        if pages:
+            self.directory_manager.save_table_partitions(pages, self.silver_layer, table_number)
         else:
-            logging.warning(f"Nenhum dado para escrever em Excel: {table_number}")
+            logging.warning(f"Nenhum dado para salvar na camada silver: {table_number}")
 
     def batch_extraction(self) -> None:
         """
         Executa a extração em lote de dados usando métodos definidos na classe.
+
+        Cada unidade (tabela, variável, bloco de períodos) concluída é registrada no
+        diário de execução com a sua saída em disco. No modo `resume`, as tabelas já
+        salvas são ignoradas e, nas demais, apenas as unidades com falha ou ainda não
+        feitas são requisitadas. A execução só é encerrada quando todas as tabelas são
+        concluídas sem falhas; caso contrário, pode ser retomada.
+
+        Com `skip_unchanged`, as tabelas cuja impressão dos metadados (ver
+        `FingerprintStore`), calculada sobre `/metadados` obtido da rede no momento
+        da extração, é igual à da última extração bem-sucedida são ignoradas.
+
+        Com `pipeline`, as etapas de requisição, formatação e gravação são executadas
+        em paralelo (ver `_pipeline_extraction`).
+
+        As marcas de extração e as impressões são gravadas em disco uma única vez, ao
+        final (mesmo após um erro); uma interrupção abrupta apenas faz a próxima execução
+        requisitar de novo dados já salvos, que são mesclados sem duplicação.
         """
-        df_tables, df_variables, df_categories = self._load_data()
+        entries = self._catalog_entries()
+        self.journal.start(resume=self.resume)
+        self._pending_tables = []
+        self._silver_tables = set(self.directory_manager.list_partitioned_tables(self.silver_layer))
+        self.freshness_report = {'novas': 0, 'atualizadas': 0, 'ignoradas': 0}
 
-        for idx, row in df_tables.iterrows():
-            table_number = row["id"]
-            variaveis_filtradas = df_variables[df_variables["Tabela"] == table_number]
+        try:
+            if self.pipeline:
+                self._pipeline_extraction(entries)
+            else:
+                for row, variables, categories in entries:
+                    context = self._prepare_table(row, variables, categories)
+                    if context is not None:
+                        self._extract_table(context)
+        finally:
+            self.watermarks.flush()
+            self.fingerprints.flush()
+
+        report = self.freshness_report
+        logging.info(f"Tabelas novas: {report['novas']} | atualizadas: {report['atualizadas']} | "
+                     f"ignoradas sem alterações: {report['ignoradas']}")
 
-            pages_data: List[pd.DataFrame] = []
-            pages_names: List[str] = []
+        if self._pending_tables:
+            logging.warning(f"Execução {self.journal.run_id} com unidades pendentes nas tabelas {self._pending_tables}; "
+                            f"use `resume=True` para requisitar apenas o que falhou.")
+        else:
+            self.journal.finish()
 
-            unique_categories = df_categories[df_categories["Tabela"] == table_number]['classificacao_id'].unique().tolist()
-            unique_categories = [f'c{category}' for category in unique_categories if category is not None and category != '']
-            categories_str = '/all/'.join(unique_categories) + '/all/' if unique_categories else ''
-            assunto = format_string(row['assunto'])
+        if self.response_cache is not None:
+            self.response_cache.log_stats()
+
+    def _refresh_metadata(self, 
+                          table_number: int, 
+                          row: pd.Series, 
+                          variables: pd.DataFrame, 
+                          table_categories: pd.DataFrame) -> Tuple[pd.Series, pd.DataFrame, pd.DataFrame]:
+        """
+        Obtém `/metadados` da rede, sem o cache de respostas, para decidir se a tabela pode ser ignorada.
+
+        A impressão do catálogo é a do último `batch_info`, e o cache guarda os metadados
+        por até 30 dias; ambos podem esconder um período novo. Se a impressão atual
+        diferir da do catálogo, o catálogo é atualizado e a extração usa os metadados
+        novos. Se a requisição falhar, a impressão é descartada e a tabela é extraída.
+
+        Parâmetros:
+            table_number (int): ID da tabela.
+            row (pd.Series): Linha da tabela no catálogo de metadados.
+            variables (pd.DataFrame): Variáveis da tabela.
+            table_categories (pd.DataFrame): Categorias da tabela.
+
+        Retorna:
+            Tuple[pd.Series, pd.DataFrame, pd.DataFrame]: Linha da tabela, variáveis e categorias atualizadas.
+        """
+        data = self.sidra_service.sidra_get_metadata(table_number, refresh=True)
+        if not data:
+            logging.warning(f"Não foi possível verificar os metadados da tabela {table_number}; a tabela será extraída.")
+            return row.drop(labels="Impressão", errors='ignore'), variables, table_categories
+
+        if self.fingerprints.compute(data) == row.get("Impressão"):
+            return row, variables, table_categories
+
+        logging.info(f"Metadados da tabela {table_number} mudaram desde o último `batch_info`; catálogo atualizado.")
+        self._process_data(table_number, data)
+        return self.catalog.get(table_number) or (row.drop(labels="Impressão", errors='ignore'), variables, table_categories)
+
+    def _prepare_table(self, row: pd.Series, variables: pd.DataFrame, table_categories: pd.DataFrame) -> Optional[dict]:
+        """
+        Reúne o que é preciso para extrair uma tabela, ou retorna None se ela deve ser ignorada.
+
+        Parâmetros:
+            row (pd.Series): Linha da tabela no catálogo de metadados.
+            variables (pd.DataFrame): Variáveis da tabela.
+            table_categories (pd.DataFrame): Categorias da tabela.
 
-            for _, row_var in variaveis_filtradas.iterrows():
+        Retorna:
+            Optional[dict]: Contexto da tabela (variáveis, categorias, localidades e impressão dos metadados).
+        """
+        table_number = row["id"]
+        if self.journal.is_table_done(table_number):
+            logging.info(f"Tabela {table_number} já concluída nesta execução; ignorando.")
+            return None
+
+        if self.skip_unchanged:
+            row, variables, table_categories = self._refresh_metadata(table_number, row, variables, table_categories)
+
+        fingerprint = row.get("Impressão")
+        fingerprint = None if pd.isna(fingerprint) else str(fingerprint)
+        status = self.fingerprints.status(table_number, fingerprint)
+        if self.skip_unchanged and status == FingerprintStore.UNCHANGED and str(table_number) in self._silver_tables:
+            logging.info(f"Tabela {table_number} sem alterações nos metadados; ignorando.")
+            self.freshness_report['ignoradas'] += 1
+            return None
+        self.freshness_report['novas' if status == FingerprintStore.NEW else 'atualizadas'] += 1
+
+        category_map = {cid: group['id'].tolist() for cid, group in table_categories.groupby('classificacao_id', sort=False)}
+
+        unique_categories = table_categories['classificacao_id'].unique().tolist()
+        unique_categories = [f'c{category}' for category in unique_categories if category is not None and category != '']
+
+        return {
+            'table_number': table_number,
+            'row': row,
+            'fingerprint': fingerprint,
+            'variables': variables,
+            'category_map': category_map,
+            'categories': category_map if self.plan_requests else None,
+            'categories_str': '/all/'.join(unique_categories) + '/all/' if unique_categories else '',
+            'localities': self._table_localities(table_number, row),
+        }
+
+    def _extract_table(self, context: dict) -> None:
+        """
+        Extrai uma tabela variável a variável (ou grupo a grupo) e a salva na camada silver.
+
+        No modo streaming (`stream_batch_size`), fora do modo incremental, que precisa
+        dos dados em memória para a mescla, os lotes de cada variável são gravados
+        diretamente na partição silver (ver `TablePartitionWriter`).
+
+        Um erro ao salvar a tabela, como no modo `pipeline`, descarta as partições em
+        construção e deixa a tabela pendente, sem interromper as demais.
+
+        Parâmetros:
+            context (dict): Contexto retornado por `_prepare_table`.
+        """
+        table_number, row = context['table_number'], context['row']
+        categories_str, categories, localities = context['categories_str'], context['categories'], context['localities']
+        table_failed = False
+        self._pending_watermarks = []
+        pages: Dict[str, pd.DataFrame] = {}
+        writer = None
+        if self.stream_batch_size and not self.incremental and not self.coalesce_variables:
+            writer = self.directory_manager.table_writer(self.silver_layer, table_number)
+
+        if self.coalesce_variables:
+            variable_ids = context['variables']['id'].tolist()
+            for group in self.sidra_api.agrupar_variaveis(variable_ids, row["Nível Territorial"], context['category_map'], localities):
+                try:
+                    frames = self._build_and_fetch_group(table_number, row, group, categories_str, categories, localities)
+                    missing = [str(v) for v in group if str(v) not in frames]
+                    if missing:
+                        logging.error(f"Tabela {table_number}: variáveis {missing} ausentes da resposta do grupo {group}.")
+                        self._pending_watermarks = [mark for mark in self._pending_watermarks if str(mark[1]) not in missing]
+                    pages.update({str(v): frames[str(v)] for v in group if str(v) in frames})
+                    table_failed = table_failed or bool(self.sidra_api.failed_urls) or bool(missing)
+                except Exception as e:
+                    logging.error(f"Um erro ocorreu na tabela {table_number}, variáveis {group}: {e}")
+                    table_failed = True
+                    self.rate_limiter.wait_backoff(1)
+        else:
+            for _, row_var in context['variables'].iterrows():
                 try:
-                    df = self._build_and_fetch_data(table_number, row, row_var, categories_str)
-                    pages_data.append(df)
-                    pages_names.append(f'Variável {row_var["id"]}')
-                    sleep(self.execution_interval)
+                    df = self._build_and_fetch_data(table_number, row, row_var, categories_str, categories, localities, writer)
+                    if writer is None:
+                        pages[str(row_var["id"])] = df
+                    table_failed = table_failed or bool(self.sidra_api.failed_urls)
                 except Exception as e:
                     logging.error(f"Um erro ocorreu na tabela {table_number}, variável {row_var['id']}: {e}")
-                    sleep(10)
+                    table_failed = True
+                    self.rate_limiter.wait_backoff(1)
+
+        pending, self._pending_watermarks = self._pending_watermarks, []
+        try:
+            self._finalize_table(context, pages, table_failed, pending, writer)
+        except Exception as e:
+            if writer is not None:
+                writer.abort()
+            logging.error(f"Erro ao salvar a tabela {table_number}: {e}")
+            self._mark_pending(table_number)
 
-            self._process_and_save_data(pages_data, pages_names, table_number)
+    def _finalize_table(self, 
+                        context: dict, 
+                        pages: Dict[str, pd.DataFrame], 
+                        table_failed: bool, 
+                        pending: list, 
+                        writer: Optional[TablePartitionWriter] = None) -> None:
+        """
+        Mescla (modo incremental), salva a tabela na camada silver e registra marcas, diário e impressão.
 
-    def processed_template(self) -> None:
+        Parâmetros:
+            context (dict): Contexto retornado por `_prepare_table`.
+            pages (Dict[str, pd.DataFrame]): DataFrames extraídos, por código de variável.
+            table_failed (bool): Indica se alguma unidade da tabela falhou.
+            pending (list): Marcas de extração a gravar após o salvamento.
+            writer (Optional[TablePartitionWriter]): Partições já gravadas em streaming, a confirmar no lugar de `pages`.
         """
-        Processa arquivos de dados e aplica um template para cada tabela.
+        table_number = context['table_number']
+        if writer is not None:
+            self._commit_stream(writer, table_number)
+        else:
+            if self.incremental:
+                pages = self._merge_with_silver(pages, table_number)
+
+            self._report_memory(table_number, pages)
+            self._process_and_save_data(pages, table_number)
+        self._commit_watermarks(pending)
+
+        if table_failed:
+            self._mark_pending(table_number)
+        else:
+            self.journal.mark_table_done(table_number)
+            if context['fingerprint']:
+                self.fingerprints.set(table_number, context['fingerprint'])
+
+    def _mark_pending(self, table_number) -> None:
+        """
+        Registra a tabela como pendente: a execução não é encerrada e pode ser retomada com `resume`.
+        """
+        if table_number not in self._pending_tables:
+            self._pending_tables.append(table_number)
+
+    def _plan_units(self, context: dict) -> List[dict]:
+        """
+        Constrói as URLs de todas as variáveis (ou grupos de variáveis) de uma tabela.
+
+        Parâmetros:
+            context (dict): Contexto retornado por `_prepare_table`.
+
+        Retorna:
+            List[dict]: Unidades com as variáveis, URLs, territórios e o ponto de controle do diário.
+        """
+        table_number, row = context['table_number'], context['row']
+        variable_ids = [str(v) for v in context['variables']['id'].tolist()]
+        if self.coalesce_variables:
+            groups = self.sidra_api.agrupar_variaveis(variable_ids, row["Nível Territorial"], context['category_map'], context['localities'])
+        else:
+            groups = [[variable_id] for variable_id in variable_ids]
+
+        units = []
+        for group in groups:
+            self._build_urls(table_number, row, group, context['categories_str'], context['categories'], context['localities'])
+            key = ','.join(group)
+            units.append({
+                'variables': group,
+                'key': key,
+                'coalesced': self.coalesce_variables,
+                'urls': list(self.sidra_api.urls),
+                'territories': list(self.sidra_api.url_territorios),
+                'checkpoint': self.journal.checkpoint(table_number, key),
+            })
+        return units
+
+    def _pipeline_extraction(self, entries) -> None:
+        """
+        Executa a extração como um pipeline produtor/consumidor de três estágios.
+
+        O produtor planeja as URLs de cada tabela; o estágio `fetch` faz as requisições
+        (sob o limitador de taxa e o limite por host), o estágio `format` converte as
+        respostas em DataFrames tipados e as registra no diário, e o estágio `persist`
+        monta cada tabela e a salva na camada silver assim que a sua última URL chega.
+        As filas entre os estágios são limitadas (`pipeline_queue_size`), de modo que a
+        rede, a CPU e o disco trabalham ao mesmo tempo sem acumular respostas em memória.
+        Um erro em qualquer estágio chega ao `persist` como falha da URL e deixa a tabela
+        pendente, sem encerrar a execução no diário.
+        O modo streaming (`stream_batch_size`) não se aplica a este modo.
+
+        Parâmetros:
+            entries (Iterator): Linha, variáveis e categorias de cada tabela a extrair (ver `_catalog_entries`).
+        """
+        def produce():
+            for row, variables, categories in entries:
+                context = self._prepare_table(row, variables, categories)
+                if context is None:
+                    continue
+
+                job = {'context': context, 'units': [], 'results': {}, 'received': 0, 'failed': False, 'lock': threading.Lock()}
+                try:
+                    job['units'] = self._plan_units(context)
+                except Exception as e:
+                    logging.error(f"Um erro ocorreu ao planejar a tabela {context['table_number']}: {e}")
+                    job['failed'] = True
+                job['expected'] = sum(len(unit['urls']) for unit in job['units'])
+
+                if job['expected'] == 0:
+                    yield {'job': job, 'unit': None, 'url': None}
+                for u, unit in enumerate(job['units']):
+                    for i, url in enumerate(unit['urls']):
+                        yield {'job': job, 'unit': unit, 'position': (u, i), 'url': url}
+
+        def fetch(item):
+            if item['url'] is None:
+                return item
+            stored = item['unit']['checkpoint'].load(item['url'])
+            if stored is not None:
+                item['result'] = stored
+            else:
+                item['raw'] = self.sidra_api.fetch_raw(item['url'])
+            return item
+
+        def format_(item):
+            if item['url'] is None or 'result' in item:
+                return item
+            unit, raw = item['unit'], item.pop('raw')
+            if raw is None:
+                item['result'] = None
+                unit['checkpoint'].fail(item['url'], 'falha na requisição')
+                return item
+            if unit['coalesced']:
+                try:
+                    parts = self.sidra_api.split_by_variable(raw, variavel=unit['key'])
+                except ValueError as e:
+                    logging.error(f"Erro ao separar a resposta da URL {item['url']}: {e}")
+                    item['result'] = None
+                    unit['checkpoint'].fail(item['url'], str(e))
+                    return item
+                item['result'] = {variable_id: self.sidra_api.format_data(part) for variable_id, part in parts.items()}
+            else:
+                item['result'] = self.sidra_api.format_data(raw)
+            unit['checkpoint'].save(item['url'], item['result'])
+            return item
+
+        def fail(stage, item, error):
+            # A falha segue até o estágio `persist` como resultado None, para que a
+            # URL conte como recebida e a tabela fique pendente no diário.
+            item.pop('raw', None)
+            if item['url'] is not None:
+                item['result'] = None
+                item['unit']['checkpoint'].fail(item['url'], f"erro no estágio '{stage}': {error}")
+            return item
+
+        def persist(item):
+            job = item['job']
+            with job['lock']:
+                if item['url'] is not None:
+                    job['results'][item['position']] = item['result']
+                    job['received'] += 1
+                if job['received'] < job['expected']:
+                    return None
+            table_number = job['context']['table_number']
+            try:
+                self._assemble_and_finalize(job)
+            except Exception as e:
+                logging.error(f"Erro ao salvar a tabela {table_number}: {e}")
+                self._mark_pending(table_number)
+            return None
+
+        workers = {'fetch': self.max_per_host, 'format': 2, 'persist': 1, **(self.pipeline_workers or {})}
+        pipeline = StagedPipeline([
+            ('fetch', fetch, workers['fetch']),
+            ('format', format_, workers['format']),
+            ('persist', persist, workers['persist']),
+        ], queue_size=self.pipeline_queue_size, on_error=fail)
+        self.pipeline_stats = pipeline.run(produce())
+
+    def _assemble_and_finalize(self, job: dict) -> None:
+        """
+        Monta as páginas de uma tabela a partir dos resultados do pipeline, na ordem das URLs, e a finaliza.
+
+        Parâmetros:
+            job (dict): Tabela em andamento no pipeline (contexto, unidades e resultados por URL).
+        """
+        context = job['context']
+        table_number, data_final = context['table_number'], context['row']["Data Final"]
+        pages: Dict[str, pd.DataFrame] = {}
+        pending = []
+        table_failed = job['failed']
+
+        for u, unit in enumerate(job['units']):
+            results = [job['results'].get((u, i)) for i in range(len(unit['urls']))]
+            failed = [url for url, result in zip(unit['urls'], results) if result is None]
+            table_failed = table_failed or bool(failed)
+
+            if unit['coalesced']:
+                frames = {}
+                for parts in results:
+                    for variable_id, df in (parts or {}).items():
+                        frames.setdefault(variable_id, []).append(df)
+                missing = [variable_id for variable_id in unit['variables'] if variable_id not in frames]
+                if missing:
+                    logging.error(f"Tabela {table_number}: variáveis {missing} ausentes da resposta do grupo {unit['key']}.")
+                    table_failed = True
+                pages.update({variable_id: concatenar_compacto(frames[variable_id]) for variable_id in unit['variables'] if variable_id in frames})
+            else:
+                missing = []
+                pages[unit['key']] = concatenar_compacto([df for df in results if df is not None])
+
+            for variable_id in unit['variables']:
+                if variable_id in missing:
+                    continue
+                self._update_watermarks(table_number, variable_id, data_final,
+                                        urls=unit['urls'], territories=unit['territories'], failed=failed, pending=pending)
+
+        self._finalize_table(context, pages, table_failed, pending)
+
+    def processed_template(self, workers: int = 1) -> None:
+        """
+        Gera os arquivos Excel finais (gold) a partir das camadas bronze e silver, aplicando o template.
 
         Este método executa as seguintes etapas:
         1. Inicializa um objeto `DirectoryManager` para gerenciar os diretórios de origem e destino.
-        2. Lista todos os arquivos no diretório de origem e extrai os números das tabelas dos nomes dos arquivos.
-        3. Para cada arquivo de tabela:
-            a. Lê o arquivo Excel.
-            b. Verifica se o arquivo de saída correspondente já existe.
-            c. Aplica o template e processa o arquivo.
-            d. Registra a conclusão do processamento.
+        2. Lista os arquivos de descrição (`sidra_info_<tabela>.parquet`) da camada bronze.
+        3. Para cada tabela com partições na camada silver (ver `build_gold_table`):
+            a. Exporta as variáveis para o Excel da camada gold.
+            b. Aplica o template com a descrição da tabela.
+            c. Registra a conclusão do processamento.
+
+        Com `workers` > 1, as tabelas são distribuídas entre processos. Um erro em uma
+        tabela é registrado em `gold_report` sem interromper as demais.
 
-        Exceções são tratadas e registradas em logs.
+        Parâmetros:
+            workers (int): Número de processos usados na geração (padrão é 1, sequencial).
         """
+        self.gold_report = {'processadas': [], 'sem_dados': [], 'falhas': {}}
         try:
             dm = DirectoryManager(origin_directory=self.output_dirs.get('bronze'), 
                                   destiny_directory=self.output_dirs.get('gold'))
             file_list_df = dm._list_files()
+            file_list_df = file_list_df[file_list_df['filename'].str.endswith('.parquet')].copy()
             file_list_df['filename'] = file_list_df['filename'].astype(str)
-            file_list_df['table_number'] = file_list_df['filename'].str.extract('(\d+)').astype(str)
+            file_list_df['table_number'] = file_list_df['filename'].str.extract(r'(\d+)', expand=False).astype(str)
             file_list_df = file_list_df[file_list_df['table_number'].str.isdigit()]
 
             template = f"{self.output_dirs.get('geral')}/template.xlsx"
-
-            for _, file_info in file_list_df.iterrows():
-                try:
-                    data_df = pd.read_excel(file_info['full_filename'])
-                    table_number = file_info['table_number']
-                    output_path = f"{self.output_dirs['silver']}\\Tabela {table_number}.xlsx"
-
-                    if os.path.exists(output_path):
-                        dm.process_template_file(data_df, template, output_path, table_number)
-                        logging.info(f"Tabela processada: {table_number}.")
-                        
-                except Exception as e:
-                    logging.error(f"Erro ao processar a tabela {table_number}: {e}")
-
+            jobs = [(file_info['table_number'], file_info['full_filename'], self.directory_manager.base_directory,
+                     self.silver_layer, self.output_dirs['gold'], template)
+                    for _, file_info in file_list_df.iterrows()]
         except Exception as e:
             logging.error(f"Erro ao processar os arquivos de dados: {e}")
+            return
+
+        def collect(table_number, run):
+            try:
+                built = run()
+            except Exception as e:
+                logging.error(f"Erro ao processar a tabela {table_number}: {e}")
+                self.gold_report['falhas'][table_number] = str(e)
+                return
+            if built:
+                self.gold_report['processadas'].append(table_number)
+                logging.info(f"Tabela processada: {table_number}.")
+            else:
+                self.gold_report['sem_dados'].append(table_number)
+
+        with tqdm(total=len(jobs), unit="Tables") as progress:
+            if workers > 1 and len(jobs) > 1:
+                with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+                    futures = {executor.submit(build_gold_table, *job): job[0] for job in jobs}
+                    for future in as_completed(futures):
+                        collect(futures[future], future.result)
+                        progress.update(1)
+            else:
+                for job in jobs:
+                    collect(job[0], partial(build_gold_table, *job))
+                    progress.update(1)
+
+        report = self.gold_report
+        logging.info(f"Camada gold: {len(report['processadas'])} tabela(s) gerada(s) | "
+                     f"{len(report['sem_dados'])} sem dados | {len(report['falhas'])} com falha")
@@ -0,0 +1,137 @@
+# Standard library imports
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.managers import BaseManager
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Local application/library specific imports
+from src.main.setup import SidraMetadataExecute
+from src.services.rate_limiter import AdaptiveRateLimiter
+
+
+class RateLimiterManager(BaseManager):
+    """
+    Servidor de objetos compartilhados que mantém um único `AdaptiveRateLimiter` para todos os processos.
+
+    Cada processo recebe um proxy: `acquire`, `record`, `on_throttle` e as esperas de
+    backoff são executadas no servidor, de modo que a taxa e os ajustes AIMD valem
+    para o conjunto dos shards, e não para cada processo isoladamente.
+    """
+
+
+RateLimiterManager.register('AdaptiveRateLimiter', AdaptiveRateLimiter)
+
+
+def _run_shard(uf_code: int, rate_limiter, options: dict, gold: bool) -> dict:
+    """
+    Executa a extração (e, opcionalmente, a camada gold) de uma UF em um processo filho.
+
+    Parâmetros:
+        uf_code (int): Código da UF do shard.
+        rate_limiter: Proxy do limitador de taxa compartilhado.
+        options (dict): Argumentos repassados a `SidraMetadataExecute`.
+        gold (bool): Define se os arquivos Excel da camada gold são gerados.
+
+    Retorna:
+        dict: Resumo do shard (UF, relatório de atualização e linhas extraídas).
+    """
+    executor = SidraMetadataExecute(uf_code=uf_code, rate_limiter=rate_limiter, **options)
+    executor.batch_extraction()
+    if gold:
+        executor.processed_template()
+    return {
+        'uf': uf_code,
+        'tabelas': executor.freshness_report,
+        'linhas': sum(report['linhas'] for report in executor.memory_report.values()),
+    }
+
+
+class UFShardExecute:
+    """
+    Executa o pipeline para várias UFs em paralelo, uma UF por processo.
+
+    Os metadados (bronze) são obtidos uma única vez e compartilhados; cada UF é um
+    shard independente, com saídas em `silver/uf=<código>` e `gold/uf=<código>`.
+    Todos os processos compartilham um único limitador de taxa contra o IBGE e o
+    cache de respostas em disco, de modo que acrescentar uma UF acrescenta apenas
+    as requisições dos seus próprios dados.
+
+    Atributos:
+        uf_codes (List[int]): Códigos das UFs a extrair.
+        list_of_tables (Optional[List[int]]): Lista de IDs de tabelas a serem processadas.
+        processes (int): Número de processos paralelos.
+        max_rate (float): Taxa máxima global de requisições por segundo.
+        options (dict): Demais argumentos repassados a `SidraMetadataExecute`.
+        results (Dict[int, dict]): Resumo de cada shard concluído.
+        failed_shards (Dict[int, str]): Erro de cada shard que falhou.
+    """
+
+    def __init__(self,
+                 uf_codes: List[int],
+                 list_of_tables: Optional[List[int]] = None,
+                 processes: Optional[int] = None,
+                 max_rate: float = 10.0,
+                 **options) -> None:
+        """
+        Inicializa o executor de shards.
+
+        Parâmetros:
+            uf_codes (List[int]): Códigos das UFs a extrair (ex.: [21, 22, 23]).
+            list_of_tables (Optional[List[int]]): Lista de IDs de tabelas para processamento.
+            processes (Optional[int]): Número de processos; o padrão é o menor entre o número de UFs e de CPUs.
+            max_rate (float): Taxa máxima global de requisições por segundo, somando todos os processos.
+            **options: Argumentos repassados a `SidraMetadataExecute` (ex.: `incremental`, `coalesce_variables`).
+        """
+        self.uf_codes = list(dict.fromkeys(uf_codes))
+        self.list_of_tables = list_of_tables
+        self.processes = processes or min(len(self.uf_codes), os.cpu_count() or 1)
+        self.max_rate = max_rate
+        self.options = {'list_of_tables': list_of_tables, 'max_rate': max_rate, **options}
+        self.results = {}
+        self.failed_shards = {}
+        logging.basicConfig(level=logging.INFO)
+
+    def batch_info(self, **kwargs):
+        """
+        Obtém os metadados das tabelas uma única vez para todos os shards (camada bronze).
+
+        Parâmetros:
+            **kwargs: Argumentos repassados a `SidraMetadataExecute.batch_info` (ex.: `bulk=True`).
+
+        Retorna:
+            Tuple[List[dict], dict]: Metadados processados e tabelas com falha.
+        """
+        return SidraMetadataExecute(**self.options).batch_info(**kwargs)
+
+    def batch_extraction(self, gold: bool = True) -> Dict[int, dict]:
+        """
+        Extrai os dados de todas as UFs em processos paralelos sob um limite de taxa global.
+
+        Uma falha em um shard é registrada em `failed_shards` sem interromper os demais.
+
+        Parâmetros:
+            gold (bool): Define se cada shard também gera os arquivos Excel da camada gold.
+
+        Retorna:
+            Dict[int, dict]: Resumo de cada shard concluído, indexado pela UF.
+        """
+        with RateLimiterManager() as manager:
+            rate_limiter = manager.AdaptiveRateLimiter(max_rate=self.max_rate)
+            with ProcessPoolExecutor(max_workers=self.processes) as executor:
+                futures = {executor.submit(_run_shard, uf_code, rate_limiter, self.options, gold): uf_code
+                           for uf_code in self.uf_codes}
+                for future in as_completed(futures):
+                    uf_code = futures[future]
+                    try:
+                        self.results[uf_code] = future.result()
+                        logging.info(f"Shard UF {uf_code} concluído: {self.results[uf_code]}")
+                    except Exception as e:
+                        self.failed_shards[uf_code] = str(e)
+                        logging.error(f"Erro no shard da UF {uf_code}: {e}")
+
+        logging.info(f"Shards concluídos: {len(self.results)} | com falha: {len(self.failed_shards)}")
+        return self.results
@@ -0,0 +1,247 @@
+import json
+import zlib
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+from urllib3.util.retry import Retry
+
+from src.services.rate_limiter import AdaptiveRateLimiter
+from src.utils.json_stream import iter_json_array
+
+
+class SidraHttpClient:
+    """
+    Camada de transporte HTTP compartilhada pelos serviços do SIDRA e do IBGE.
+
+    Mantém uma única `requests.Session` com conexões keep-alive reaproveitadas
+    entre requisições, negociação de compressão gzip/deflate e um adaptador de
+    retentativas para falhas ao estabelecer a conexão.
+
+    As respostas 429/5xx não são repetidas pelo adaptador: elas voltam a `get`, que
+    as registra no limitador de taxa, e as retentativas ficam a cargo de quem chamou
+    (ex.: `SidraAPI._fetch_url`), com a espera de `rate_limiter.wait_backoff`.
+
+    Atributos:
+    ----------
+    pool_connections : int
+        Número de pools de conexão mantidos (um por host).
+    pool_maxsize : int
+        Número máximo de conexões mantidas em cada pool.
+    max_retries : int
+        Número de retentativas do adaptador para falhas de conexão.
+    backoff_factor : float
+        Fator de espera exponencial entre as retentativas do adaptador.
+    session : requests.Session
+        Sessão HTTP compartilhada.
+    cache : ResponseCache
+        Cache persistente de respostas (opcional).
+    rate_limiter : AdaptiveRateLimiter
+        Limitador de taxa aplicado a todas as requisições que chegam à rede.
+    """
+
+    DEFAULT_HEADERS = {
+        'Accept': 'application/json',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+    }
+
+    def __init__(self,
+                 pool_connections: int = 4,
+                 pool_maxsize: int = 10,
+                 max_retries: int = 2,
+                 backoff_factor: float = 0.5,
+                 cache=None,
+                 rate_limiter: AdaptiveRateLimiter = None) -> None:
+        """
+        Inicializa a sessão HTTP com o pool de conexões e o adaptador de retentativas.
+
+        Parâmetros:
+        -----------
+        pool_connections : int, opcional
+            Número de pools de conexão mantidos (padrão é 4).
+        pool_maxsize : int, opcional
+            Número máximo de conexões por pool (padrão é 10).
+        max_retries : int, opcional
+            Número de retentativas para falhas de conexão (padrão é 2).
+        backoff_factor : float, opcional
+            Fator de espera exponencial entre retentativas (padrão é 0.5).
+        cache : ResponseCache, opcional
+            Cache persistente consultado por `get_json` antes de acessar a rede.
+        rate_limiter : AdaptiveRateLimiter, opcional
+            Limitador de taxa compartilhado. Se omitido, um limitador padrão é criado.
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.cache = cache
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.session = self._build_session()
+        logging.info(f'Sessão HTTP criada | pool_maxsize={self.pool_maxsize} | retentativas={self.max_retries}')
+
+    def _build_session(self) -> requests.Session:
+        """
+        Cria a sessão HTTP com os cabeçalhos padrão e os adaptadores montados.
+
+        Retorna:
+        --------
+        requests.Session
+            Sessão configurada.
+        """
+        # Apenas falhas de conexão são repetidas aqui; 429/5xx e erros de leitura
+        # passam pelo limitador de taxa em `get` (ver a docstring da classe).
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+
+        session = requests.Session()
+        session.headers.update(self.DEFAULT_HEADERS)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def get(self, url: str, timeout: int = 30, **kwargs) -> requests.Response:
+        """
+        Executa uma requisição GET reaproveitando as conexões da sessão.
+
+        A requisição aguarda um token do limitador de taxa, e o resultado
+        (sucesso, 429/5xx ou timeout) realimenta o ajuste da taxa.
+
+        Parâmetros:
+        -----------
+        url : str
+            URL a ser requisitada.
+        timeout : int, opcional
+            Tempo de espera máximo para a requisição (padrão é 30 segundos).
+
+        Retorna:
+        --------
+        requests.Response
+            Resposta da requisição.
+        """
+        self.rate_limiter.acquire()
+        try:
+            response = self.session.get(url, timeout=timeout, **kwargs)
+        except (Timeout, ConnectionError) as e:
+            self.rate_limiter.on_throttle(type(e).__name__)
+            raise
+
+        self.rate_limiter.record(response.status_code)
+        return response
+
+    def get_json(self, url: str, timeout: int = 30, refresh: bool = False):
+        """
+        Obtém o corpo JSON de uma URL, consultando o cache antes da rede.
+
+        Respostas com erro HTTP levantam `HTTPError` e não são armazenadas.
+
+        Parâmetros:
+        -----------
+        url : str
+            URL a ser requisitada.
+        timeout : int, opcional
+            Tempo de espera máximo para a requisição (padrão é 30 segundos).
+        refresh : bool, opcional
+            Se True, ignora a entrada do cache e a substitui pela resposta da rede.
+
+        Retorna:
+        --------
+        dict ou list
+            Conteúdo JSON da resposta.
+        """
+        if self.cache is not None and not refresh:
+            content = self.cache.get(url)
+            if content is not None:
+                return json.loads(content)
+
+        response = self.get(url, timeout=timeout)
+        response.raise_for_status()
+        data = response.json()
+
+        if self.cache is not None:
+            self.cache.set(url, response.content)
+        return data
+
+    def iter_json(self, url: str, timeout: int = 30, chunk_size: int = 64 * 1024):
+        """
+        Percorre os elementos de uma resposta em array JSON sem carregar o corpo inteiro.
+
+        O corpo é lido em blocos de `chunk_size` bytes e analisado incrementalmente.
+        Quando há cache, os blocos são comprimidos à medida que chegam e armazenados
+        ao final da leitura; um acerto no cache é descomprimido também em blocos.
+
+        Parâmetros:
+        -----------
+        url : str
+            URL a ser requisitada.
+        timeout : int, opcional
+            Tempo de espera máximo para a requisição (padrão é 30 segundos).
+        chunk_size : int, opcional
+            Tamanho dos blocos lidos da rede (padrão é 64 KB).
+
+        Retorna:
+        --------
+        Iterator
+            Elementos do array JSON, na ordem da resposta.
+        """
+        if self.cache is not None:
+            body = self.cache.get_compressed(url)
+            if body is not None:
+                yield from iter_json_array(self._decompress_chunks(body, chunk_size))
+                return
+
+        response = self.get(url, timeout=timeout, stream=True)
+        try:
+            response.raise_for_status()
+            compressor = zlib.compressobj() if self.cache is not None else None
+            parts = []
+
+            def chunks():
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if compressor is not None:
+                        parts.append(compressor.compress(chunk))
+                    yield chunk
+
+            yield from iter_json_array(chunks())
+
+            if compressor is not None:
+                parts.append(compressor.flush())
+                self.cache.set_compressed(url, b''.join(parts))
+        finally:
+            response.close()
+
+    @staticmethod
+    def _decompress_chunks(body: bytes, chunk_size: int):
+        decompressor = zlib.decompressobj()
+        for i in range(0, len(body), chunk_size):
+            yield decompressor.decompress(body[i:i + chunk_size])
+        yield decompressor.flush()
+
+    def close(self) -> None:
+        """
+        Encerra a sessão e libera as conexões abertas.
+        """
+        self.session.close()
+        if self.cache is not None:
+            self.cache.log_stats()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -2,6 +2,9 @@ import time
 import logging
 import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.services.http_client import SidraHttpClient
 
 class SidraManager:
     """
@@ -17,11 +20,13 @@ class SidraManager:
         Lista que armazena números de tabelas com falhas nas requisições.
     BASE_URL : str
         URL base para as requisições à API do IBGE.
+    http_client : SidraHttpClient
+        Camada de transporte HTTP com conexões keep-alive reaproveitadas.
     """
     
     BASE_URL = "https://servicodados.ibge.gov.br/api/v3/agregados"
 
-    def __init__(self, uf_code: int = 22) -> None:
+    def __init__(self, uf_code: int = 22, http_client: SidraHttpClient = None) -> None:
         """
         Inicializa a instância da classe SidraManager.
         
@@ -29,15 +34,18 @@ class SidraManager:
         -----------
         uf_code : int, opcional
             Código da UF de referência, padrão é 22 (Piauí).
+        http_client : SidraHttpClient, opcional
+            Transporte HTTP compartilhado. Se omitido, uma sessão própria é criada.
         """
         self.uf_ref = uf_code
+        self.http_client = http_client or SidraHttpClient()
         self.TABLE_INDEX = 0
         self.failed_requests = []  # Lista para armazenar tentativas falhas
 
         # Configurando logging
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     
-    def sidra_get_metadata(self, numero_tabela: int) -> dict:
+    def sidra_get_metadata(self, numero_tabela: int, refresh: bool = False) -> dict:
         """
         Obtém os metadados de uma tabela específica do SIDRA via API do IBGE.
         
@@ -45,6 +53,8 @@ class SidraManager:
         -----------
         numero_tabela : int
             Número da tabela para a qual os metadados são solicitados.
+        refresh : bool, opcional
+            Se True, os metadados são obtidos da rede, ignorando o cache de respostas.
         
         Retorna:
         --------
@@ -54,16 +64,84 @@ class SidraManager:
         url = f"{self.BASE_URL}/{numero_tabela}/metadados"
         
         try:
-            response = requests.get(url)
-            response.raise_for_status()
+            data = self.http_client.get_json(url, refresh=refresh)
             logging.info(f"Dados da tabela {numero_tabela} obtidos com sucesso.")
-            return response.json()
+            return data
         except requests.exceptions.RequestException as re:
             logging.error(f"Erro ao obter dados da tabela {numero_tabela}: {re}")
             self.failed_requests.append(numero_tabela)
             return None
     
-    def retry_failed_requests(self, delay_seconds=5):
+    def sidra_get_localities(self, numero_tabela: int, nivel: str = 'N6') -> list:
+        """
+        Obtém os códigos das localidades de um nível territorial disponíveis na tabela,
+        restritos à UF de referência.
+
+        Parâmetros:
+        -----------
+        numero_tabela : int
+            Número da tabela.
+        nivel : str, opcional
+            Nível territorial (padrão é 'N6', municípios).
+
+        Retorna:
+        --------
+        list
+            Códigos das localidades cujo código começa com o código da UF, ou None em caso de falha.
+        """
+        url = f"{self.BASE_URL}/{numero_tabela}/localidades/{nivel}"
+
+        prefixo = str(self.uf_ref)
+        try:
+            data = self.http_client.get_json(url)
+            codigos = sorted(str(localidade['id']) for localidade in data if str(localidade['id']).startswith(prefixo))
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+            logging.error(f"Erro ao obter as localidades {nivel} da tabela {numero_tabela}: {e}")
+            return None
+
+        logging.info(f"Localidades {nivel} da tabela {numero_tabela}: {len(codigos)} na UF {self.uf_ref}.")
+        return codigos
+
+    def sidra_get_metadata_batch(self, numeros_tabela: list, max_workers: int = 8) -> dict:
+        """
+        Obtém os metadados de várias tabelas em paralelo.
+
+        As requisições passam pelo limitador de taxa do `http_client`, de modo que
+        o número de threads só define quantas requisições podem aguardar ao mesmo
+        tempo. As tabelas com falha são adicionadas a `failed_requests` sem
+        interromper as demais.
+
+        Parâmetros:
+        -----------
+        numeros_tabela : list
+            Números das tabelas.
+        max_workers : int, opcional
+            Número máximo de requisições simultâneas. Padrão é 8.
+
+        Retorna:
+        --------
+        dict
+            Metadados obtidos, indexados pelo número da tabela, na ordem de `numeros_tabela`.
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(numeros_tabela)))) as executor:
+            futures = {executor.submit(self.sidra_get_metadata, numero_tabela): numero_tabela for numero_tabela in numeros_tabela}
+            for future in as_completed(futures):
+                numero_tabela = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    logging.error(f"Erro ao obter dados da tabela {numero_tabela}: {e}")
+                    self.failed_requests.append(numero_tabela)
+                    continue
+                if data:
+                    results[numero_tabela] = data
+                elif numero_tabela not in self.failed_requests:
+                    self.failed_requests.append(numero_tabela)
+
+        return {numero_tabela: results[numero_tabela] for numero_tabela in numeros_tabela if numero_tabela in results}
+
+    def retry_failed_requests(self, delay_seconds=5, max_workers: int = 1) -> dict:
         """
         Tenta novamente buscar os metadados para as tabelas que falharam na primeira tentativa.
         
@@ -71,25 +149,32 @@ class SidraManager:
         -----------
         delay_seconds : int, opcional
             Tempo de espera entre as tentativas, em segundos. Padrão é 5 segundos.
+        max_workers : int, opcional
+            Número de requisições simultâneas na retentativa. Padrão é 1 (sequencial).
+
+        Retorna:
+        --------
+        dict
+            Metadados recuperados na retentativa, indexados pelo número da tabela.
         """
         if not self.failed_requests:
             logging.info("Não há falhas para retry.")
-            return
+            return {}
         
         logging.info("Retentando as falhas...")
         time.sleep(delay_seconds)
         
-        retry_list = self.failed_requests[:]
+        retry_list = list(dict.fromkeys(self.failed_requests))
         self.failed_requests = []  # Limpa a lista de falhas para novas adições nesta tentativa
         
-        for numero_tabela in retry_list:
-            logging.info(f"Tentando novamente a tabela {numero_tabela}")
-            self.sidra_get_metadata(numero_tabela)
+        logging.info(f"Tentando novamente as tabelas {retry_list}")
+        recovered = self.sidra_get_metadata_batch(retry_list, max_workers=max_workers)
         
         if self.failed_requests:
             logging.warning("Algumas tabelas ainda falharam após retentativas.")
         else:
             logging.info("Todas as tabelas foram retentadas com sucesso.")
+        return recovered
     
     def sidra_process_table(self, dados: dict):
         """
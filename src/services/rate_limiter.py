@@ -0,0 +1,165 @@
+import time
+import random
+import logging
+import threading
+
+
+class AdaptiveRateLimiter:
+    """
+    Limitador de taxa do tipo token bucket com ajuste AIMD.
+
+    Cada requisição consome um token; os tokens são repostos à taxa atual.
+    Enquanto as respostas são saudáveis a taxa cresce de forma aditiva, e a cada
+    resposta 429/5xx ou timeout ela é reduzida de forma multiplicativa. As esperas
+    entre retentativas usam backoff exponencial com jitter.
+
+    Atributos:
+    ----------
+    rate : float
+        Taxa atual, em requisições por segundo.
+    min_rate : float
+        Taxa mínima permitida.
+    max_rate : float
+        Taxa máxima permitida.
+    burst : float
+        Capacidade máxima do balde (rajada de requisições).
+    increase_step : float
+        Incremento aditivo da taxa a cada resposta saudável.
+    decrease_factor : float
+        Fator multiplicativo aplicado à taxa a cada falha.
+    backoff_base : float
+        Espera base, em segundos, do backoff exponencial.
+    backoff_max : float
+        Espera máxima, em segundos, do backoff exponencial.
+    """
+
+    THROTTLE_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self,
+                 initial_rate: float = 2.0,
+                 min_rate: float = 0.2,
+                 max_rate: float = 10.0,
+                 burst: float = 4.0,
+                 increase_step: float = 0.05,
+                 decrease_factor: float = 0.5,
+                 backoff_base: float = 1.0,
+                 backoff_max: float = 60.0,
+                 log_interval: float = 30.0) -> None:
+        """
+        Inicializa o limitador com a taxa inicial e os parâmetros de ajuste.
+
+        Parâmetros:
+        -----------
+        initial_rate : float, opcional
+            Taxa inicial em requisições por segundo (padrão é 2.0).
+        min_rate : float, opcional
+            Taxa mínima (padrão é 0.2).
+        max_rate : float, opcional
+            Taxa máxima (padrão é 10.0).
+        burst : float, opcional
+            Capacidade do balde (padrão é 4.0).
+        increase_step : float, opcional
+            Incremento aditivo por resposta saudável (padrão é 0.05).
+        decrease_factor : float, opcional
+            Fator multiplicativo por falha (padrão é 0.5).
+        backoff_base : float, opcional
+            Espera base do backoff exponencial (padrão é 1 segundo).
+        backoff_max : float, opcional
+            Espera máxima do backoff exponencial (padrão é 60 segundos).
+        log_interval : float, opcional
+            Intervalo mínimo, em segundos, entre os registros da taxa atual (padrão é 30).
+        """
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.log_interval = log_interval
+
+        self.tokens = burst
+        self.requests = 0
+        self.throttled = 0
+        self._updated_at = time.monotonic()
+        self._logged_at = self._updated_at
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self) -> None:
+        """
+        Reserva um token, aguardando o tempo necessário para respeitar a taxa atual.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            self.requests += 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            self._maybe_log(now)
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_success(self) -> None:
+        """
+        Aumenta a taxa de forma aditiva após uma resposta saudável.
+        """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self, reason: str = '') -> None:
+        """
+        Reduz a taxa de forma multiplicativa após 429/5xx ou timeout.
+
+        Parâmetros:
+        -----------
+        reason : str, opcional
+            Motivo da redução, usado no log.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self.throttled += 1
+        logging.warning(f"Limitador de taxa reduzido para {self.rate:.2f} req/s ({reason})")
+
+    def record(self, status_code: int) -> None:
+        """
+        Ajusta a taxa a partir do código de status de uma resposta.
+        """
+        if status_code in self.THROTTLE_STATUS:
+            self.on_throttle(f"HTTP {status_code}")
+        else:
+            self.on_success()
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Calcula a espera antes de uma retentativa (backoff exponencial com jitter completo).
+
+        Parâmetros:
+        -----------
+        attempt : int
+            Número da tentativa que falhou, começando em 0.
+
+        Retorna:
+        --------
+        float
+            Tempo de espera em segundos.
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def wait_backoff(self, attempt: int) -> None:
+        """
+        Aguarda o tempo de backoff correspondente à tentativa.
+        """
+        time.sleep(self.backoff(attempt))
+
+    def _maybe_log(self, now: float) -> None:
+        if now - self._logged_at >= self.log_interval:
+            self._logged_at = now
+            logging.info(f"Limitador de taxa | {self.rate:.2f} req/s | requisições={self.requests} | reduções={self.throttled}")
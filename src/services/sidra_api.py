@@ -1,16 +1,17 @@
 # Bibliotecas padrão
-import time
-import locale
 import logging
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
 
 # Bibliotecas de terceiros
-from src.utils.utils import GeradorDePeriodos
+from src.utils.utils import GeradorDePeriodos, PlanejadorDeRequisicoes, codificar_periodos, compactar_tipos, concatenar_compacto
+from src.services.http_client import SidraHttpClient
 import pandas as pd
-import requests
 from requests.exceptions import (
     HTTPError, 
     ConnectionError, 
@@ -31,15 +32,89 @@ class SidraAPI:
         Instância da classe responsável por gerar períodos para as requisições.
     urls : list
         Lista de URLs geradas para fazer as requisições à API SIDRA.
+    max_workers : int
+        Número máximo de threads usadas no modo concorrente.
+    max_per_host : int
+        Número máximo de requisições simultâneas para um mesmo host.
+    http_client : SidraHttpClient
+        Camada de transporte HTTP com conexões keep-alive reaproveitadas.
+    planejador : PlanejadorDeRequisicoes
+        Planejador que agrupa períodos e categorias conforme o limite de valores por requisição.
+    max_url_length : int
+        Comprimento máximo das URLs geradas ao empacotar listas de localidades.
+    uf_code : int
+        Código da UF de referência para os níveis territoriais N2, N3 e N6.
+    timeout : int
+        Tempo de espera máximo de cada requisição, usado quando os métodos não informam outro.
+    max_retries : int
+        Número máximo de tentativas de cada requisição, usado quando os métodos não informam outro.
     """
+
+    MAX_URL_LENGTH = 2048
+    # Reserva de caracteres para os segmentos de variável, período e classificação
+    URL_RESERVA = 512
+    # Maior número de municípios de uma UF (MG); usado quando a lista de municípios não é conhecida
+    MAX_MUNICIPIOS_UF = 853
     
-    def __init__(self):
+    def __init__(self, 
+                 max_workers: int = 8, 
+                 max_per_host: int = 4, 
+                 http_client: SidraHttpClient = None, 
+                 limite_valores: int = PlanejadorDeRequisicoes.LIMITE_VALORES,
+                 max_url_length: int = MAX_URL_LENGTH,
+                 uf_code: int = 22,
+                 timeout: int = 30,
+                 max_retries: int = 2):
         """
         Inicializa a classe SidraAPI com um gerador de períodos.
+
+        Parâmetros:
+        -----------
+        max_workers : int, opcional
+            Número máximo de threads usadas no modo concorrente (padrão é 8).
+        max_per_host : int, opcional
+            Limite de requisições simultâneas por host (padrão é 4).
+        http_client : SidraHttpClient, opcional
+            Transporte HTTP compartilhado. Se omitido, uma sessão própria é criada.
+        limite_valores : int, opcional
+            Número máximo de valores por requisição usado pelo planejador (padrão é 50.000).
+        max_url_length : int, opcional
+            Comprimento máximo das URLs com listas de localidades (padrão é 2048).
+        uf_code : int, opcional
+            Código da UF de referência (padrão é 22, Piauí).
+        timeout : int, opcional
+            Tempo de espera máximo de cada requisição (padrão é 30 segundos).
+        max_retries : int, opcional
+            Número máximo de tentativas de cada requisição (padrão é 2).
         """
         self.get_p = GeradorDePeriodos()
+        self.planejador = PlanejadorDeRequisicoes(limite_valores, gerador=self.get_p)
+        self.http_client = http_client or SidraHttpClient(pool_maxsize=max_per_host)
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.max_url_length = max_url_length
+        self.uf_code = uf_code
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.tabela = ''
+        self.variavel = ''
+        self.nivel_territorial = ''
+        self.localidades = {}
+        self._host_semaphores = {}
+        self._host_lock = threading.Lock()
+        self.failed_urls = []
         logging.info('Objeto SidraAPI criado com sucesso')
 
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """
+        Retorna o semáforo que limita as requisições simultâneas ao host da URL.
+        """
+        host = urlparse(url).netloc
+        with self._host_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_semaphores[host]
+
     def _ajustar_nivel_territorial(self):
         """
         Ajusta o nível territorial com base no mapeamento fornecido.
@@ -49,17 +124,78 @@ class SidraAPI:
         list
             Lista de partes ajustadas para o nível territorial.
         """
+        return [segmento for _, segmento in self._segmentos_territoriais()]
+
+    def _segmentos_territoriais(self) -> list:
+        """
+        Gera os segmentos territoriais das URLs a partir dos níveis da tabela.
+
+        Os municípios (N6) são solicitados em listas de códigos empacotadas em poucas
+        URLs (ver `_empacotar_localidades`) quando a lista de `localidades` é conhecida,
+        ou com `N6/in N3 <UF>` caso contrário. A grande região (N2) é o primeiro
+        dígito do código da UF.
+
+        Retorna:
+        --------
+        list
+            Pares (território, segmento), onde território é a chave usada pelas marcas
+            de extração (ex.: ('N3/22', 'N3/22') ou ('N6', 'N6/2200053,2200103,...')).
+        """
+        uf = str(self.uf_code)
         n_map = {
             "N1": "N1/1",
-            "N2": "N2/2",
-            "N3": "N3/22",
-            "N6": "N6/2200053,2211704"
+            "N2": f"N2/{uf[0]}",
+            "N3": f"N3/{uf}",
+            "N6": f"N6/in N3 {uf}"
         }
 
-        parts = self.nivel_territorial.split(", ")
-        parts_ajuste = [n_map[part] for part in parts if part in n_map]
+        segmentos = []
+        for part in self.nivel_territorial.split(", "):
+            if part not in n_map:
+                continue
+            if part == "N6":
+                codigos = self.localidades.get(part)
+                pacotes = self._empacotar_localidades(part, codigos) if codigos else [n_map[part]]
+                segmentos.extend((part, pacote) for pacote in pacotes)
+            else:
+                segmentos.append((n_map[part], n_map[part]))
+        return segmentos
+
+    def _empacotar_localidades(self, nivel: str, codigos: list) -> list:
+        """
+        Agrupa os códigos de localidades no menor número de segmentos `N6/c1,c2,...`.
+
+        Cada segmento respeita o comprimento máximo da URL (descontada a reserva para
+        os demais segmentos) e o limite de valores por requisição para um único
+        período, de modo que o planejador ainda consiga montar requisições válidas.
+
+        Parâmetros:
+        -----------
+        nivel : str
+            Nível territorial (ex.: 'N6').
+        codigos : list
+            Códigos das localidades.
+
+        Retorna:
+        --------
+        list
+            Segmentos territoriais.
+        """
+        n_variaveis = len(str(self.variavel).split(','))
+        max_localidades = max(self.planejador.limite_valores // n_variaveis, 1)
+        max_chars = self.max_url_length - self.URL_RESERVA - len(f"https://apisidra.ibge.gov.br/values/t/{self.tabela}/v/{self.variavel}")
+
+        pacotes, atual, tamanho = [], [], len(nivel) + 1
+        for codigo in map(str, codigos):
+            if atual and (tamanho + len(codigo) + 1 > max_chars or len(atual) >= max_localidades):
+                pacotes.append(atual)
+                atual, tamanho = [], len(nivel) + 1
+            atual.append(codigo)
+            tamanho += len(codigo) + 1
+        if atual:
+            pacotes.append(atual)
 
-        return parts_ajuste
+        return [f"{nivel}/{','.join(pacote)}" for pacote in pacotes]
     
     def build_url(self, 
                   tabela: str, 
@@ -70,7 +206,10 @@ class SidraAPI:
                   formato: str = 'f/n', 
                   decimais: str = 'd/4', 
                   cabecalho: str = 'h/y', 
-                  api: str = None):
+                  api: str = None,
+                  watermarks: dict = None,
+                  categorias: dict = None,
+                  localidades: dict = None):
         """
         Constrói as URLs para as requisições à API SIDRA.
 
@@ -94,6 +233,16 @@ class SidraAPI:
             Inclusão ou não do cabeçalho (padrão é 'h/y').
         api : str, opcional
             URL da API para sobrescrever a construção.
+        watermarks : dict, opcional
+            Último período já extraído por nível territorial (ex.: {'N3/22': '2023'}).
+            Quando informado, apenas os períodos posteriores são solicitados.
+        categorias : dict, opcional
+            Categorias da tabela por classificação ({classificacao_id: [ids]}), obtidas dos
+            metadados. Quando informado, o planejador define as faixas de período e as
+            divisões de categorias de acordo com o limite de valores por requisição.
+        localidades : dict, opcional
+            Códigos das localidades por nível territorial (ex.: {'N6': ['2200053', ...]}),
+            obtidos de `SidraManager.sidra_get_localities`.
 
         Retorna:
         --------
@@ -107,69 +256,203 @@ class SidraAPI:
         self.formato = formato
         self.decimais = decimais
         self.cabecalho = cabecalho
+        self.categorias = categorias
+        self.localidades = localidades or {}
 
-        n_adjust_list = self._ajustar_nivel_territorial()
-        p_adjust_list = self.get_p.obter_periodo(
-            self.periodo.get('Frequência'),
-            self.periodo.get('Inicio'),
-            self.periodo.get('Final'),
-        )
+        segmentos = self._segmentos_territoriais()
+        watermarks = watermarks or {}
 
         url_base = 'https://apisidra.ibge.gov.br/values'
         urls = []
+        url_territorios = []
 
         if not api:
-            for n_adjust in n_adjust_list:
-                for p_adjust in p_adjust_list:
-                    if pd.isna(self.classificacao) or self.classificacao == "" or self.classificacao is None:
+            for territorio, n_adjust in segmentos:
+                for p_adjust, classificacao in self._segmentos_do_territorio(n_adjust, watermarks.get(territorio)):
+                    if pd.isna(classificacao) or classificacao == "" or classificacao is None:
                         url = f"{url_base}/t/{self.tabela}/{n_adjust}/v/{self.variavel}/{p_adjust}/{self.formato}/{self.decimais}/{self.cabecalho}"
                     else:
-                        url = f"{url_base}/t/{self.tabela}/{n_adjust}/v/{self.variavel}/{p_adjust}/{self.classificacao}/{self.formato}/{self.decimais}/{self.cabecalho}"
+                        url = f"{url_base}/t/{self.tabela}/{n_adjust}/v/{self.variavel}/{p_adjust}/{classificacao}/{self.formato}/{self.decimais}/{self.cabecalho}"
+                    if len(url) > self.max_url_length:
+                        logging.warning(f"URL com {len(url)} caracteres excede o limite de {self.max_url_length}: {url[:120]}...")
                     urls.append(url)
+                    url_territorios.append(territorio)
         else:
             urls.append(api)
+            url_territorios.append(None)
 
         self.urls = urls
+        self.url_territorios = url_territorios
         logging.info(f'URLs construídas com sucesso: {len(self.urls)} URL(s) gerada(s)')
     
-    def fetch_data(self, timeout=30, max_retries=2):
+    @classmethod
+    def _contar_localidades(cls, n_adjust: str) -> int:
+        """
+        Conta as localidades de um segmento territorial (ex.: 'N6/2200053,2211704' -> 2).
+
+        Para seleções do tipo 'N6/in N3 22', usa o maior número de municípios de uma UF.
+        """
+        if '/' not in n_adjust:
+            return 1
+        selecao = n_adjust.split('/', 1)[1]
+        if selecao.startswith('in '):
+            return cls.MAX_MUNICIPIOS_UF
+        return len(selecao.split(','))
+
+    def _segmentos_do_territorio(self, n_adjust: str, ultimo_periodo: str = None) -> list:
+        """
+        Gera os pares (período, classificação) de um nível territorial, a partir do
+        período seguinte a `ultimo_periodo` quando houver marca de extração anterior.
+
+        Parâmetros:
+        -----------
+        n_adjust : str
+            Segmento territorial (ex.: 'N3/22').
+        ultimo_periodo : str, opcional
+            Último período já extraído para o território.
+
+        Retorna:
+        --------
+        list
+            Pares ('/p/2012-2016', 'c1/all/'); vazio se não houver períodos novos.
+        """
+        frequencia = self.periodo.get('Frequência')
+        inicio = self.periodo.get('Inicio')
+        final = self.periodo.get('Final')
+
+        if ultimo_periodo:
+            inicio = self.get_p.proximo_periodo(frequencia, ultimo_periodo)
+            if self.get_p.periodo_posterior(frequencia, inicio, final):
+                return []
+
+        if self.categorias is not None:
+            return self.planejador.planejar(
+                frequencia, inicio, final,
+                categorias=self.categorias,
+                n_variaveis=len(str(self.variavel).split(',')),
+                n_localidades=self._contar_localidades(n_adjust)
+            )
+
+        return [(p_adjust, self.classificacao) for p_adjust in self.get_p.obter_periodo(frequencia, inicio, final)]
+
+    def _fetch_url(self, url: str, timeout: int, max_retries: int, parser=None):
+        """
+        Faz a requisição de uma única URL, com tentativas de repetição.
+
+        Parâmetros:
+        -----------
+        url : str
+            URL a ser requisitada.
+        timeout : int
+            Tempo de espera máximo para a requisição.
+        max_retries : int
+            Número máximo de tentativas de requisição.
+        parser : callable, opcional
+            Função aplicada ao JSON da resposta (padrão é `format_data`).
+
+        Retorna:
+        --------
+        pd.DataFrame ou None
+            DataFrame formatado (ou o resultado de `parser`) ou None em caso de falha.
+        """
+        parser = parser or self.format_data
+        attempt = 0
+        while attempt < max_retries:
+            try:
+                with self._host_semaphore(url):
+                    data = self.http_client.get_json(url, timeout=timeout)
+                return parser(data)
+            except (HTTPError, ConnectionError, Timeout, TooManyRedirects) as e:
+                logging.warning(f"Tentativa {attempt + 1}: Erro ao buscar dados da URL {url}: {e}")
+                self.http_client.rate_limiter.wait_backoff(attempt)
+                attempt += 1
+            except Exception as e:
+                logging.error(f"Erro inesperado ao buscar dados da URL {url}: {e}")
+                break
+        return None
+
+    def fetch_raw(self, url: str):
+        """
+        Requisita uma única URL e retorna o JSON da resposta sem formatá-lo.
+
+        Usa o `timeout` e o `max_retries` da instância, com as mesmas retentativas
+        e o mesmo limite por host de `fetch_data`.
+
+        Parâmetros:
+        -----------
+        url : str
+            URL a ser requisitada.
+
+        Retorna:
+        --------
+        list ou None
+            Resposta da API (cabeçalho + linhas) ou None em caso de falha.
+        """
+        return self._fetch_url(url, self.timeout, self.max_retries, parser=lambda data: data)
+
+    def _fetch_checkpointed(self, url: str, timeout: int, max_retries: int, parser=None, checkpoint=None):
+        """
+        Requisita uma URL, reaproveitando a saída já registrada no ponto de controle, se houver,
+        e registrando nele o resultado da requisição.
+        """
+        if checkpoint is not None:
+            stored = checkpoint.load(url)
+            if stored is not None:
+                logging.info(f"Unidade já concluída, carregada do disco: {url}")
+                return stored
+
+        result = self._fetch_url(url, timeout, max_retries, parser)
+        if checkpoint is not None:
+            if result is None:
+                checkpoint.fail(url, 'falha na requisição')
+            else:
+                checkpoint.save(url, result)
+        return result
+
+    def _fetch_all(self, timeout: int, max_retries: int, concurrent: bool, parser=None, checkpoint=None) -> list:
+        """
+        Requisita todas as URLs em `self.urls`, em sequência ou em paralelo,
+        preservando a ordem dos resultados.
+        """
+        def fetch(url):
+            return self._fetch_checkpointed(url, timeout, max_retries, parser, checkpoint)
+
+        if concurrent and len(self.urls) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.urls))) as executor:
+                return list(executor.map(fetch, self.urls))
+        return [fetch(url) for url in self.urls]
+
+    def fetch_data(self, timeout=None, max_retries=None, concurrent: bool = False, checkpoint=None):
         """
         Faz requisições às URLs geradas e obtém os dados em formato JSON.
         
         Parâmetros:
         -----------
         timeout : int, opcional
-            Tempo de espera máximo para a requisição (padrão é 30 segundos).
+            Tempo de espera máximo para a requisição (padrão é o `timeout` da instância).
         max_retries : int, opcional
-            Número máximo de tentativas de requisição (padrão é 2).
+            Número máximo de tentativas de requisição (padrão é o `max_retries` da instância).
+        concurrent : bool, opcional
+            Se True, as URLs são requisitadas em paralelo, respeitando
+            `max_workers` e `max_per_host`. A ordem dos resultados é preservada.
+        checkpoint : UnitCheckpoint, opcional
+            Ponto de controle do diário de execução. As URLs já concluídas são
+            carregadas do disco e cada nova resposta é registrada assim que obtida.
         
         Retorna:
         --------
         pd.DataFrame
             DataFrame com os dados coletados.
         """
-        results = []
         logging.info(f'Processando a Tabela {self.tabela} | Variável {self.variavel} | Total de URLs: {len(self.urls)}')
 
-        for url in self.urls:
-            attempt = 0
-            while attempt < max_retries:
-                try:
-                    response = requests.get(url, timeout=timeout)
-                    response.raise_for_status()
-                    response_df = self.format_data(response.json())
-                    results.append(response_df)
-                    break  # Se a requisição for bem-sucedida, sai do loop
-                except (HTTPError, ConnectionError, Timeout, TooManyRedirects) as e:
-                    logging.warning(f"Tentativa {attempt + 1}: Erro ao buscar dados da URL {url}: {e}")
-                    attempt += 1
-                    time.sleep(5)
-                except Exception as e:
-                    logging.error(f"Erro inesperado ao buscar dados da URL {url}: {e}")
-                    break
+        timeout, max_retries = timeout or self.timeout, max_retries or self.max_retries
+        responses = self._fetch_all(timeout, max_retries, concurrent, checkpoint=checkpoint)
+        self.failed_urls = [url for url, df in zip(self.urls, responses) if df is None]
+        results = [df for df in responses if df is not None]
 
         if results:
-            final_df = pd.concat(results, ignore_index=True)
+            final_df = concatenar_compacto(results)
             logging.info("Dados concatenados com sucesso.")
         else:
             final_df = pd.DataFrame()
@@ -177,10 +460,207 @@ class SidraAPI:
 
         return final_df
     
+    def _stream_url(self, url: str, batch_size: int, timeout: int, max_retries: int):
+        """
+        Lê uma URL em modo streaming e gera DataFrames formatados de até `batch_size` linhas.
+
+        As retentativas só acontecem antes do primeiro lote ser entregue, para não
+        duplicar linhas no consumidor; uma falha posterior marca a URL como falha.
+        """
+        attempt = 0
+        while attempt < max_retries:
+            delivered = False
+            try:
+                with self._host_semaphore(url):
+                    items = self.http_client.iter_json(url, timeout=timeout)
+                    header = next(items, None)
+                    if header is None:
+                        return
+
+                    batch = [header]
+                    for item in items:
+                        batch.append(item)
+                        if len(batch) > batch_size:
+                            yield self.format_data(batch)
+                            delivered = True
+                            batch = [header]
+                    if len(batch) > 1:
+                        yield self.format_data(batch)
+                return
+            except (HTTPError, ConnectionError, Timeout, TooManyRedirects) as e:
+                if delivered:
+                    logging.error(f"Conexão interrompida após lotes entregues da URL {url}: {e}")
+                    break
+                logging.warning(f"Tentativa {attempt + 1}: Erro ao buscar dados da URL {url}: {e}")
+                self.http_client.rate_limiter.wait_backoff(attempt)
+                attempt += 1
+            except Exception as e:
+                logging.error(f"Erro inesperado ao buscar dados da URL {url}: {e}")
+                break
+        self.failed_urls.append(url)
+
+    def fetch_data_stream(self, batch_size: int = 50000, timeout=None, max_retries=None, checkpoint=None):
+        """
+        Faz as requisições às URLs geradas em modo streaming, entregando lotes tipados.
+
+        O corpo de cada resposta é analisado incrementalmente: o cabeçalho vem do
+        primeiro elemento do array e as linhas são agrupadas em lotes de tamanho fixo,
+        de modo que a memória por requisição não cresce com o tamanho da resposta.
+
+        Parâmetros:
+        -----------
+        batch_size : int, opcional
+            Número de linhas por lote (padrão é 50.000).
+        timeout : int, opcional
+            Tempo de espera máximo para a requisição (padrão é o `timeout` da instância).
+        max_retries : int, opcional
+            Número máximo de tentativas de requisição (padrão é o `max_retries` da instância).
+        checkpoint : UnitCheckpoint, opcional
+            Ponto de controle do diário de execução. Cada lote é gravado à medida que
+            é entregue e a URL só é registrada como concluída após o último lote.
+
+        Retorna:
+        --------
+        Iterator[pd.DataFrame]
+            Lotes formatados, na ordem das URLs.
+        """
+        logging.info(f'Processando a Tabela {self.tabela} | Variável {self.variavel} | Total de URLs: {len(self.urls)} (streaming)')
+        timeout, max_retries = timeout or self.timeout, max_retries or self.max_retries
+        self.failed_urls = []
+        for url in self.urls:
+            if checkpoint is None:
+                yield from self._stream_url(url, batch_size, timeout, max_retries)
+                continue
+
+            stored = checkpoint.load(url)
+            if stored is not None:
+                logging.info(f"Unidade já concluída, carregada do disco: {url}")
+                yield stored
+                continue
+
+            for index, batch in enumerate(self._stream_url(url, batch_size, timeout, max_retries)):
+                checkpoint.save_part(url, index, batch)
+                yield batch
+            if url in self.failed_urls:
+                checkpoint.fail(url, 'falha na leitura em streaming')
+            else:
+                checkpoint.complete(url)
+
+    def fetch_data_by_variable(self, timeout=None, max_retries=None, concurrent: bool = False, checkpoint=None) -> dict:
+        """
+        Faz as requisições de URLs com várias variáveis (`/v/1,2,3`) e separa a
+        resposta combinada em um DataFrame por variável.
+
+        Parâmetros:
+        -----------
+        timeout : int, opcional
+            Tempo de espera máximo para a requisição (padrão é o `timeout` da instância).
+        max_retries : int, opcional
+            Número máximo de tentativas de requisição (padrão é o `max_retries` da instância).
+        concurrent : bool, opcional
+            Se True, as URLs são requisitadas em paralelo.
+        checkpoint : UnitCheckpoint, opcional
+            Ponto de controle do diário de execução (ver `fetch_data`).
+
+        Retorna:
+        --------
+        dict
+            DataFrames indexados pelo código da variável, na ordem das URLs.
+        """
+        logging.info(f'Processando a Tabela {self.tabela} | Variáveis {self.variavel} | Total de URLs: {len(self.urls)}')
+
+        timeout, max_retries = timeout or self.timeout, max_retries or self.max_retries
+        responses = self._fetch_all(timeout, max_retries, concurrent, parser=self._format_by_variable, checkpoint=checkpoint)
+        self.failed_urls = [url for url, parts in zip(self.urls, responses) if parts is None]
+
+        results = {}
+        for parts in responses:
+            for variable_id, df in (parts or {}).items():
+                results.setdefault(variable_id, []).append(df)
+
+        if not results:
+            logging.warning("Nenhum dado foi retornado das requisições.")
+        return {variable_id: concatenar_compacto(frames) for variable_id, frames in results.items()}
+
+    def split_by_variable(self, data: list, variavel: str = None) -> dict:
+        """
+        Separa as linhas de uma resposta JSON pelo código da variável.
+
+        Parâmetros:
+        -----------
+        data : list
+            Resposta da API, com a linha de cabeçalho na primeira posição.
+        variavel : str, opcional
+            Variável(is) da requisição (padrão é a variável da última URL construída).
+            Sem a coluna de código, a resposta só é aceita se houver uma única variável.
+
+        Retorna:
+        --------
+        dict
+            Listas no mesmo formato da resposta (cabeçalho + linhas), indexadas pelo código da variável.
+
+        Exceções:
+        ---------
+        ValueError
+            Se a requisição tem várias variáveis e a resposta não traz a coluna
+            'Variável (Código)' (ex.: formato `f/n`; use `f/a` ou `f/c`).
+        """
+        if not data:
+            return {}
+
+        header = data[0]
+        variable_key = next((key for key, label in header.items() if label == 'Variável (Código)'), None)
+        if variable_key is None:
+            variavel = str(self.variavel if variavel is None else variavel)
+            if ',' in variavel:
+                raise ValueError(f"Resposta sem a coluna 'Variável (Código)'; não é possível separar as variáveis {variavel}.")
+            return {variavel: data}
+
+        parts = {}
+        for item in data[1:]:
+            parts.setdefault(str(item[variable_key]), [header]).append(item)
+        return parts
+
+    def _format_by_variable(self, data: list) -> dict:
+        return {variable_id: self.format_data(part) for variable_id, part in self.split_by_variable(data).items()}
+
+    def agrupar_variaveis(self, variaveis: list, nivel_territorial: str, categorias: dict = None, localidades: dict = None) -> list:
+        """
+        Agrupa as variáveis de uma tabela no menor número de requisições que
+        respeita o limite de valores por período.
+
+        Parâmetros:
+        -----------
+        variaveis : list
+            Códigos das variáveis da tabela.
+        nivel_territorial : str
+            Níveis territoriais da tabela (ex.: 'N1, N3').
+        categorias : dict, opcional
+            Categorias por classificação ({classificacao_id: [ids]}).
+        localidades : dict, opcional
+            Códigos das localidades por nível territorial (ver `build_url`).
+
+        Retorna:
+        --------
+        list
+            Grupos de códigos de variáveis.
+        """
+        self.nivel_territorial = nivel_territorial
+        self.variavel = variaveis[0] if variaveis else ''
+        self.localidades = localidades or {}
+        localidades = max([self._contar_localidades(n) for n in self._ajustar_nivel_territorial()] or [1])
+        por_variavel = self.planejador.estimar_valores(1, categorias or {}, n_localidades=localidades)
+        tamanho = max(self.planejador.limite_valores // max(por_variavel, 1), 1)
+        return [variaveis[i:i + tamanho] for i in range(0, len(variaveis), tamanho)]
+
     def format_data(self, data):
         """
         Formata os dados recebidos da API em um DataFrame.
 
+        O código IBGE da unidade territorial, quando presente na resposta, é mantido
+        em 'Região (Código)' (Int32); os demais códigos são descartados e o código do
+        período é derivado do rótulo (ver `codificar_periodos`).
+
         Parâmetros:
         -----------
         data : dict
@@ -206,18 +686,29 @@ class SidraAPI:
             'Mês': 'Período'
         }
 
+        # O código da unidade territorial (formatos `f/u` e `f/a`) é mantido como inteiro
+        rename_map.update({f'{nome} (Código)': f'{destino} (Código)'
+                           for nome, destino in rename_map.items() if destino == 'Região'})
+
         df.columns = df.iloc[0]
         df = df.rename(columns=rename_map)
         df = df[1:]  # Remove a primeira linha que contém o cabeçalho original
-        columns_to_remove = [column for column in df.columns if "(Código)" in column]
+        columns_to_remove = [column for column in df.columns if "(Código)" in column and column != 'Região (Código)']
         df = df.drop(columns=columns_to_remove)
-        df['Valor'] = pd.to_numeric(df['Valor'], errors='coerce')
-        
-        locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')  # Ajusta a localidade conforme necessário
-        df['Valor'] = df['Valor'].apply(lambda x: locale.format_string('%.2f', x, grouping=True))
+        if 'Região (Código)' in df.columns:
+            df['Região (Código)'] = pd.to_numeric(df['Região (Código)'], errors='coerce').astype('Int32')
 
         if df.columns[-1] != 'Categorias':
             df.columns = [*df.columns[:-1], 'Categorias']
 
+        # Valor permanece float64 (NaN para '..', '-', 'X'); a formatação pt-BR é aplicada
+        # apenas na exportação (ver `formatar_valores_ptbr`). As dimensões viram `category`.
+        df = compactar_tipos(df.reset_index(drop=True))
+
+        # Os rótulos de período só são ordenáveis nas tabelas anuais; o código do SIDRA
+        # (YYYY, YYYYMM, YYYYTT) acompanha o rótulo para ordenação e tipagem no banco.
+        if 'Período' in df.columns:
+            df.insert(df.columns.get_loc('Período') + 1, 'Período (Código)', codificar_periodos(df['Período']))
+
         logging.info("Dados formatados com sucesso.")
         return df
@@ -0,0 +1,102 @@
+import pandas as pd
+from openpyxl import Workbook
+
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_MAX_SHEET_NAME = 31
+
+
+class StreamingWorkbookWriter:
+    """Escreve arquivos Excel em memória constante, aba a aba e linha a linha.
+
+    Usa o modo `write_only` do openpyxl: cada linha é serializada assim que é
+    acrescentada, em vez de o arquivo inteiro ser montado em memória como no
+    `pd.ExcelWriter`. Os dados de cada aba podem ser entregues em lotes, que são
+    descartados logo após a escrita. Abas que excederiam o limite de linhas do Excel
+    são divididas automaticamente em "<nome> (2)", "<nome> (3)" etc., repetindo o
+    cabeçalho.
+
+    Args:
+        path (str): Caminho do arquivo Excel de destino.
+        max_rows (int): Número máximo de linhas por aba, incluindo o cabeçalho
+            (padrão é o limite do Excel, 1.048.576).
+
+    Attributes:
+        workbook (openpyxl.Workbook): Arquivo em modo `write_only`.
+        sheets (dict): Número de linhas de dados escritas em cada aba criada.
+    """
+
+    def __init__(self, path: str, max_rows: int = EXCEL_MAX_ROWS):
+        if max_rows < 2:
+            raise ValueError("max_rows deve comportar o cabeçalho e ao menos uma linha de dados.")
+        self.path = path
+        self.max_rows = max_rows
+        self.workbook = Workbook(write_only=True)
+        self.sheets = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    @staticmethod
+    def _sheet_name(name: str, part: int) -> str:
+        if part == 1:
+            return name[:EXCEL_MAX_SHEET_NAME]
+        suffix = f' ({part})'
+        return name[:EXCEL_MAX_SHEET_NAME - len(suffix)] + suffix
+
+    def _new_sheet(self, name: str, part: int, columns: list):
+        sheet = self.workbook.create_sheet(self._sheet_name(name, part))
+        sheet.append([str(column) for column in columns])
+        self.sheets[sheet.title] = 0
+        return sheet
+
+    def write_sheet(self, name: str, data) -> list:
+        """Escreve os dados em uma aba (ou em várias, se excederem o limite de linhas).
+
+        Args:
+            name (str): Nome da aba.
+            data (pandas.DataFrame | Iterable[pandas.DataFrame]): Dados da aba, inteiros ou
+                em lotes com as mesmas colunas; o cabeçalho vem do primeiro lote.
+
+        Returns:
+            list: Nomes das abas criadas.
+        """
+        chunks = [data] if isinstance(data, pd.DataFrame) else data
+        limit = self.max_rows - 1
+        created = []
+        sheet = None
+
+        for chunk in chunks:
+            if sheet is None:
+                sheet = self._new_sheet(name, 1, list(chunk.columns))
+                created.append(sheet.title)
+                written = 0
+            values = chunk.astype(object).where(chunk.notna(), None)
+            for row in values.itertuples(index=False, name=None):
+                if written == limit:
+                    sheet = self._new_sheet(name, len(created) + 1, list(chunk.columns))
+                    created.append(sheet.title)
+                    written = 0
+                sheet.append(row)
+                written += 1
+                self.sheets[sheet.title] = written
+
+        if sheet is None:  # sem lotes: a aba é criada vazia
+            created.append(self._new_sheet(name, 1, []).title)
+        return created
+
+    def close(self) -> None:
+        """Grava o arquivo em disco."""
+        self.workbook.save(self.path)
+
+    def discard(self) -> None:
+        """Descarta o arquivo em construção (ex.: após um erro), removendo os arquivos temporários das abas."""
+        for sheet in self.workbook.worksheets:
+            if not sheet.closed:
+                sheet.close()
+            sheet._writer.cleanup()
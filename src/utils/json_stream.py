@@ -0,0 +1,69 @@
+import json
+import codecs
+
+
+def iter_json_array(chunks, encoding: str = 'utf-8'):
+    """Percorre incrementalmente um array JSON de nível superior, elemento a elemento.
+
+    Os blocos de bytes são decodificados e analisados à medida que chegam, de modo
+    que apenas o elemento corrente e o trecho ainda não consumido ficam em memória.
+
+    Args:
+        chunks (Iterable[bytes]): Blocos do corpo da resposta (ex.: `response.iter_content()`).
+        encoding (str): Codificação do corpo (padrão é 'utf-8').
+
+    Yields:
+        object: Cada elemento do array, já convertido pelo módulo `json`.
+
+    Raises:
+        ValueError: Se o conteúdo não for um array JSON válido.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    buffer = ''
+    pos = 0
+    started = False
+    finished = False
+
+    def skip(buf, i, chars=' \t\r\n'):
+        while i < len(buf) and buf[i] in chars:
+            i += 1
+        return i
+
+    for chunk in chunks:
+        if finished:
+            break
+        buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+
+        if not started:
+            pos = skip(buffer, pos, ' \t\r\n\ufeff')
+            if pos >= len(buffer):
+                continue
+            if buffer[pos] != '[':
+                raise ValueError("O conteúdo não é um array JSON.")
+            pos += 1
+            started = True
+
+        while True:
+            pos = skip(buffer, pos, ' \t\r\n,')
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == ']':
+                finished = True
+                break
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # elemento incompleto: aguarda o próximo bloco
+            # Números e literais só estão completos se seguidos de um delimitador
+            if not isinstance(item, (dict, list, str)) and (end >= len(buffer) or buffer[end] not in ' \t\r\n,]'):
+                break
+            yield item
+            pos = end
+
+    if not finished:
+        buffer = buffer[pos:] + text_decoder.decode(b'', final=True)
+        pos = skip(buffer, 0, ' \t\r\n,')
+        if not started or pos >= len(buffer) or buffer[pos] != ']':
+            raise ValueError("Array JSON incompleto.")
@@ -0,0 +1,131 @@
+import time
+import queue
+import logging
+import threading
+
+_FIM = object()
+
+
+class StagedPipeline:
+    """Pipeline produtor/consumidor com estágios ligados por filas limitadas.
+
+    Cada estágio tem sua própria função e número de threads. As filas entre os
+    estágios têm tamanho máximo, de modo que um estágio rápido bloqueia (backpressure)
+    em vez de acumular itens em memória quando o seguinte está atrasado. Um erro em
+    um item é registrado e não interrompe os demais; com `on_error`, o item que falhou
+    segue para o próximo estágio marcado como falha, em vez de ser descartado.
+
+    Args:
+        stages (list): Tuplas (nome, função, workers). A função recebe um item e
+            retorna o item para o próximo estágio ou None para descartá-lo.
+        queue_size (int): Tamanho máximo de cada fila (padrão é 16).
+        report_interval (float): Intervalo, em segundos, entre os registros das
+            profundidades das filas (padrão é 10).
+        on_error (callable): Função que recebe (estágio, item, exceção) e retorna o item
+            a repassar ao próximo estágio, ou None para descartá-lo (padrão é descartar).
+
+    Attributes:
+        stats (dict): Por estágio, itens processados, erros e a maior profundidade da fila de entrada.
+        errors (list): Tuplas (estágio, item, exceção) dos itens que falharam.
+    """
+
+    def __init__(self, stages, queue_size: int = 16, report_interval: float = 10.0, on_error=None):
+        self.stages = [(name, func, max(int(workers), 1)) for name, func, workers in stages]
+        self.queue_size = queue_size
+        self.report_interval = report_interval
+        self.on_error = on_error
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in self.stages]
+        self.stats = {name: {'processados': 0, 'erros': 0, 'fila_max': 0} for name, _, _ in self.stages}
+        self.errors = []
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def depths(self) -> dict:
+        """Retorna a profundidade atual da fila de entrada de cada estágio."""
+        return {name: q.qsize() for (name, _, _), q in zip(self.stages, self.queues)}
+
+    def _put(self, index: int, item) -> None:
+        self.queues[index].put(item)
+        name = self.stages[index][0]
+        depth = self.queues[index].qsize()
+        with self._lock:
+            if depth > self.stats[name]['fila_max']:
+                self.stats[name]['fila_max'] = depth
+
+    def _worker(self, index: int, remaining: list) -> None:
+        name, func, _ = self.stages[index]
+        source = self.queues[index]
+        last = index == len(self.stages) - 1
+
+        while True:
+            item = source.get()
+            if item is _FIM:
+                break
+            try:
+                result = func(item)
+                if result is not None and not last:
+                    self._put(index + 1, result)
+                with self._lock:
+                    self.stats[name]['processados'] += 1
+            except Exception as e:
+                logging.error(f"Erro no estágio '{name}': {e}")
+                with self._lock:
+                    self.stats[name]['erros'] += 1
+                    self.errors.append((name, item, e))
+                if self.on_error is not None and not last:
+                    try:
+                        failed = self.on_error(name, item, e)
+                    except Exception as error:
+                        logging.error(f"Erro ao repassar a falha do estágio '{name}': {error}")
+                        failed = None
+                    if failed is not None:
+                        self._put(index + 1, failed)
+
+        # O último worker de um estágio encerra os workers do estágio seguinte
+        with self._lock:
+            remaining[index] -= 1
+            closing = remaining[index] == 0
+        if closing and not last:
+            for _ in range(self.stages[index + 1][2]):
+                self.queues[index + 1].put(_FIM)
+
+    def _monitor(self) -> None:
+        while not self._done.wait(self.report_interval):
+            depths = ' | '.join(f"{name}={depth}/{self.queue_size}" for name, depth in self.depths().items())
+            logging.info(f"Filas do pipeline: {depths}")
+
+    def run(self, items) -> dict:
+        """Alimenta o primeiro estágio com `items` e aguarda o esvaziamento de todos os estágios.
+
+        Args:
+            items (Iterable): Itens de entrada; são consumidos sob demanda, respeitando o tamanho da fila.
+
+        Returns:
+            dict: Estatísticas por estágio (ver `stats`).
+        """
+        remaining = [workers for _, _, workers in self.stages]
+        threads = [
+            threading.Thread(target=self._worker, args=(index, remaining), name=f"{name}-{n}", daemon=True)
+            for index, (name, _, workers) in enumerate(self.stages)
+            for n in range(workers)
+        ]
+        monitor = threading.Thread(target=self._monitor, name="pipeline-monitor", daemon=True)
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        monitor.start()
+
+        try:
+            for item in items:
+                self._put(0, item)
+        finally:
+            for _ in range(self.stages[0][2]):
+                self.queues[0].put(_FIM)
+            for thread in threads:
+                thread.join()
+            self._done.set()
+
+        summary = ' | '.join(f"{name}: {s['processados']} itens, {s['erros']} erros, fila máx. {s['fila_max']}"
+                             for name, s in self.stats.items())
+        logging.info(f"Pipeline concluído em {time.monotonic() - start:.1f} s | {summary}")
+        return self.stats
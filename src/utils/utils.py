@@ -1,5 +1,152 @@
+import re
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+_PTBR_SEPARADORES = str.maketrans(',.', '.,')
+# Maior valor (em unidades da última casa decimal) representado exatamente em float64
+_INTEIRO_EXATO = 2 ** 53
+
+_MESES = ['janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho',
+          'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro']
+_MESES_ABREVIADOS = [mes[:3] for mes in _MESES]
+_ROTULO_PERIODO = re.compile(
+    r'(?:(?P<ordem>\d)º (?:trimestre|semestre)|(?P<mes>[a-zç]+)|[a-zç]{3}-[a-zç]{3}-(?P<movel>[a-zç]{3}))?\s*(?P<ano>\d{4})'
+)
+
+
+def _formatar_ptbr_python(valor: float, casas: int) -> str:
+    return f'{valor:,.{casas}f}'.translate(_PTBR_SEPARADORES)
+
+
+def _texto_com_zeros(numeros: np.ndarray, largura: int) -> pa.Array:
+    return pc.utf8_lpad(pc.cast(pa.array(numeros), pa.string()), width=largura, padding='0')
+
+
+def formatar_valores_ptbr(valores: pd.Series, casas: int = 2) -> pd.Series:
+    """Formata uma série numérica no padrão pt-BR (ex.: 1234.5 -> '1.234,50'), sem usar `locale`.
+
+    A formatação é vetorizada: os valores são arredondados para inteiros na última
+    casa decimal (numpy), a parte inteira é dividida em grupos de três dígitos e os
+    textos são montados com as funções de string do Arrow, sem uma chamada Python
+    por valor. O resultado é igual ao do formatador do Python (`'{:,.2f}'`): os
+    valores próximos de um empate no arredondamento, os não finitos e os grandes
+    demais para a aritmética inteira exata são formatados por ele, um a um. Não há
+    estado global de processo, o que permite o uso em várias threads. Valores
+    ausentes permanecem ausentes.
+    """
+    numeros = pd.to_numeric(valores, errors='coerce')
+    presentes = numeros.notna().to_numpy()
+    x = numeros.to_numpy(dtype='float64', na_value=np.nan)[presentes]
+
+    escala = 10 ** casas
+    with np.errstate(invalid='ignore', over='ignore'):
+        escalados = np.abs(x) * escala
+        parte = escalados - np.floor(escalados)
+        vetorizados = np.isfinite(escalados) & (escalados < _INTEIRO_EXATO) & (np.abs(parte - 0.5) > 1e-6)
+
+    unidades = np.rint(escalados[vetorizados]).astype(np.int64)
+    inteiros, fracoes = np.divmod(unidades, escala)
+
+    grupos = (len(str(int(inteiros.max()))) + 2) // 3 if len(inteiros) else 1
+    texto = _texto_com_zeros(inteiros // 1000 ** (grupos - 1) % 1000, 3)
+    for k in range(grupos - 2, -1, -1):
+        texto = pc.binary_join_element_wise(texto, _texto_com_zeros(inteiros // 1000 ** k % 1000, 3), '.')
+    texto = pc.utf8_ltrim(texto, characters='0.')
+    texto = pc.if_else(pc.equal(texto, ''), '0', texto)
+    if casas > 0:
+        texto = pc.binary_join_element_wise(texto, _texto_com_zeros(fracoes, casas), ',')
+    sinal = pa.array(np.where(np.signbit(x[vetorizados]), '-', ''))
+    texto = pc.binary_join_element_wise(sinal, texto, '')
+
+    formatados = np.empty(len(x), dtype=object)
+    formatados[vetorizados] = texto.to_numpy(zero_copy_only=False)
+    formatados[~vetorizados] = [_formatar_ptbr_python(v, casas) for v in x[~vetorizados]]
+
+    resultado = np.full(len(numeros), None, dtype=object)
+    resultado[presentes] = formatados
+    return pd.Series(resultado, index=valores.index, dtype=object)
+
+
+def compactar_tipos(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte um DataFrame extraído do SIDRA para a representação compacta.
+
+    `Valor` passa a float64, com NaN para os marcadores de ausência do SIDRA
+    ('..', '...', '-', 'X'), e as colunas de dimensão (Região, Período, Unidade de
+    Medida, Categorias etc.) passam a `category`, cujos códigos internos são
+    inteiros pequenos.
+    """
+    for col in df.columns:
+        if col == 'Valor':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        elif df[col].dtype == object or pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def _codigo_periodo(rotulo: str):
+    match = _ROTULO_PERIODO.fullmatch(rotulo.strip().lower())
+    if match is None:
+        return None
+    ano = int(match['ano'])
+    if match['ordem']:
+        return ano * 100 + int(match['ordem'])
+    if match['mes']:
+        return ano * 100 + _MESES.index(match['mes']) + 1 if match['mes'] in _MESES else None
+    if match['movel']:
+        return ano * 100 + _MESES_ABREVIADOS.index(match['movel']) + 1 if match['movel'] in _MESES_ABREVIADOS else None
+    return ano
+
+
+def codificar_periodos(periodos: pd.Series) -> pd.Series:
+    """Converte os rótulos de período do SIDRA nos códigos ordenáveis da API (Int32).
+
+    Segue a codificação do SIDRA: '2023' -> 2023, 'janeiro 2023' -> 202301,
+    '1º trimestre 2023' e '1º semestre 2023' -> 202301, e trimestres móveis
+    ('out-nov-dez 2023') pelo último mês -> 202312. Rótulos em outros formatos
+    ficam ausentes. Cada rótulo distinto é analisado uma única vez.
+    """
+    categorias = periodos.astype('category')
+    codigos = [_codigo_periodo(str(rotulo)) for rotulo in categorias.cat.categories]
+    # posição extra para os ausentes (código -1 da categoria)
+    tabela = np.array([np.nan if c is None else c for c in codigos] + [np.nan], dtype='float64')
+    return pd.Series(tabela[categorias.cat.codes.to_numpy()], index=periodos.index).astype('Int32')
+
+
+def concatenar_compacto(frames: list) -> pd.DataFrame:
+    """Concatena DataFrames compactos preservando as colunas `category`.
+
+    `pd.concat` converte para object as colunas categóricas com categorias
+    diferentes; aqui as categorias de cada coluna são unificadas antes.
+    """
+    frames = [df for df in frames if df is not None and not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+
+    categoricas = {col for df in frames for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)}
+    for col in categoricas:
+        categorias = pd.api.types.union_categoricals(
+            [df[col].astype('category') for df in frames if col in df.columns]
+        ).categories
+        frames = [
+            df.assign(**{col: df[col].astype(pd.CategoricalDtype(categorias))}) if col in df.columns else df
+            for df in frames
+        ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def relatorio_memoria(df: pd.DataFrame) -> dict:
+    """Retorna o número de linhas e a memória ocupada (em MB) por um DataFrame."""
+    return {
+        'linhas': len(df),
+        'memoria_mb': df.memory_usage(deep=True).sum() / 1024 / 1024 if not df.empty else 0.0,
+    }
+
 
 class GeradorDePeriodos:
     def __init__(self):
@@ -21,6 +168,24 @@ class GeradorDePeriodos:
         elif self.periodicidade in ['trimestral', 'mensal']:
             return data.strftime('%Y%m')
 
+    def proximo_periodo(self, periodicidade, periodo):
+        """Retorna o código SIDRA do período imediatamente posterior a `periodo`."""
+        periodo = str(periodo)
+        ano = int(periodo[:4])
+        if periodicidade == 'anual':
+            return str(ano + 1)
+
+        sub = int(periodo[4:6])
+        ultimo = 4 if periodicidade == 'trimestral' else 12
+        if sub >= ultimo:
+            return f'{ano + 1}01'
+        return f'{ano}{sub + 1:02d}'
+
+    def periodo_posterior(self, periodicidade, periodo, referencia):
+        """Indica se `periodo` é posterior a `referencia` na mesma periodicidade."""
+        tamanho = 4 if periodicidade == 'anual' else 6
+        return int(str(periodo)[:tamanho]) > int(str(referencia)[:tamanho])
+
     def obter_periodo(self, periodicidade, inicio, fim, last: bool = None):
         if last:
             return "p/last"
@@ -46,4 +211,113 @@ class GeradorDePeriodos:
             periodos.append(f'/p/{self.formatar_data(inicio_atual)}-{self.formatar_data(fim_atual)}')
             inicio_atual = fim_atual + relativedelta(days=1)
 
-        return periodos 
\ No newline at end of file
+        return periodos 
+
+class PlanejadorDeRequisicoes:
+    """Planeja as requisições à API de valores do SIDRA a partir do tamanho estimado da resposta.
+
+    O número de valores de uma requisição é estimado como
+    categorias × variáveis × localidades × períodos, usando os metadados da tabela.
+    Os períodos são agrupados em faixas que enchem cada requisição o mais perto
+    possível de `limite_valores`, e as categorias são divididas apenas quando um
+    único período já ultrapassa o limite.
+    """
+
+    LIMITE_VALORES = 50000
+
+    def __init__(self, limite_valores: int = LIMITE_VALORES, gerador: GeradorDePeriodos = None):
+        self.limite_valores = limite_valores
+        self.gerador = gerador or GeradorDePeriodos()
+
+    def listar_periodos(self, periodicidade, inicio, fim):
+        """Lista os códigos SIDRA de todos os períodos entre `inicio` e `fim`, inclusive."""
+        periodos = []
+        if periodicidade == 'anual':
+            return [str(ano) for ano in range(int(str(inicio)[:4]), int(str(fim)[:4]) + 1)]
+
+        atual, final = str(inicio)[:6], int(str(fim)[:6])
+        while int(atual) <= final:
+            periodos.append(atual)
+            atual = self.gerador.proximo_periodo(periodicidade, atual)
+        return periodos
+
+    @staticmethod
+    def estimar_valores(n_periodos, categorias, n_variaveis=1, n_localidades=1):
+        """Estima o número de valores retornados por uma requisição."""
+        total = n_periodos * n_variaveis * n_localidades
+        for lista in categorias.values():
+            total *= max(len(lista), 1)
+        return total
+
+    def _dividir_categorias(self, categorias, valores_fixos):
+        """Divide as categorias até que um único período caiba no limite.
+
+        Retorna uma lista de dicionários {classificação: lista de categorias ou None},
+        onde None indica que a classificação inteira é solicitada com `all`.
+        """
+        partes = {cid: None for cid in categorias}
+        tamanhos = {cid: max(len(lista), 1) for cid, lista in categorias.items()}
+
+        def valores_por_periodo():
+            total = valores_fixos
+            for tamanho in tamanhos.values():
+                total *= tamanho
+            return total
+
+        for cid in sorted(categorias, key=lambda c: len(categorias[c]), reverse=True):
+            if valores_por_periodo() <= self.limite_valores:
+                break
+            outros = valores_por_periodo() // tamanhos[cid]
+            por_parte = max(self.limite_valores // outros, 1)
+            lista = list(categorias[cid])
+            partes[cid] = [lista[i:i + por_parte] for i in range(0, len(lista), por_parte)]
+            tamanhos[cid] = min(por_parte, len(lista))
+
+        combinacoes = [{}]
+        for cid, blocos in partes.items():
+            blocos = blocos or [None]
+            combinacoes = [{**comb, cid: bloco} for comb in combinacoes for bloco in blocos]
+        return combinacoes, valores_por_periodo()
+
+    @staticmethod
+    def formatar_classificacao(combinacao):
+        """Monta o segmento de classificação no formato usado pela API (ex.: 'c2/all/c58/1,2/')."""
+        segmento = ''
+        for cid, bloco in combinacao.items():
+            valores = 'all' if bloco is None else ','.join(str(c) for c in bloco)
+            segmento += f'c{cid}/{valores}/'
+        return segmento
+
+    def planejar(self, periodicidade, inicio, fim, categorias: dict = None, n_variaveis=1, n_localidades=1):
+        """Gera os pares (segmento de período, segmento de classificação) de uma consulta.
+
+        Args:
+            periodicidade (str): Frequência da tabela ('anual', 'trimestral' ou 'mensal').
+            inicio (str): Primeiro período a solicitar.
+            fim (str): Último período a solicitar.
+            categorias (dict): Categorias por classificação, {classificacao_id: [ids]}.
+            n_variaveis (int): Número de variáveis por requisição.
+            n_localidades (int): Número de localidades por requisição.
+
+        Returns:
+            list: Pares ('/p/inicio-fim', 'c1/all/...') que cobrem todos os períodos.
+        """
+        categorias = categorias or {}
+        if periodicidade not in ('anual', 'trimestral', 'mensal'):
+            segmento = self.formatar_classificacao({cid: None for cid in categorias})
+            return [(p, segmento) for p in self.gerador.obter_periodo(periodicidade, inicio, fim)]
+
+        periodos = self.listar_periodos(periodicidade, inicio, fim)
+        if not periodos:
+            return []
+
+        combinacoes, valores_por_periodo = self._dividir_categorias(categorias, n_variaveis * n_localidades)
+        periodos_por_requisicao = max(self.limite_valores // max(valores_por_periodo, 1), 1)
+
+        plano = []
+        for i in range(0, len(periodos), periodos_por_requisicao):
+            faixa = periodos[i:i + periodos_por_requisicao]
+            segmento_periodo = f'/p/{faixa[0]}-{faixa[-1]}' if len(faixa) > 1 else f'/p/{faixa[0]}'
+            for combinacao in combinacoes:
+                plano.append((segmento_periodo, self.formatar_classificacao(combinacao)))
+        return plano
@@ -0,0 +1,79 @@
+import os
+import re
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.db import local_directory
+from src.services.http_client import SidraHttpClient
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "..", "data", "template.xlsx")
+
+
+def metadados(tabela: int, fim: int = 2022) -> dict:
+    """Metadados de uma tabela fictícia com duas variáveis e uma classificação."""
+    return {
+        "id": tabela, "nome": f"Tabela {tabela}", "URL": "x", "pesquisa": "P", "assunto": "Assunto X",
+        "periodicidade": {"frequencia": "anual", "inicio": 2020, "fim": fim},
+        "nivelTerritorial": {"Administrativo": ["N1", "N3"], "Especial": [], "IBGE": []},
+        "variaveis": [{"id": 93, "nome": "Pop", "unidade": "Pessoas", "sumarizacao": []},
+                      {"id": 94, "nome": "Renda", "unidade": "R$", "sumarizacao": []}],
+        "classificacoes": [{"id": 2, "nome": "Sexo", "sumarizacao": {}, "categorias": [
+            {"id": 4, "nome": "Homens", "unidade": None, "nivel": 1},
+            {"id": 5, "nome": "Mulheres", "unidade": None, "nivel": 1}]}],
+    }
+
+
+def valores(url: str) -> list:
+    """Resposta de `/values` com códigos e nomes (formato `f/a`) para a URL informada."""
+    t, n, loc, vs, p0, p1 = re.search(r'/t/(\d+)/(N\d)/([^/]+)/v/([^/]+)/+p/(\d+)(?:-(\d+))?', url).groups()
+    header = {"MN": "Unidade de Medida", "V": "Valor", "D1C": "Brasil (Código)", "D1N": "Brasil",
+              "D2C": "Ano (Código)", "D2N": "Ano", "D3C": "Variável (Código)", "D3N": "Variável",
+              "D4C": "Sexo (Código)", "D4N": "Sexo"}
+    rows = [header]
+    for v in vs.split(','):
+        for ano in range(int(p0), int(p1 or p0) + 1):
+            for c, nome in (("4", "Homens"), ("5", "Mulheres")):
+                rows.append({"MN": "Pessoas", "V": str(int(v) * ano + int(c)), "D1C": loc, "D1N": f"Local {loc}",
+                             "D2C": str(ano), "D2N": str(ano), "D3C": v, "D3N": f"Var {v}", "D4C": c, "D4N": nome})
+    return rows
+
+
+class Resposta:
+    def __init__(self, data, status_code: int = 200):
+        self.content = json.dumps(data).encode()
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size):
+        return (self.content[i:i + chunk_size] for i in range(0, len(self.content), chunk_size))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def sidra(tmp_path, monkeypatch):
+    """API do SIDRA simulada e diretório de dados temporário.
+
+    Retorna um dict com as URLs requisitadas (`calls`) e as funções que geram os
+    metadados e os valores, que podem ser substituídas pelos testes.
+    """
+    fake = {'calls': [], 'metadados': metadados, 'valores': valores}
+
+    def get(self, url, timeout=30, **kwargs):
+        fake['calls'].append(url)
+        match = re.search(r'agregados/(\d+)/metadados', url)
+        return Resposta(fake['metadados'](int(match.group(1))) if match else fake['valores'](url))
+
+    monkeypatch.setattr(SidraHttpClient, 'get', get)
+    monkeypatch.setattr(local_directory.DirectoryManager.__init__, '__defaults__', (str(tmp_path), None, None))
+    return fake
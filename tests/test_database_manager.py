@@ -0,0 +1,136 @@
+import pandas as pd
+import pytest
+from psycopg2 import sql
+
+from src.db.database_manager import PostgreSQL
+
+
+def render(query) -> str:
+    """Monta o texto de uma consulta `psycopg2.sql` sem conexão com o banco."""
+    if isinstance(query, str):
+        return query
+    if isinstance(query, sql.Composed):
+        return ''.join(render(part) for part in query.seq)
+    if isinstance(query, sql.Identifier):
+        return '.'.join(f'"{part}"' for part in query.strings)
+    if isinstance(query, sql.Literal):
+        return repr(query.wrapped)
+    return query.string
+
+
+class Cursor:
+    def __init__(self, db):
+        self.db = db
+        self.rowcount = 0
+        self._result = None
+
+    def execute(self, query, params=None):
+        text = ' '.join(render(query).split())
+        self.db.queries.append(text)
+        if 'FROM pg_indexes' in text:
+            self._result = (1,) if self.db.index_exists else None
+        elif 'HAVING COUNT(*) > 1' in text:
+            self._result = (self.db.duplicates,)
+        elif text.startswith('INSERT INTO'):
+            self.rowcount = 2
+
+    def fetchone(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class Connection:
+    def __init__(self, index_exists=False, duplicates=0):
+        self.index_exists = index_exists
+        self.duplicates = duplicates
+        self.queries = []
+        self.committed = self.rolled_back = False
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+@pytest.fixture
+def banco(monkeypatch):
+    def criar(**kwargs):
+        db = PostgreSQL.__new__(PostgreSQL)
+        db.schema = 'datasetpi'
+        db.connector = Connection(**kwargs)
+        db.copied = []
+        monkeypatch.setattr(db, 'table_exists', lambda table_name: True)
+        monkeypatch.setattr(db, '_copy_dataframe', lambda cursor, table_name, df, chunk_size, schema=None: db.copied.append(df))
+        return db
+    return criar
+
+
+DADOS = pd.DataFrame({'regiao': ['Piauí', 'Piauí', 'Ceará'], 'periodo': ['2022', '2022', '2022'], 'valor': [1.0, 2.0, 3.0]})
+
+
+def test_upsert_mantem_a_ultima_ocorrencia_da_chave(banco):
+    db = banco()
+    assert db.upsert_table_data('tabela_1', DADOS.copy()) == 2
+
+    queries = db.connector.queries
+    assert any(q.startswith('CREATE UNIQUE INDEX IF NOT EXISTS') for q in queries)
+    assert any('ADD COLUMN "_stg_seq" BIGINT GENERATED ALWAYS AS IDENTITY' in q for q in queries)
+    insert = next(q for q in queries if q.startswith('INSERT INTO'))
+    assert 'SELECT DISTINCT ON ("regiao", "periodo")' in insert
+    assert 'ORDER BY "regiao", "periodo", "_stg_seq" DESC' in insert
+    assert db.copied[0]['valor'].tolist() == [1.0, 2.0, 3.0]
+    assert db.connector.committed
+
+
+def test_upsert_com_duplicatas_na_tabela_relata_e_nao_cria_o_indice(banco, capsys):
+    db = banco(duplicates=3)
+    assert db.upsert_table_data('tabela_1', DADOS.copy()) == 0
+
+    assert not any(q.startswith('CREATE UNIQUE INDEX') for q in db.connector.queries)
+    assert not any(q.startswith('INSERT INTO') for q in db.connector.queries)
+    assert db.connector.rolled_back and not db.connector.committed
+    assert "3 chave(s)" in capsys.readouterr().out
+
+
+def test_upsert_com_indice_existente_nao_verifica_duplicatas(banco):
+    db = banco(index_exists=True, duplicates=3)
+    assert db.upsert_table_data('tabela_1', DADOS.copy()) == 2
+
+    assert not any('HAVING COUNT(*) > 1' in q for q in db.connector.queries)
+    assert not any(q.startswith('CREATE UNIQUE INDEX') for q in db.connector.queries)
+
+
+TRIMESTRAL = pd.DataFrame({
+    'Região': ['Piauí', 'Piauí'],
+    'Período': ['4º trimestre 2022', '1º trimestre 2023'],
+    'Período (Código)': pd.array([202204, 202301], dtype='Int32'),
+    'Valor': ['10', '..'],
+})
+
+
+def test_inferencia_com_periodo_nao_anual(banco):
+    db = banco()
+    df = TRIMESTRAL.copy()
+    df.columns = [db.format_string(col) for col in df.columns]
+
+    assert db.infer_column_types(df) == [
+        ('regiao', 'TEXT'), ('periodo', 'TEXT'), ('periodo_codigo', 'INTEGER'), ('valor', 'DOUBLE PRECISION')
+    ]
+
+
+def test_create_table_tipa_o_codigo_do_periodo(banco):
+    db = banco()
+    db.create_table('tabela_1', TRIMESTRAL.copy(), adjust_dataframe=True)
+
+    ddl = next(q for q in db.connector.queries if q.startswith('CREATE TABLE'))
+    assert ddl == ('CREATE TABLE "datasetpi"."tabela_1" (indice SERIAL PRIMARY KEY, "regiao" TEXT, '
+                   '"periodo" TEXT, "periodo_codigo" INTEGER, "valor" DOUBLE PRECISION)')
+    assert any(q.startswith('CREATE INDEX IF NOT EXISTS "idx_tabela_1_periodo_codigo"') for q in db.connector.queries)
+    assert db.copied[0]['valor'].isna().tolist() == [False, True]
+    assert db.connector.committed
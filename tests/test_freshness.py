@@ -0,0 +1,65 @@
+from conftest import metadados
+from src.db.fingerprints import FingerprintStore
+from src.main.setup import SidraMetadataExecute
+
+
+def extrair(**kwargs):
+    executor = SidraMetadataExecute([9999], skip_unchanged=True, **kwargs)
+    executor.batch_extraction()
+    return executor
+
+
+def urls_de_valores(sidra, inicio=0):
+    return [url for url in sidra['calls'][inicio:] if '/values/' in url]
+
+
+def test_tabela_inalterada_e_ignorada(sidra):
+    SidraMetadataExecute([9999]).batch_info()
+    assert extrair().freshness_report == {'novas': 1, 'atualizadas': 0, 'ignoradas': 0}
+
+    inicio = len(sidra['calls'])
+    executor = extrair()
+    assert executor.freshness_report == {'novas': 0, 'atualizadas': 0, 'ignoradas': 1}
+    assert urls_de_valores(sidra, inicio) == []
+    assert any('/metadados' in url for url in sidra['calls'][inicio:])
+
+
+def test_novo_periodo_sem_batch_info_nao_e_ignorado(sidra):
+    SidraMetadataExecute([9999]).batch_info()
+    extrair()
+
+    # Um novo período é publicado; o catálogo e o cache de respostas ainda têm os metadados antigos
+    sidra['metadados'] = lambda tabela: metadados(tabela, fim=2023)
+    inicio = len(sidra['calls'])
+    executor = extrair()
+
+    assert executor.freshness_report == {'novas': 0, 'atualizadas': 1, 'ignoradas': 0}
+    assert any('2023' in url for url in urls_de_valores(sidra, inicio))
+    assert executor.catalog.get(9999)[0]['Data Final'] == '2023'
+
+    inicio = len(sidra['calls'])
+    assert extrair().freshness_report['ignoradas'] == 1
+    assert urls_de_valores(sidra, inicio) == []
+
+
+def test_falha_ao_verificar_metadados_extrai_a_tabela(sidra, monkeypatch):
+    SidraMetadataExecute([9999]).batch_info()
+    extrair()
+
+    monkeypatch.setattr('src.services.ibge_api.SidraManager.sidra_get_metadata', lambda self, tabela, refresh=False: None)
+    executor = extrair()
+
+    assert executor.freshness_report == {'novas': 1, 'atualizadas': 0, 'ignoradas': 0}
+    assert '9999' in executor.fingerprints.fingerprints
+
+
+def test_impressoes_sao_gravadas_uma_vez_por_extracao(sidra, monkeypatch):
+    gravacoes = []
+    original = FingerprintStore._save
+    monkeypatch.setattr(FingerprintStore, '_save', lambda self: (gravacoes.append(1), original(self)))
+    SidraMetadataExecute([9999, 8888]).batch_info()
+    executor = SidraMetadataExecute([9999, 8888], skip_unchanged=True)
+    executor.batch_extraction()
+
+    assert len(gravacoes) == 1
+    assert set(FingerprintStore(executor.fingerprints.path).fingerprints) == {'9999', '8888'}
@@ -0,0 +1,76 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from src.services.http_client import SidraHttpClient
+from src.services.rate_limiter import AdaptiveRateLimiter
+from src.services.sidra_api import SidraAPI
+
+
+@pytest.fixture
+def servidor():
+    """Servidor local que responde com os status da fila `respostas` e depois com 200."""
+    estado = {'respostas': [], 'requisicoes': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            estado['requisicoes'] += 1
+            status = estado['respostas'].pop(0) if estado['respostas'] else 200
+            body = json.dumps([{'V': 'Valor'}, {'V': '1'}]).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    estado['url'] = f"http://127.0.0.1:{server.server_port}/values"
+    yield estado
+    server.shutdown()
+    server.server_close()
+
+
+def limitador():
+    limiter = AdaptiveRateLimiter(max_rate=1000)
+    limiter.backoff = lambda attempt: 0
+    return limiter
+
+
+def test_adaptador_nao_repete_429_e_5xx(servidor):
+    limiter = limitador()
+    client = SidraHttpClient(max_retries=3, rate_limiter=limiter)
+    servidor['respostas'] = [429, 503]
+
+    assert client.get(servidor['url']).status_code == 429
+    assert client.get(servidor['url']).status_code == 503
+    assert servidor['requisicoes'] == 2
+    assert limiter.throttled == 2
+
+
+def test_retentativa_de_429_passa_pelo_limitador(servidor):
+    limiter = limitador()
+    esperas = []
+    limiter.wait_backoff = esperas.append
+    api = SidraAPI(http_client=SidraHttpClient(max_retries=3, rate_limiter=limiter))
+    servidor['respostas'] = [429]
+
+    data = api._fetch_url(servidor['url'], timeout=5, max_retries=2, parser=lambda data: data)
+
+    assert data == [{'V': 'Valor'}, {'V': '1'}]
+    assert servidor['requisicoes'] == 2
+    assert limiter.throttled == 1 and esperas == [0]
+
+
+def test_adaptador_repete_apenas_falhas_de_conexao():
+    retry = SidraHttpClient(max_retries=3).session.get_adapter('https://').max_retries
+
+    assert retry.connect == 3
+    assert retry.read == 0 and retry.status == 0
+    assert not retry.is_retry('GET', 429) and not retry.is_retry('GET', 503)
@@ -0,0 +1,105 @@
+import pytest
+
+from src.db.local_directory import TablePartitionWriter
+from src.main.setup import SidraMetadataExecute
+from src.services.sidra_api import SidraAPI
+from src.utils.pipeline import StagedPipeline
+
+
+def falha_no_par(item):
+    if item % 2 == 0:
+        raise ValueError(f"falha em {item}")
+    return item
+
+
+def test_erro_sem_on_error_descarta_o_item():
+    recebidos = []
+    pipeline = StagedPipeline([('a', falha_no_par, 2), ('b', recebidos.append, 1)], queue_size=2)
+    stats = pipeline.run(range(6))
+
+    assert sorted(recebidos) == [1, 3, 5]
+    assert stats['a']['erros'] == 3 and len(pipeline.errors) == 3
+
+
+def test_erro_com_on_error_repassa_a_falha():
+    recebidos = []
+    pipeline = StagedPipeline([('a', falha_no_par, 2), ('b', recebidos.append, 1)], queue_size=2,
+                              on_error=lambda stage, item, error: ('falha', stage, item))
+    pipeline.run(range(6))
+
+    assert sorted(map(str, recebidos)) == sorted(map(str, [1, 3, 5, ('falha', 'a', 0), ('falha', 'a', 2), ('falha', 'a', 4)]))
+
+
+@pytest.mark.parametrize('stage', ['fetch', 'format'])
+def test_falha_em_um_estagio_deixa_a_tabela_pendente(sidra, monkeypatch, stage):
+    executor = SidraMetadataExecute([9999], use_cache=False, pipeline=True)
+    executor.batch_info()
+
+    if stage == 'fetch':
+        original = executor.sidra_api._fetch_url
+        def quebra(url, *args, **kwargs):
+            if '/v/94/' in url:
+                raise RuntimeError('falha na requisição')
+            return original(url, *args, **kwargs)
+        monkeypatch.setattr(executor.sidra_api, '_fetch_url', quebra)
+    else:
+        original = executor.sidra_api.format_data
+        def quebra(data):
+            if any(row.get('D3C') == '94' for row in data[1:]):
+                raise RuntimeError('falha na formatação')
+            return original(data)
+        monkeypatch.setattr(executor.sidra_api, 'format_data', quebra)
+
+    executor.batch_extraction()
+
+    assert [str(t) for t in executor._pending_tables] == ['9999']
+    assert not executor.journal.is_table_done(9999)
+    status = executor.journal.connector.execute(
+        "SELECT status FROM runs WHERE run_id = ?", (executor.journal.run_id,)).fetchone()[0]
+    assert status == 'running'
+    assert executor.journal.summary().get('failed', 0) > 0
+    assert '9999' not in executor.fingerprints.fingerprints
+
+
+def test_pipeline_sem_falhas_encerra_a_execucao(sidra):
+    executor = SidraMetadataExecute([9999], use_cache=False, pipeline=True)
+    executor.batch_info()
+    executor.batch_extraction()
+
+    assert executor._pending_tables == []
+    assert executor.journal.is_table_done(9999)
+
+
+@pytest.mark.parametrize('modo', [{'pipeline': True}, {}, {'stream_batch_size': 10}])
+def test_erro_ao_salvar_deixa_a_tabela_pendente_sem_interromper_as_demais(sidra, monkeypatch, modo):
+    executor = SidraMetadataExecute([9999, 8888], use_cache=False, **modo)
+    executor.batch_info()
+
+    original = executor.directory_manager.save_table_partitions
+    def quebra(pages, layer, tabela):
+        if str(tabela) == '9999':
+            raise OSError('disco cheio')
+        return original(pages, layer, tabela)
+    monkeypatch.setattr(executor.directory_manager, 'save_table_partitions', quebra)
+
+    commit = TablePartitionWriter.commit
+    def quebra_commit(writer):
+        if writer.table_path.endswith('tabela=9999'):
+            raise OSError('disco cheio')
+        return commit(writer)
+    monkeypatch.setattr(TablePartitionWriter, 'commit', quebra_commit)
+
+    executor.batch_extraction()
+
+    assert [str(t) for t in executor._pending_tables] == ['9999']
+    assert not executor.journal.is_table_done(9999)
+    assert executor.journal.is_table_done(8888)
+
+
+def test_requisicao_bruta_usa_as_configuracoes_da_instancia(monkeypatch):
+    api = SidraAPI(timeout=5, max_retries=4)
+    chamadas = []
+    monkeypatch.setattr(api, '_fetch_url', lambda url, timeout, max_retries, parser: chamadas.append((timeout, max_retries)) or parser([1]))
+
+    assert api.fetch_raw('https://apisidra.ibge.gov.br/values/t/1') == [1]
+    assert chamadas == [(5, 4)]
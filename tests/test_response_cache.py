@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import pytest
+
+from src.db import response_cache
+from src.db.response_cache import ResponseCache
+
+BASE = 'https://apisidra.ibge.gov.br/values/t/1/n1/all/v/93'
+ANO = datetime.now().year
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), max_bytes=250)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize('url, tipo', [
+    ('https://servicodados.ibge.gov.br/api/v3/agregados/1/metadados', 'metadata'),
+    ('https://servicodados.ibge.gov.br/api/v3/agregados/1/localidades/N6', 'metadata'),
+    (f'{BASE}/p/last/c2/all', 'last'),
+    (f'{BASE}/p/last%203', 'last'),
+    (f'{BASE}/p/all', 'last'),
+    (f'{BASE}/p/2010-2015/c2/all', 'closed'),
+    (f'{BASE}/p/201001-{ANO - 1}12', 'closed'),
+    (f'{BASE}/p/2020-{ANO}', 'default'),
+    (f'{BASE}/p/{ANO}03/f/n', 'default'),
+    (BASE, 'default'),
+])
+def test_ttl_por_tipo_de_endpoint(cache, url, tipo):
+    assert cache.ttl_for(url) == ResponseCache.DEFAULT_TTL[tipo]
+
+
+def test_remove_as_entradas_menos_usadas_recentemente(cache, monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(response_cache.time, 'time', lambda: agora[0])
+
+    for i, nome in enumerate('abc'):
+        agora[0] += 1
+        cache.set_compressed(f'{BASE}/p/{2000 + i}', nome.encode() * 100)
+    # 300 bytes > 250: a entrada mais antiga (a) é removida
+    assert cache.evictions == 1
+    assert cache.get_compressed(f'{BASE}/p/2000') is None
+
+    agora[0] += 1
+    assert cache.get_compressed(f'{BASE}/p/2001') == b'b' * 100  # b passa a ser a mais recente
+
+    agora[0] += 1
+    cache.set_compressed(f'{BASE}/p/2003', b'd' * 100)
+    assert cache.evictions == 2
+    assert cache.get_compressed(f'{BASE}/p/2002') is None
+    assert cache.get_compressed(f'{BASE}/p/2001') == b'b' * 100
+    assert cache.stats()['bytes'] == 200
+
+
+def test_entrada_maior_que_o_limite_nao_permanece(cache):
+    cache.set_compressed(f'{BASE}/p/2000', b'x' * 300)
+    assert cache.stats()['entries'] == 0 and cache.evictions == 1
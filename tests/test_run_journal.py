@@ -0,0 +1,85 @@
+import os
+
+import pytest
+from requests.exceptions import ConnectionError
+
+from conftest import valores
+from src.main.setup import SidraMetadataExecute
+from src.services.rate_limiter import AdaptiveRateLimiter
+
+
+@pytest.fixture(autouse=True)
+def sem_espera(monkeypatch):
+    monkeypatch.setattr(AdaptiveRateLimiter, 'wait_backoff', lambda self, attempt: None)
+
+
+def urls_de_valores(sidra, inicio=0):
+    return [url for url in sidra['calls'][inicio:] if '/values/' in url]
+
+
+def falhar_em(sidra, trecho):
+    """Faz as URLs de valores que contêm `trecho` falharem na rede."""
+    def gerar(url):
+        if trecho in url:
+            raise ConnectionError(f"falha simulada: {url}")
+        return valores(url)
+    sidra['valores'] = gerar
+
+
+def extrair(**kwargs):
+    executor = SidraMetadataExecute([9999], use_cache=False, **kwargs)
+    executor.batch_extraction()
+    return executor
+
+
+def diretorios_de_execucao(executor):
+    return sorted(d for d in os.listdir(executor.journal.checkpoint_dir) if not d.startswith('journal'))
+
+
+def status_da_execucao(executor):
+    return executor.journal.connector.execute(
+        "SELECT status FROM runs WHERE run_id = ?", (executor.journal.run_id,)
+    ).fetchone()[0]
+
+
+def test_resume_requisita_apenas_as_unidades_com_falha(sidra):
+    SidraMetadataExecute([9999]).batch_info()
+    falhar_em(sidra, '/v/94/')
+    inicio = len(sidra['calls'])
+    executor = extrair()
+
+    assert executor._pending_tables == ['9999']
+    assert status_da_execucao(executor) == 'running'
+    assert executor.journal.summary()['failed'] > 0
+    falhas = [url for url in urls_de_valores(sidra, inicio) if '/v/94/' in url]
+    concluidas = [url for url in urls_de_valores(sidra, inicio) if '/v/94/' not in url]
+    assert falhas and concluidas
+    run_id = executor.journal.run_id
+
+    sidra['valores'] = valores
+    inicio = len(sidra['calls'])
+    executor = extrair(resume=True)
+
+    assert executor.journal.run_id == run_id
+    assert executor._pending_tables == []
+    assert sorted(set(urls_de_valores(sidra, inicio))) == sorted(set(falhas))
+    pages = executor.directory_manager.load_table_partitions(executor.silver_layer, 9999)
+    assert sorted(pages) == ['93', '94']
+    assert all(len(df) > 0 for df in pages.values())
+
+    assert status_da_execucao(executor) == 'finished'
+    assert diretorios_de_execucao(executor) == []
+
+
+def test_execucoes_abandonadas_nao_deixam_saidas_no_disco(sidra):
+    SidraMetadataExecute([9999]).batch_info()
+    falhar_em(sidra, '/v/94/')
+    primeira = extrair()
+    assert diretorios_de_execucao(primeira) == [primeira.journal.run_id]
+
+    segunda = extrair()
+    assert segunda._pending_tables == ['9999']
+    assert diretorios_de_execucao(segunda) == [segunda.journal.run_id]
+    assert primeira.journal.connector.execute(
+        "SELECT status FROM runs WHERE run_id = ?", (primeira.journal.run_id,)
+    ).fetchone()[0] == 'abandoned'
@@ -0,0 +1,123 @@
+import re
+
+import pandas as pd
+import pytest
+
+from src.main.setup import SidraMetadataExecute
+from src.services.sidra_api import SidraAPI
+
+HEADER_NOMES = {"V": "Valor", "D1N": "Brasil", "D2N": "Ano", "D3N": "Variável"}
+HEADER_CODIGOS = {**HEADER_NOMES, "D3C": "Variável (Código)"}
+
+
+def resposta(header, variaveis):
+    linhas = [{"V": "1", "D1N": "Brasil", "D2N": "2022", "D3N": f"Var {v}", "D3C": str(v)} for v in variaveis]
+    return [header] + [{key: linha[key] for key in header} for linha in linhas]
+
+
+@pytest.fixture
+def api():
+    return SidraAPI()
+
+
+def test_split_by_variable_separa_pelo_codigo(api):
+    partes = api.split_by_variable(resposta(HEADER_CODIGOS, [93, 94, 93]), variavel='93,94')
+
+    assert set(partes) == {'93', '94'}
+    assert len(partes['93']) == 3 and partes['93'][0] == HEADER_CODIGOS
+    assert len(partes['94']) == 2
+
+
+def test_split_by_variable_sem_codigo_com_varias_variaveis_falha(api):
+    with pytest.raises(ValueError):
+        api.split_by_variable(resposta(HEADER_NOMES, [93, 94]), variavel='93,94')
+
+
+def test_split_by_variable_sem_codigo_com_uma_variavel(api):
+    data = resposta(HEADER_NOMES, [93])
+    assert api.split_by_variable(data, variavel='93') == {'93': data}
+
+
+def test_format_by_variable_sem_codigo_falha_a_url(api, monkeypatch):
+    monkeypatch.setattr(api.http_client, 'get_json', lambda url, timeout=30: resposta(HEADER_NOMES, [93, 94]))
+    api.variavel = '93,94'
+
+    assert api._fetch_url('https://apisidra.ibge.gov.br/values/t/1/n1/1/v/93,94/p/2022/f/n', 30, 2,
+                          parser=api._format_by_variable) is None
+
+
+def test_formato_das_requisicoes_inclui_os_codigos_necessarios(api):
+    executor = SidraMetadataExecute.__new__(SidraMetadataExecute)
+    executor.sidra_api, executor.incremental = api, False
+    row = pd.Series({'Nível Territorial': 'N1', 'Frequência': 'anual', 'Data Inicial': '2022', 'Data Final': '2022'})
+
+    executor._build_urls(1, row, ['93', '94'], '')
+    assert api.urls and all('/f/a/' in url for url in api.urls)
+
+    executor._build_urls(1, row, ['93'], '')
+    assert api.urls and all('/f/u/' in url for url in api.urls)
+
+
+@pytest.mark.parametrize('dimensao, rotulos, codigos', [
+    ('Trimestre', ['4º trimestre 2022', '1º trimestre 2023'], [202204, 202301]),
+    ('Mês', ['dezembro 2022', 'janeiro 2023'], [202212, 202301]),
+    ('Ano', ['2022', '2023'], [2022, 2023]),
+])
+def test_format_data_codifica_periodos_nao_anuais(api, dimensao, rotulos, codigos):
+    header = {"V": "Valor", "D1N": "Brasil", "D2C": f"{dimensao} (Código)", "D2N": dimensao, "D3N": "Sexo"}
+    linhas = [{"V": "1", "D1N": "Brasil", "D2C": "0", "D2N": rotulo, "D3N": "Homens"} for rotulo in rotulos]
+
+    df = api.format_data([header] + linhas)
+
+    assert list(df.columns) == ['Valor', 'Região', 'Período', 'Período (Código)', 'Categorias']
+    assert df['Período (Código)'].tolist() == codigos
+    assert str(df['Período (Código)'].dtype) == 'Int32'
+
+
+MUNICIPIOS = [str(2200000 + 5 * i) for i in range(900)]
+
+
+@pytest.mark.parametrize('variavel, limite', [('93', 50000), ('93,94,95', 50000), ('93', 300)])
+def test_municipios_empacotados_dentro_dos_limites(variavel, limite):
+    api = SidraAPI(limite_valores=limite)
+    api.build_url('1', variavel, nivel_territorial='N6',
+                  periodo={'Frequência': 'anual', 'Inicio': '2020', 'Final': '2022'},
+                  categorias={2: [4, 5]}, localidades={'N6': MUNICIPIOS})
+
+    pacotes = [segmento.split('/', 1)[1].split(',') for _, segmento in api._segmentos_territoriais()]
+    assert len(pacotes) > 1
+    assert all(len(url) <= api.max_url_length for url in api.urls)
+    assert all(len(pacote) * len(variavel.split(',')) <= limite for pacote in pacotes)
+    assert sorted(codigo for pacote in pacotes for codigo in pacote) == sorted(MUNICIPIOS)
+
+    for url in api.urls:
+        valores = len(re.search(r'/N6/([^/]+)/', url).group(1).split(','))
+        valores *= len(variavel.split(','))
+        inicio, fim = re.search(r'/p/(\d+)(?:-(\d+))?/', url).groups()
+        valores *= int(fim or inicio) - int(inicio) + 1
+        categorias = re.search(r'/c2/([^/]+)/', url).group(1)
+        valores *= 2 if categorias == 'all' else len(categorias.split(','))
+        assert valores <= limite, url
+
+
+def test_municipios_sem_lista_usam_a_uf():
+    api = SidraAPI(uf_code=21)
+    api.build_url('1', '93', nivel_territorial='N1, N6',
+                  periodo={'Frequência': 'anual', 'Inicio': '2022', 'Final': '2022'})
+
+    assert api._segmentos_territoriais() == [('N1/1', 'N1/1'), ('N6', 'N6/in N3 21')]
+    assert any('/N6/in N3 21/' in url for url in api.urls)
+
+
+def test_format_data_mantem_o_codigo_da_regiao(api):
+    header = {"V": "Valor", "D1C": "Município (Código)", "D1N": "Município", "D2N": "Ano",
+              "D3C": "Variável (Código)", "D3N": "Variável", "D4N": "Sexo"}
+    linhas = [{"V": "1", "D1C": codigo, "D1N": nome, "D2N": "2022", "D3C": "93", "D3N": "Pop", "D4N": "Homens"}
+              for codigo, nome in (("2211001", "Teresina - PI"), ("2207702", "Parnaíba - PI"))]
+
+    df = api.format_data([header] + linhas)
+
+    assert list(df.columns) == ['Valor', 'Região (Código)', 'Região', 'Período', 'Período (Código)', 'Variável', 'Categorias']
+    assert df['Região (Código)'].tolist() == [2211001, 2207702]
+    assert str(df['Região (Código)'].dtype) == 'Int32'
+    assert isinstance(df['Região'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,62 @@
+import os
+
+import pandas as pd
+
+from src.db.local_directory import DirectoryManager
+from src.main.setup import SidraMetadataExecute
+from src.utils.utils import compactar_tipos
+
+
+def lote(regioes, valor):
+    return compactar_tipos(pd.DataFrame({'Região': regioes, 'Valor': [str(valor)] * len(regioes)}))
+
+
+def nao_concatenar(frames):
+    raise AssertionError("o modo streaming não deve reunir os lotes em memória")
+
+
+def test_writer_grava_lotes_com_categorias_diferentes(tmp_path):
+    dm = DirectoryManager(str(tmp_path))
+    with dm.table_writer('silver', 1) as writer:
+        writer.write(93, lote(['a', 'b'], 1))
+        writer.write(93, lote([f'r{i}' for i in range(300)], 2))
+        writer.write(94, lote(['c'], 3))
+
+    pages = dm.load_table_partitions('silver', 1)
+    assert {k: len(v) for k, v in pages.items()} == {'93': 302, '94': 1}
+    assert isinstance(pages['93']['Região'].dtype, pd.CategoricalDtype)
+    assert os.listdir(dm.table_partition_path('silver', 1, 93)) == ['part-0.parquet']
+
+
+def test_writer_abort_e_discard_preservam_a_particao_anterior(tmp_path):
+    dm = DirectoryManager(str(tmp_path))
+    dm.save_table_partitions({'93': lote(['a'], 1)}, 'silver', 1)
+
+    writer = dm.table_writer('silver', 1)
+    writer.write(93, lote(['x', 'y'], 2))
+    writer.abort()
+    assert len(dm.load_table_partitions('silver', 1)['93']) == 1
+
+    writer = dm.table_writer('silver', 1)
+    writer.write(93, lote(['x', 'y'], 2))
+    writer.write(94, lote(['z'], 3))
+    writer.discard(94)
+    writer.commit()
+    assert {k: len(v) for k, v in dm.load_table_partitions('silver', 1).items()} == {'93': 2}
+
+
+def test_extracao_em_streaming_grava_lote_a_lote(sidra, monkeypatch):
+    SidraMetadataExecute([9999]).batch_info()
+    executor = SidraMetadataExecute([9999], use_cache=False)
+    executor.batch_extraction()
+    esperado = executor.directory_manager.load_table_partitions(executor.silver_layer, 9999)
+
+    monkeypatch.setattr('src.main.setup.concatenar_compacto', nao_concatenar)
+    streaming = SidraMetadataExecute([9999], use_cache=False, stream_batch_size=5)
+    streaming.batch_extraction()
+    obtido = streaming.directory_manager.load_table_partitions(streaming.silver_layer, 9999)
+
+    assert obtido.keys() == esperado.keys()
+    for variavel in esperado:
+        pd.testing.assert_frame_equal(obtido[variavel].astype(str), esperado[variavel].astype(str))
+    assert streaming.memory_report['9999']['linhas'] == sum(len(df) for df in esperado.values())
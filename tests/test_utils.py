@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.utils import PlanejadorDeRequisicoes, codificar_periodos, formatar_valores_ptbr
+
+
+def referencia(valor, casas):
+    return f'{valor:,.{casas}f}'.translate(str.maketrans(',.', '.,'))
+
+
+@pytest.mark.parametrize('casas', [0, 2, 4])
+def test_formatacao_igual_a_do_python(casas):
+    rng = np.random.default_rng(0)
+    valores = np.concatenate([
+        rng.uniform(-1e7, 1e7, 5000),
+        np.round(rng.uniform(0, 1e5, 5000), 3),
+        [0.0, -0.0, -0.004, 0.005, 0.125, 1.005, 2.675, 999.995, 1e3, 1e6, 1e17, -1e20, np.inf, -np.inf],
+    ])
+
+    obtido = formatar_valores_ptbr(pd.Series(valores), casas)
+    assert obtido.tolist() == [referencia(valor, casas) for valor in valores]
+
+
+def test_ausentes_e_textos():
+    serie = pd.Series(['1234.5', 'x', None, np.nan, '-1000000'], index=list('abcde'))
+    obtido = formatar_valores_ptbr(serie)
+
+    assert obtido.tolist() == ['1.234,50', None, None, None, '-1.000.000,00']
+    assert obtido.index.tolist() == list('abcde')
+    assert formatar_valores_ptbr(pd.Series([], dtype=float)).tolist() == []
+
+
+def test_codificar_periodos_segue_os_codigos_do_sidra():
+    rotulos = pd.Series(['2023', 'janeiro 2023', 'dezembro 2022', '1º trimestre 2023', '2º semestre 2021',
+                         'out-nov-dez 2023', None, 'safra 2020/2021']).astype('category')
+
+    assert codificar_periodos(rotulos).tolist() == [2023, 202301, 202212, 202301, 202102, 202312, pd.NA, pd.NA]
+
+
+def combinacoes_do_plano(planejador, periodicidade, plano, categorias):
+    """Expande o plano em pares (período, categoria de cada classificação) requisitados."""
+    pares = []
+    for segmento_periodo, segmento_classificacao in plano:
+        inicio, _, fim = segmento_periodo[len('/p/'):].partition('-')
+        periodos = planejador.listar_periodos(periodicidade, inicio, fim or inicio)
+
+        blocos = [[]]
+        partes = segmento_classificacao.strip('/').split('/') if segmento_classificacao else []
+        for cid, valores in zip(partes[::2], partes[1::2]):
+            lista = categorias[int(cid[1:])] if valores == 'all' else [int(v) for v in valores.split(',')]
+            blocos = [bloco + [(int(cid[1:]), c)] for bloco in blocos for c in lista]
+        pares += [(periodo, tuple(bloco)) for periodo in periodos for bloco in blocos]
+    return pares
+
+
+@pytest.mark.parametrize('periodicidade, inicio, fim, esperado', [
+    ('trimestral', '202203', '202302', ['202203', '202204', '202301', '202302']),
+    ('mensal', '202211', '202302', ['202211', '202212', '202301', '202302']),
+    ('anual', '2020', '2022', ['2020', '2021', '2022']),
+])
+def test_listar_periodos_vira_o_ano(periodicidade, inicio, fim, esperado):
+    assert PlanejadorDeRequisicoes().listar_periodos(periodicidade, inicio, fim) == esperado
+
+
+def test_categorias_sao_divididas_quando_um_periodo_excede_o_limite():
+    planejador = PlanejadorDeRequisicoes(limite_valores=100)
+    categorias = {2: list(range(1, 301)), 58: [10, 11]}
+
+    combinacoes, valores_por_periodo = planejador._dividir_categorias(categorias, 1)
+
+    assert valores_por_periodo <= 100
+    assert all(combinacao[58] is None for combinacao in combinacoes)
+    assert sorted(c for combinacao in combinacoes for c in combinacao[2]) == categorias[2]
+    assert all(len(combinacao[2]) * 2 <= 100 for combinacao in combinacoes)
+
+
+def test_categorias_inteiras_quando_um_periodo_cabe_no_limite():
+    combinacoes, valores_por_periodo = PlanejadorDeRequisicoes(limite_valores=100)._dividir_categorias({2: [1, 2]}, 3)
+    assert combinacoes == [{2: None}] and valores_por_periodo == 6
+
+
+@pytest.mark.parametrize('periodicidade, inicio, fim, limite, categorias, n_localidades', [
+    ('mensal', '202011', '202302', 50, {2: [4, 5], 58: [1, 2, 3]}, 1),
+    ('trimestral', '201903', '202302', 7, {2: [4, 5, 6]}, 2),
+    ('anual', '2000', '2022', 1000, {2: list(range(40))}, 30),
+    ('mensal', '202201', '202212', 5, {}, 3),
+])
+def test_plano_cobre_cada_periodo_e_categoria_uma_vez(periodicidade, inicio, fim, limite, categorias, n_localidades):
+    planejador = PlanejadorDeRequisicoes(limite_valores=limite)
+    plano = planejador.planejar(periodicidade, inicio, fim, categorias, n_localidades=n_localidades)
+
+    periodos = planejador.listar_periodos(periodicidade, inicio, fim)
+    blocos = [[]]
+    for cid, lista in categorias.items():
+        blocos = [bloco + [(cid, c)] for bloco in blocos for c in lista]
+    esperado = [(periodo, tuple(bloco)) for periodo in periodos for bloco in blocos]
+
+    obtido = combinacoes_do_plano(planejador, periodicidade, plano, categorias)
+    assert sorted(obtido) == sorted(esperado)
+    for segmento_periodo, segmento_classificacao in plano:
+        n = len(combinacoes_do_plano(planejador, periodicidade, [(segmento_periodo, segmento_classificacao)], categorias))
+        assert n * n_localidades <= limite
@@ -0,0 +1,28 @@
+from src.db.watermarks import WatermarkStore
+from src.main.setup import SidraMetadataExecute
+
+
+def test_set_so_grava_no_flush(tmp_path, monkeypatch):
+    path = tmp_path / '_watermarks_.json'
+    store = WatermarkStore(str(path))
+    gravacoes = []
+    original = store._save
+    monkeypatch.setattr(store, '_save', lambda: (gravacoes.append(1), original()))
+
+    for variavel in range(100):
+        store.set(1, variavel, 'N1', '2022')
+    assert not path.exists()
+
+    store.flush()
+    store.flush()
+    assert len(gravacoes) == 1
+    assert WatermarkStore(str(path)).for_variable(1, 42) == {'N1': '2022'}
+
+
+def test_extracao_grava_as_marcas_ao_final(sidra):
+    SidraMetadataExecute([9999]).batch_info()
+    executor = SidraMetadataExecute([9999], incremental=True)
+    executor.batch_extraction()
+
+    marcas = WatermarkStore(executor.watermarks.path)
+    assert marcas.for_variable(9999, 93) == {'N1/1': '2022', 'N3/22': '2022'}